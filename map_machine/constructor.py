@@ -1,8 +1,11 @@
 """Construct Map Machine nodes and ways."""
 import logging
 import sys
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
 from hashlib import sha256
+from itertools import islice
 from typing import Any, Iterator, Optional, Union
 
 import numpy as np
@@ -62,15 +65,22 @@ def line_center(
     :param nodes: node list
     :param flinger: flinger that remap geo positions
     """
+    center_coordinates: np.ndarray = get_center(nodes)
+    return flinger.fling(center_coordinates), center_coordinates
+
+
+def get_center(nodes: list[OSMNode]) -> np.ndarray:
+    """
+    Get geometric center of nodes set in geo coordinates.
+
+    :param nodes: node list
+    """
     boundary: list[MinMax] = [MinMax(), MinMax()]
 
     for node in nodes:
         boundary[0].update(node.coordinates[0])
         boundary[1].update(node.coordinates[1])
-    center_coordinates: np.ndarray = np.array(
-        (boundary[0].center(), boundary[1].center())
-    )
-    return flinger.fling(center_coordinates), center_coordinates
+    return np.array((boundary[0].center(), boundary[1].center()))
 
 
 def get_user_color(text: str, seed: str) -> Color:
@@ -96,35 +106,62 @@ def glue(ways: list[OSMWay]) -> list[list[OSMNode]]:
     """
     Try to glue ways that share nodes.
 
+    Open ways are indexed by their endpoint nodes, so every chain grows at both
+    ends by looking up the next way in constant time instead of scanning all
+    remaining ways.
+
     :param ways: ways to glue
     """
     result: list[list[OSMNode]] = []
-    to_process: set[tuple[OSMNode]] = set()
+    # Open ways without duplicates, in the order of relation members.
+    parts: list[tuple[OSMNode, ...]] = []
 
     for way in ways:
         if way.is_cycle():
             result.append(way.nodes)
         else:
-            to_process.add(tuple(way.nodes))
-
-    while to_process:
-        nodes: list[OSMNode] = list(to_process.pop())
-        glued: Optional[list[OSMNode]] = None
-        other_nodes: Optional[tuple[OSMNode]] = None
-
-        for other_nodes in to_process:
-            glued = try_to_glue(nodes, list(other_nodes))
-            if glued is not None:
-                break
-
-        if glued is not None:
-            to_process.remove(other_nodes)
-            if is_cycle(glued):
-                result.append(glued)
+            parts.append(tuple(way.nodes))
+
+    parts = list(dict.fromkeys(parts))
+    is_used: list[bool] = [False] * len(parts)
+
+    # Endpoint node to indices of parts that start or end with it.  Indices of
+    # already used parts are removed lazily.
+    endpoints: dict[OSMNode, list[int]] = {}
+    for index, part in enumerate(parts):
+        endpoints.setdefault(part[0], []).append(index)
+        endpoints.setdefault(part[-1], []).append(index)
+
+    def take(node: OSMNode) -> Optional[tuple[OSMNode, ...]]:
+        """Get not yet used part that starts or ends with the node."""
+        indices: list[int] = endpoints.get(node, [])
+        while indices:
+            index: int = indices.pop()
+            if not is_used[index]:
+                is_used[index] = True
+                return parts[index]
+        return None
+
+    for index, part in enumerate(parts):
+        if is_used[index]:
+            continue
+        is_used[index] = True
+        chain: deque[OSMNode] = deque(part)
+
+        while chain[0] != chain[-1] and (other := take(chain[-1])):
+            if other[0] == chain[-1]:
+                chain.extend(islice(other, 1, None))
             else:
-                to_process.add(tuple(glued))
-        else:
-            result.append(nodes)
+                chain.extend(islice(reversed(other), 1, None))
+
+        while chain[0] != chain[-1] and (other := take(chain[0])):
+            # Note that `extendleft` adds nodes in reversed order.
+            if other[-1] == chain[0]:
+                chain.extendleft(islice(reversed(other), 1, None))
+            else:
+                chain.extendleft(islice(other, 1, None))
+
+        result.append(list(chain))
 
     return result
 
@@ -134,19 +171,55 @@ def is_cycle(nodes: list[OSMNode]) -> bool:
     return nodes[0] == nodes[-1]
 
 
-def try_to_glue(
-    nodes: list[OSMNode], other: list[OSMNode]
-) -> Optional[list[OSMNode]]:
-    """Create new combined way if ways share endpoints."""
-    if nodes[0] == other[0]:
-        return list(reversed(other[1:])) + nodes
-    if nodes[0] == other[-1]:
-        return other[:-1] + nodes
-    if nodes[-1] == other[-1]:
-        return nodes + list(reversed(other[:-1]))
-    if nodes[-1] == other[0]:
-        return nodes + other[1:]
-    return None
+@dataclass
+class LineParameters:
+    """
+    Construction results for a way or relation that don't depend on the
+    projection.
+    """
+
+    # Building with wall segments for the projection it was created with.
+    building: Optional[Building]
+
+    road_matcher: Optional[RoadMatcher]
+
+    # Figures and whether the icon should be drawn at the center of the way or
+    # relation for the figure.
+    figures: list[tuple[StyledFigure, bool]]
+
+    # Tag keys processed while constructing figures.
+    processed: frozenset[str]
+
+
+class ConstructionCache:
+    """
+    Construction results that depend only on OpenStreetMap data and drawing
+    configuration but not on the drawn area and projection.
+
+    The cache may be shared by constructors of different areas (e.g. tiles)
+    that use the same OpenStreetMap data and the same drawing configuration.
+    """
+
+    def __init__(self) -> None:
+        # Relation identifier to glued inner and outer paths.
+        self.relation_paths: dict[
+            int, tuple[list[list[OSMNode]], list[list[OSMNode]]]
+        ] = {}
+
+        # Way or relation to its geo center.
+        self.centers: dict[tuple[bool, int], np.ndarray] = {}
+
+        # Way or relation to its building, road matcher, and figures.  Roads
+        # are still constructed by every constructor: they keep flung points and
+        # are changed while connecting them to each other.
+        self.lines: dict[tuple[bool, int], LineParameters] = {}
+
+        # Tags and already processed tag keys to icon set, priority, labels,
+        # and tag keys processed while construction.
+        self.points: dict[
+            tuple[frozenset, frozenset],
+            tuple[Optional[IconSet], int, list[Label], frozenset],
+        ] = {}
 
 
 class Constructor:
@@ -158,13 +231,25 @@ class Constructor:
         flinger: Flinger,
         extractor: ShapeExtractor,
         configuration: MapConfiguration,
+        cache: Optional[ConstructionCache] = None,
     ) -> None:
+        """
+        :param osm_data: OpenStreetMap data
+        :param flinger: flinger that remap geo positions
+        :param extractor: icon extractor
+        :param configuration: drawing configuration
+        :param cache: construction results shared with other constructors for
+            the same OpenStreetMap data and drawing configuration
+        """
         self.osm_data: OSMData = osm_data
         self.flinger: Flinger = flinger
         self.scheme: Scheme = configuration.scheme
         self.extractor: ShapeExtractor = extractor
         self.configuration: MapConfiguration = configuration
         self.text_constructor: TextConstructor = TextConstructor(self.scheme)
+        self.cache: ConstructionCache = (
+            cache if cache is not None else ConstructionCache()
+        )
 
         if self.configuration.level == "all":
             self.check_level = lambda x: True
@@ -193,12 +278,55 @@ class Constructor:
         self.heights.add(building.height)
         self.heights.add(building.min_height)
 
+    def get_point_parameters(
+        self, tags: Tags, processed: set[str]
+    ) -> tuple[Optional[IconSet], int, list[Label]]:
+        """
+        Get icon set, its priority, and labels for the point described by
+        tags.  Update processed tag keys.
+
+        :param tags: OpenStreetMap element tags
+        :param processed: already processed tag keys
+        """
+        key: tuple[frozenset, frozenset] = (
+            frozenset(tags.items()),
+            frozenset(processed),
+        )
+        labels: list[Label] = []
+        if key in self.cache.points:
+            icon_set, priority, labels, added = self.cache.points[key]
+            processed |= added
+            return icon_set, priority, labels
+
+        initial_processed: frozenset = key[1]
+        icon_set, priority = self.configuration.get_icon(
+            self.extractor, tags, processed
+        )
+        if icon_set is not None:
+            labels = self.text_constructor.construct_text(
+                tags, processed, self.configuration.label_mode
+            )
+        self.cache.points[key] = (
+            icon_set,
+            priority,
+            labels,
+            frozenset(processed - initial_processed),
+        )
+        return icon_set, priority, labels
+
     def construct(self) -> None:
         """Construct nodes, ways, and relations."""
         self.construct_ways()
         self.construct_relations()
         self.construct_nodes()
 
+        for name, statistics in self.scheme.get_cache_statistics().items():
+            logging.debug(
+                f"Scheme {name} cache: {statistics['hits']} hits, "
+                f"{statistics['misses']} misses, "
+                f"{statistics['evictions']} evictions."
+            )
+
     def construct_ways(self) -> None:
         """Construct Map Machine ways."""
         logging.info("Constructing ways...")
@@ -227,7 +355,10 @@ class Constructor:
         if not self.check_level(line.tags):
             return
 
-        center_point, _ = line_center(outers[0], self.flinger)
+        key: tuple[bool, int] = (isinstance(line, OSMRelation), line.id_)
+        if key not in self.cache.centers:
+            self.cache.centers[key] = get_center(outers[0])
+        center_point: np.ndarray = self.flinger.fling(self.cache.centers[key])
         if self.configuration.is_wireframe():
             # Dead code to make insensitive static analysis happy.
             color: Color = self.scheme.get_default_color()
@@ -254,22 +385,91 @@ class Constructor:
         if not line.tags:
             return
 
+        is_cached: bool = key in self.cache.lines
+        if not is_cached:
+            self.cache.lines[key] = self.get_line_parameters(
+                line, inners, outers
+            )
+        parameters: LineParameters = self.cache.lines[key]
+
+        if parameters.building is not None:
+            self.add_building(
+                parameters.building.fling(self.flinger)
+                if is_cached
+                else parameters.building
+            )
+
+        if parameters.road_matcher:
+            road: Road = Road(
+                line.tags,
+                outers[0],
+                parameters.road_matcher,
+                self.flinger,
+                self.scheme,
+            )
+            self.roads.append(road)
+            return
+
+        processed: set[str] = set(parameters.processed)
+
+        for figure, is_area in parameters.figures:
+            self.figures.append(figure)
+            if not is_area:
+                continue
+
+            priority: int
+            icon_set: IconSet
+            labels: list[Label]
+            icon_set, priority, labels = self.get_point_parameters(
+                line.tags, processed
+            )
+            if icon_set is not None:
+                point: Point = Point(
+                    icon_set,
+                    labels,
+                    line.tags,
+                    processed,
+                    center_point,
+                    is_for_node=False,
+                    priority=priority,
+                    add_tooltips=self.configuration.show_tooltips,
+                    use_symbols=self.configuration.use_symbols,
+                    alternative_positions=(
+                        self.configuration.alternative_positions
+                    ),
+                )
+                self.points.append(point)
+
+        # TODO: probably we may want to skip the next part if `line_styles`
+        # are not empty.
+        self.add_point_for_line(center_point, inners, line, outers)
+
+    def get_line_parameters(
+        self,
+        line: Union[OSMWay, OSMRelation],
+        inners: list[list[OSMNode]],
+        outers: list[list[OSMNode]],
+    ) -> LineParameters:
+        """
+        Construct building, road matcher, and figures for way or relation.
+
+        :param line: OpenStreetMap way or relation
+        :param inners: list of polygons that compose inner boundary
+        :param outers: list of polygons that compose outer boundary
+        """
+        building: Optional[Building] = None
         building_mode: BuildingMode = self.configuration.building_mode
         if "building" in line.tags or (
             building_mode == BuildingMode.ISOMETRIC
             and "building:part" in line.tags
         ):
-            self.add_building(
-                Building(line.tags, inners, outers, self.flinger, self.scheme)
+            building = Building(
+                line.tags, inners, outers, self.flinger, self.scheme
             )
 
         road_matcher: RoadMatcher = self.scheme.get_road(line.tags)
         if road_matcher:
-            road: Road = Road(
-                line.tags, outers[0], road_matcher, self.flinger, self.scheme
-            )
-            self.roads.append(road)
-            return
+            return LineParameters(building, road_matcher, [], frozenset())
 
         processed: set[str] = set()
 
@@ -282,6 +482,7 @@ class Constructor:
                     processed.add(color_tag_key)
 
         line_styles: list[LineStyle] = self.scheme.get_style(line.tags)
+        figures: list[tuple[StyledFigure, bool]] = []
 
         for line_style in line_styles:
             if recolor is not None:
@@ -293,44 +494,18 @@ class Constructor:
                     new_style, line_style.parallel_offset, line_style.priority
                 )
 
-            self.figures.append(
-                StyledFigure(line.tags, inners, outers, line_style)
-            )
-            if not (
+            is_area: bool = (
                 line.get_tag("area") == "yes"
                 or line.get_tag("type") == "multipolygon"
                 or is_cycle(outers[0])
                 and line.get_tag("area") != "no"
                 and self.scheme.is_area(line.tags)
-            ):
-                continue
-
-            priority: int
-            icon_set: IconSet
-            icon_set, priority = self.configuration.get_icon(
-                self.extractor, line.tags, processed
             )
-            if icon_set is not None:
-                labels: list[Label] = self.text_constructor.construct_text(
-                    line.tags,
-                    processed,
-                    self.configuration.label_mode,
-                )
-                point: Point = Point(
-                    icon_set,
-                    labels,
-                    line.tags,
-                    processed,
-                    center_point,
-                    is_for_node=False,
-                    priority=priority,
-                    add_tooltips=self.configuration.show_tooltips,
-                )
-                self.points.append(point)
+            figures.append(
+                (StyledFigure(line.tags, inners, outers, line_style), is_area)
+            )
 
-        # TODO: probably we may want to skip the next part if `line_styles`
-        # are not empty.
-        self.add_point_for_line(center_point, inners, line, outers)
+        return LineParameters(building, None, figures, frozenset(processed))
 
     def add_point_for_line(self, center_point, inners, line, outers) -> None:
         """Add icon at the center point of the way or relation."""
@@ -348,13 +523,11 @@ class Constructor:
         processed: set[str] = set()
         priority: int
         icon_set: IconSet
-        icon_set, priority = self.configuration.get_icon(
-            self.extractor, line.tags, processed
+        labels: list[Label]
+        icon_set, priority, labels = self.get_point_parameters(
+            line.tags, processed
         )
         if icon_set is not None:
-            labels: list[Label] = self.text_constructor.construct_text(
-                line.tags, processed, self.configuration.label_mode
-            )
             point: Point = Point(
                 icon_set,
                 labels,
@@ -364,6 +537,8 @@ class Constructor:
                 is_for_node=False,
                 priority=priority,
                 add_tooltips=self.configuration.show_tooltips,
+                use_symbols=self.configuration.use_symbols,
+                alternative_positions=self.configuration.alternative_positions,
             )
             self.points.append(point)
 
@@ -406,8 +581,14 @@ class Constructor:
                     else:
                         logging.warning(f'Unknown member role "{member.role}".')
             if outer_ways:
-                inners_path: list[list[OSMNode]] = glue(inner_ways)
-                outers_path: list[list[OSMNode]] = glue(outer_ways)
+                if relation_id not in self.cache.relation_paths:
+                    self.cache.relation_paths[relation_id] = (
+                        glue(inner_ways),
+                        glue(outer_ways),
+                    )
+                inners_path, outers_path = self.cache.relation_paths[
+                    relation_id
+                ]
                 self.construct_line(relation, inners_path, outers_path)
 
     def construct_nodes(self) -> None:
@@ -467,6 +648,8 @@ class Constructor:
                 flung,
                 draw_outline=False,
                 add_tooltips=self.configuration.show_tooltips,
+                use_symbols=self.configuration.use_symbols,
+                alternative_positions=self.configuration.alternative_positions,
             )
             self.points.append(point)
             return
@@ -493,19 +676,17 @@ class Constructor:
                 processed,
                 flung,
                 add_tooltips=self.configuration.show_tooltips,
+                use_symbols=self.configuration.use_symbols,
+                alternative_positions=self.configuration.alternative_positions,
             )
             self.points.append(point)
             return
 
-        icon_set, priority = self.configuration.get_icon(
-            self.extractor, tags, processed
-        )
+        labels: list[Label]
+        icon_set, priority, labels = self.get_point_parameters(tags, processed)
         if icon_set is None:
             return
 
-        labels: list[Label] = self.text_constructor.construct_text(
-            tags, processed, self.configuration.label_mode
-        )
         self.scheme.process_ignored(tags, processed)
 
         if node.get_tag("natural") == "tree" and (
@@ -529,6 +710,8 @@ class Constructor:
             priority=priority,
             draw_outline=draw_outline,
             add_tooltips=self.configuration.show_tooltips,
+            use_symbols=self.configuration.use_symbols,
+            alternative_positions=self.configuration.alternative_positions,
         )
         self.points.append(point)
 
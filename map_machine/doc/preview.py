@@ -5,9 +5,9 @@ from pathlib import Path
 from typing import Optional
 
 import numpy as np
-import svgwrite
 
 from map_machine.constructor import Constructor
+from map_machine.drawing import SVGDrawing
 from map_machine.geometry.boundary_box import BoundaryBox
 from map_machine.geometry.flinger import MercatorFlinger
 from map_machine.map_configuration import (
@@ -54,13 +54,11 @@ def draw(
     )
     constructor.construct()
 
-    svg: svgwrite.Drawing = svgwrite.Drawing(
-        str(output_file_name), size=flinger.size
-    )
-    map_: Map = Map(flinger, svg, configuration)
+    drawing: SVGDrawing = SVGDrawing(output_file_name, *flinger.size)
+    map_: Map = Map(flinger, drawing, configuration)
     map_.draw(constructor)
 
-    svg.write(output_file_name.open("w"))
+    drawing.write()
 
 
 def draw_around_point(
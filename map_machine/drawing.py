@@ -1,7 +1,12 @@
 """Drawing utility."""
+import io
+import logging
+import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, Optional, TextIO, Union
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
 
 import cairo
 import numpy as np
@@ -12,6 +17,7 @@ from svgwrite.base import BaseElement
 from svgwrite.path import Path as SVGPath
 from svgwrite.shapes import Rect
 from svgwrite.text import Text
+from svgwrite.utils import strlist
 
 __author__ = "Sergey Vartanov"
 __email__ = "me@enzet.ru"
@@ -20,6 +26,53 @@ PathCommands = list[Union[float, str, np.ndarray]]
 
 DEFAULT_FONT: str = "Helvetica"
 
+# Presentation attributes that are inherited by SVG element children.
+INHERITED_ATTRIBUTES: set[str] = {
+    "fill",
+    "fill-opacity",
+    "fill-rule",
+    "font-family",
+    "font-size",
+    "font-weight",
+    "stroke",
+    "stroke-dasharray",
+    "stroke-linecap",
+    "stroke-linejoin",
+    "stroke-opacity",
+    "stroke-width",
+    "text-anchor",
+}
+PATH_TOKEN_PATTERN: re.Pattern = re.compile(
+    r"[MmZzLlHhVvCcSsQqTtAa]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+)
+PATH_ARGUMENTS: dict[str, int] = {
+    "m": 2, "z": 0, "l": 2, "h": 1, "v": 1, "c": 6, "s": 4, "q": 4, "t": 2,
+    "a": 7,
+}  # fmt: skip
+TRANSFORM_PATTERN: re.Pattern = re.compile(r"(\w+)\s*\(([^)]*)\)")
+# Attributes that change rendering but are not supported by `PNGDrawing`.
+UNSUPPORTED_ATTRIBUTES: list[str] = ["filter", "clip-path", "mask"]
+LINE_CAPS: dict[str, Any] = {
+    "butt": cairo.LINE_CAP_BUTT,
+    "round": cairo.LINE_CAP_ROUND,
+    "square": cairo.LINE_CAP_SQUARE,
+}
+LINE_JOINS: dict[str, Any] = {
+    "miter": cairo.LINE_JOIN_MITER,
+    "round": cairo.LINE_JOIN_ROUND,
+    "bevel": cairo.LINE_JOIN_BEVEL,
+}
+# Characters that are escaped in XML attribute values in addition to `&`, `<`,
+# and `>`, the same as in `xml.etree.ElementTree`.
+ATTRIBUTE_ENTITIES: dict[str, str] = {
+    '"': "&quot;",
+    "\r": "&#13;",
+    "\n": "&#10;",
+    "\t": "&#09;",
+}
+ESCAPED_CHARACTERS: re.Pattern = re.compile('[&<>"\r\n\t]')
+XML_DECLARATION: str = '<?xml version="1.0" encoding="utf-8" ?>\n'
+
 
 @dataclass
 class Style:
@@ -59,10 +112,27 @@ class Style:
 class Drawing:
     """Image."""
 
-    def __init__(self, file_path: Path, width: int, height: int) -> None:
+    def __init__(self, file_path: Path, width: float, height: float) -> None:
         self.file_path: Path = file_path
-        self.width: int = width
-        self.height: int = height
+        self.width: float = width
+        self.height: float = height
+        self.definitions: dict[str, BaseElement] = {}
+
+    def add(self, element: BaseElement) -> None:
+        """Draw SVG element."""
+        raise NotImplementedError
+
+    def add_definition(self, element: BaseElement) -> BaseElement:
+        """
+        Add SVG element that is not drawn but may be referenced by other
+        elements, e.g. gradient, filter, or shape.
+        """
+        self.definitions[element.get_id()] = element
+        return element
+
+    def has_definition(self, id_: str) -> bool:
+        """Check whether element with the identifier is already defined."""
+        return id_ in self.definitions
 
     def rectangle(
         self, point_1: np.ndarray, point_2: np.ndarray, style: Style
@@ -92,12 +162,21 @@ class Drawing:
 class SVGDrawing(Drawing):
     """SVG image."""
 
-    def __init__(self, file_path: Path, width: int, height: int) -> None:
+    def __init__(self, file_path: Path, width: float, height: float) -> None:
         super().__init__(file_path, width, height)
         self.image: svgwrite.Drawing = svgwrite.Drawing(
             str(file_path), (width, height)
         )
 
+    def add(self, element: BaseElement) -> None:
+        """Add SVG element to the image."""
+        self.image.add(element)
+
+    def add_definition(self, element: BaseElement) -> BaseElement:
+        """Add SVG element to the image definitions."""
+        super().add_definition(element)
+        return self.image.defs.add(element)
+
     def rectangle(
         self, point_1: np.ndarray, point_2: np.ndarray, style: Style
     ) -> None:
@@ -108,7 +187,7 @@ class SVGDrawing(Drawing):
             (float(size[0]), float(size[1])),
         )
         style.update_svg_element(rectangle)
-        self.image.add(rectangle)
+        self.add(rectangle)
 
     def line(self, points: list[np.ndarray], style: Style) -> None:
         """Draw line."""
@@ -121,31 +200,609 @@ class SVGDrawing(Drawing):
         """Draw path."""
         path: SVGPath = SVGPath(d=commands)
         style.update_svg_element(path)
-        self.image.add(path)
+        self.add(path)
 
     def text(
         self, text: str, point: np.ndarray, color: Color = Color("black")
     ) -> None:
         """Draw text."""
-        self.image.add(
-            Text(text, (float(point[0]), float(point[1])), fill=color)
-        )
+        self.add(Text(text, (float(point[0]), float(point[1])), fill=color))
 
     def write(self) -> None:
         """Write image to the SVG file."""
         with self.file_path.open("w+", encoding="utf-8") as output_file:
             self.image.write(output_file)
 
+    def get_content(self) -> bytes:
+        """Get SVG file content without writing it to the disk."""
+        output: io.StringIO = io.StringIO()
+        self.image.write(output)
+        return output.getvalue().encode("utf-8")
+
+
+class SVGStreamDrawing(SVGDrawing):
+    """
+    SVG image that is written without building XML tree and without attribute
+    validation.
+
+    Elements are serialized as soon as they are added, so they should not be
+    changed after that.  Definitions are serialized with the whole image, so
+    they may be changed, e.g. gradient stops may be added after the gradient
+    definition.  The output is the same as for `SVGDrawing`.
+    """
+
+    def __init__(self, file_path: Path, width: float, height: float) -> None:
+        super().__init__(file_path, width, height)
+        self.buffer: io.StringIO = io.StringIO()
+
+    def add(self, element: BaseElement) -> None:
+        """Serialize SVG element."""
+        write_element(element, self.buffer)
+
+    def write(self) -> None:
+        """Write image to the SVG file."""
+        self.file_path.write_bytes(self.get_content())
+
+    def get_content(self) -> bytes:
+        """Get SVG file content without writing it to the disk."""
+        # Image contains only definitions, so the closing tag is the last one.
+        image: str = self.image.tostring()
+        closing_tag: str = "</svg>"
+        return (
+            XML_DECLARATION
+            + image[: -len(closing_tag)]
+            + self.buffer.getvalue()
+            + closing_tag
+        ).encode("utf-8")
+
+
+def write_element(element: BaseElement, output: TextIO) -> None:
+    """
+    Write SVG element and its children in XML form the same way as svgwrite
+    does, but without attribute validation.
+
+    :param element: SVG element
+    :param output: output text stream
+    """
+    if not isinstance(element, BaseElement):
+        # Title and description elements are stored as XML elements.
+        output.write(
+            ElementTree.tostring(element.get_xml(), encoding="unicode")
+        )
+        return
+
+    if isinstance(element, SVGPath):
+        element.attribs["d"] = str(strlist(element.commands, " "))
+    elif hasattr(element, "update_id"):
+        element.update_id()
+
+    name: str = element.elementname
+    output.write(f"<{name}")
+    for key, value in sorted(element.attribs.items()):
+        if value is None:
+            continue
+        text: str = str(value)
+        if text:
+            if ESCAPED_CHARACTERS.search(text):
+                text = escape(text, ATTRIBUTE_ENTITIES)
+            output.write(f' {key}="{text}"')
+
+    text_value: Any = getattr(element, "text", None)
+    content: str = "" if text_value is None else str(text_value)
+    if not content and not element.elements:
+        output.write(" />")
+        return
+
+    output.write(f">{escape(content)}")
+    for child in element.elements:
+        write_element(child, output)
+    output.write(f"</{name}>")
+
 
 class PNGDrawing(Drawing):
-    """PNG image."""
+    """
+    PNG image.
+
+    SVG elements are drawn directly on the cairo surface without SVG
+    serialization.  Only the SVG features used by the map are supported:
+    groups, paths, rectangles, circles, texts (including texts along paths),
+    references to definitions, transformations, and radial gradients.  Other
+    elements and attributes, e.g. filters, are ignored with a warning.
+    """
 
-    def __init__(self, file_path: Path, width: int, height: int) -> None:
+    def __init__(self, file_path: Path, width: float, height: float) -> None:
         super().__init__(file_path, width, height)
         self.surface: ImageSurface = ImageSurface(
-            cairo.FORMAT_ARGB32, width, height
+            cairo.FORMAT_ARGB32, int(width), int(height)
         )
         self.context: Context = Context(self.surface)
+        self.colors: dict[str, Color] = {}
+
+        # Drawn elements that may be referenced by text paths.
+        self.references: dict[str, BaseElement] = {}
+
+        # Unsupported features that are already reported.
+        self.warnings: set[str] = set()
+
+    def add(self, element: BaseElement) -> None:
+        """Draw SVG element on the surface."""
+        self.draw_element(element, {})
+
+    def draw_element(
+        self, element: BaseElement, inherited: dict[str, Any]
+    ) -> None:
+        """
+        Draw SVG element with its children.
+
+        :param element: SVG element
+        :param inherited: presentation attributes of the parent elements
+        """
+        attributes: dict[str, Any] = element.attribs
+        style: dict[str, Any] = inherited | {
+            key: value
+            for key, value in attributes.items()
+            if key in INHERITED_ATTRIBUTES
+        }
+        opacity: float = float(attributes.get("opacity", 1.0))
+
+        if "id" in attributes:
+            self.references[attributes["id"]] = element
+        for key in UNSUPPORTED_ATTRIBUTES:
+            if key in attributes:
+                self.warn(f"attribute `{key}`")
+
+        self.context.save()
+        if "transform" in attributes:
+            self.transform(attributes["transform"])
+        if opacity < 1.0:
+            self.context.push_group()
+
+        name: str = element.elementname
+        if name == "g":
+            for child in element.elements:
+                # Title and description elements are not drawn.
+                if isinstance(child, BaseElement):
+                    self.draw_element(child, style)
+        elif name == "path":
+            self.draw_path_data(str(strlist(element.commands, " ")))
+            self.paint(style)
+        elif name == "rect":
+            self.context.rectangle(
+                float(attributes.get("x", 0.0)),
+                float(attributes.get("y", 0.0)),
+                float(attributes["width"]),
+                float(attributes["height"]),
+            )
+            self.paint(style)
+        elif name == "circle":
+            self.context.arc(
+                float(attributes["cx"]),
+                float(attributes["cy"]),
+                float(attributes["r"]),
+                0.0,
+                2.0 * np.pi,
+            )
+            self.paint(style)
+        elif name == "text":
+            if element.text:
+                self.draw_text_element(element, style)
+            for child in element.elements:
+                if not isinstance(child, BaseElement):
+                    continue
+                if child.elementname == "textPath":
+                    self.draw_text_path(child, style)
+                else:
+                    self.warn(f"element `{child.elementname}` in text")
+        elif name == "use":
+            reference: Optional[BaseElement] = self.definitions.get(
+                attributes["xlink:href"][1:]
+            )
+            if reference is not None:
+                self.draw_element(reference, style)
+        else:
+            self.warn(f"element `{name}`")
+
+        if opacity < 1.0:
+            self.context.pop_group_to_source()
+            self.context.paint_with_alpha(opacity)
+        self.context.restore()
+
+    def warn(self, feature: str) -> None:
+        """Report unsupported SVG feature once per image."""
+        if feature not in self.warnings:
+            self.warnings.add(feature)
+            logging.warning(
+                f"SVG {feature} is not supported for PNG drawing and ignored."
+            )
+
+    def transform(self, transform: str) -> None:
+        """Apply SVG transformation list to the context."""
+        for function, text in TRANSFORM_PATTERN.findall(transform):
+            values: list[float] = [
+                float(x) for x in re.split(r"[\s,]+", text.strip()) if x
+            ]
+            if function == "translate":
+                self.context.translate(
+                    values[0], values[1] if len(values) > 1 else 0.0
+                )
+            elif function == "scale":
+                self.context.scale(values[0], values[-1])
+            elif function == "rotate":
+                if len(values) == 3:
+                    self.context.translate(values[1], values[2])
+                self.context.rotate(np.radians(values[0]))
+                if len(values) == 3:
+                    self.context.translate(-values[1], -values[2])
+            elif function == "matrix":
+                self.context.transform(cairo.Matrix(*values))
+
+    def get_color(self, value: Any) -> Color:
+        """Parse SVG color value."""
+        text: str = str(value)
+        if text not in self.colors:
+            self.colors[text] = Color(text)
+        return self.colors[text]
+
+    def set_source(self, value: Any, opacity: float) -> bool:
+        """
+        Set SVG paint (color or gradient reference) as the context source.
+
+        :param value: SVG paint value
+        :param opacity: paint opacity
+        :return: false if there is nothing to paint
+        """
+        if value is None or value == "none":
+            return False
+
+        if isinstance(value, str) and value.startswith("url(#"):
+            gradient: Optional[BaseElement] = self.definitions.get(value[5:-1])
+            if gradient is None or gradient.elementname != "radialGradient":
+                return False
+            attributes: dict[str, Any] = gradient.attribs
+            center: tuple[float, float] = (
+                float(attributes.get("cx", 0.0)),
+                float(attributes.get("cy", 0.0)),
+            )
+            pattern: cairo.RadialGradient = cairo.RadialGradient(
+                *center, 0.0, *center, float(attributes.get("r", 0.0))
+            )
+            for stop in gradient.elements:
+                stop_color: Color = self.get_color(stop.attribs["stop-color"])
+                pattern.add_color_stop_rgba(
+                    float(stop.attribs["offset"]),
+                    stop_color.get_red(),
+                    stop_color.get_green(),
+                    stop_color.get_blue(),
+                    float(stop.attribs.get("stop-opacity", 1.0)) * opacity,
+                )
+            self.context.set_source(pattern)
+            return True
+
+        color: Color = self.get_color(value)
+        self.context.set_source_rgba(
+            color.get_red(), color.get_green(), color.get_blue(), opacity
+        )
+        return True
+
+    def paint(self, style: dict[str, Any]) -> None:
+        """Fill and stroke the current path using SVG style."""
+        if style.get("fill-rule") == "evenodd":
+            self.context.set_fill_rule(cairo.FILL_RULE_EVEN_ODD)
+        if self.set_source(
+            style.get("fill", "black"), float(style.get("fill-opacity", 1.0))
+        ):
+            self.context.fill_preserve()
+
+        width: float = float(style.get("stroke-width", 1.0))
+        if width > 0.0 and self.set_source(
+            style.get("stroke"), float(style.get("stroke-opacity", 1.0))
+        ):
+            self.context.set_line_width(width)
+            self.context.set_line_cap(
+                LINE_CAPS[str(style.get("stroke-linecap", "butt"))]
+            )
+            self.context.set_line_join(
+                LINE_JOINS[str(style.get("stroke-linejoin", "miter"))]
+            )
+            dash: Any = style.get("stroke-dasharray", "none")
+            if dash != "none":
+                self.context.set_dash(
+                    [float(x) for x in re.split(r"[\s,]+", str(dash)) if x]
+                )
+            self.context.stroke_preserve()
+
+        self.context.new_path()
+
+    def set_font(self, style: dict[str, Any]) -> None:
+        """Select font of the context using SVG style."""
+        self.context.select_font_face(
+            str(style.get("font-family", DEFAULT_FONT)),
+            cairo.FONT_SLANT_NORMAL,
+            cairo.FONT_WEIGHT_BOLD
+            if style.get("font-weight") == "bold"
+            else cairo.FONT_WEIGHT_NORMAL,
+        )
+        self.context.set_font_size(float(style.get("font-size", 16.0)))
+
+    def get_advance(self, text: str) -> float:
+        """Get horizontal advance of the text drawn with the current font."""
+        # Text extents are a tuple in both pycairo and cairocffi, but only
+        # pycairo names its fields.
+        return self.context.text_extents(text)[4]
+
+    def draw_text_element(
+        self, element: BaseElement, style: dict[str, Any]
+    ) -> None:
+        """Draw SVG text element as a path."""
+        self.set_font(style)
+
+        x: float = float(str(element.attribs.get("x", 0.0)).split()[0])
+        y: float = float(str(element.attribs.get("y", 0.0)).split()[0])
+        anchor: str = style.get("text-anchor", "start")
+        if anchor in ["middle", "end"]:
+            advance: float = self.get_advance(element.text)
+            x -= advance / 2.0 if anchor == "middle" else advance
+
+        self.context.move_to(x, y)
+        self.context.text_path(element.text)
+        self.paint(style)
+
+    def draw_text_path(
+        self, element: BaseElement, style: dict[str, Any]
+    ) -> None:
+        """
+        Draw SVG text path element: place every character at the point of the
+        referenced path and rotate it along the path.
+
+        :param element: SVG text path element
+        :param style: presentation attributes of the text element
+        """
+        style = style | {
+            key: value
+            for key, value in element.attribs.items()
+            if key in INHERITED_ATTRIBUTES
+        }
+        path: Optional[BaseElement] = self.references.get(
+            element.attribs["xlink:href"][1:]
+        )
+        if path is None or path.elementname != "path":
+            self.warn("text path without drawn path")
+            return
+        if not element.text:
+            return
+
+        self.context.new_path()
+        self.draw_path_data(str(strlist(path.commands, " ")))
+        points: list[np.ndarray] = [
+            np.array(point)
+            for type_, point in self.context.copy_path_flat()
+            if type_ != cairo.PATH_CLOSE_PATH
+        ]
+        self.context.new_path()
+        if len(points) < 2:
+            return
+
+        lengths: np.ndarray = np.cumsum(
+            [0.0] + [np.linalg.norm(y - x) for x, y in zip(points, points[1:])]
+        )
+        self.set_font(style)
+        advances: list[float] = [self.get_advance(x) for x in element.text]
+
+        offset: float = 0.0
+        start_offset: str = str(element.attribs.get("startOffset", "0"))
+        if start_offset.endswith("%"):
+            offset = float(start_offset[:-1]) / 100.0 * lengths[-1]
+        else:
+            offset = float(start_offset)
+        anchor: str = style.get("text-anchor", "start")
+        if anchor in ["middle", "end"]:
+            offset -= sum(advances) / (2.0 if anchor == "middle" else 1.0)
+
+        for character, advance in zip(element.text, advances):
+            middle: float = offset + advance / 2.0
+            offset += advance
+            # Characters outside the path are not drawn.
+            if middle < 0.0 or middle > lengths[-1]:
+                continue
+            index: int = min(
+                int(np.searchsorted(lengths, middle, side="right")) - 1,
+                len(points) - 2,
+            )
+            direction: np.ndarray = points[index + 1] - points[index]
+            length: float = lengths[index + 1] - lengths[index]
+            point: np.ndarray = points[index] + (
+                direction * (middle - lengths[index]) / length
+                if length
+                else 0.0
+            )
+            self.context.save()
+            self.context.translate(*point)
+            self.context.rotate(np.arctan2(direction[1], direction[0]))
+            self.context.move_to(-advance / 2.0, 0.0)
+            self.context.text_path(character)
+            self.context.restore()
+
+        self.paint(style)
+
+    def draw_path_data(self, path_data: str) -> None:
+        """Add SVG path data to the current path."""
+        tokens: list[str] = PATH_TOKEN_PATTERN.findall(path_data)
+
+        current: np.ndarray = np.zeros(2)
+        start: np.ndarray = np.zeros(2)
+        # Last control point of the previous cubic ("c") or quadratic ("q")
+        # Bézier curve to be reflected by the following smooth curve.
+        control: Optional[np.ndarray] = None
+        control_type: str = ""
+        command: str = "M"
+        index: int = 0
+
+        while index < len(tokens):
+            if tokens[index].isalpha():
+                command = tokens[index]
+                index += 1
+                if command in "Zz":
+                    self.context.close_path()
+                    current = start
+                    control, control_type = None, ""
+                    continue
+
+            lower: str = command.lower()
+            number: int = PATH_ARGUMENTS[lower]
+            if index + number > len(tokens):
+                break
+            values: list[float] = [
+                float(x) for x in tokens[index : index + number]
+            ]
+            index += number
+
+            is_relative: bool = command == lower
+            base: np.ndarray = current if is_relative else np.zeros(2)
+            previous_control: Optional[np.ndarray] = control
+            previous_control_type: str = control_type
+            control, control_type = None, ""
+
+            if lower == "m":
+                current = base + values
+                start = current
+                self.context.move_to(*current)
+                # Following coordinate pairs are line commands.
+                command = "l" if is_relative else "L"
+            elif lower == "l":
+                current = base + values
+                self.context.line_to(*current)
+            elif lower == "h":
+                current = np.array(
+                    (
+                        values[0] + (current[0] if is_relative else 0.0),
+                        current[1],
+                    )
+                )
+                self.context.line_to(*current)
+            elif lower == "v":
+                current = np.array(
+                    (
+                        current[0],
+                        values[0] + (current[1] if is_relative else 0.0),
+                    )
+                )
+                self.context.line_to(*current)
+            elif lower in "cs":
+                point_1: np.ndarray
+                if lower == "c":
+                    point_1 = base + values[0:2]
+                    values = values[2:]
+                elif (
+                    previous_control is not None
+                    and previous_control_type == "c"
+                ):
+                    point_1 = 2.0 * current - previous_control
+                else:
+                    point_1 = current
+                point_2: np.ndarray = base + values[0:2]
+                point_3: np.ndarray = base + values[2:4]
+                self.context.curve_to(*point_1, *point_2, *point_3)
+                current = point_3
+                control, control_type = point_2, "c"
+            elif lower in "qt":
+                quadratic: np.ndarray
+                if lower == "q":
+                    quadratic = base + values[0:2]
+                    values = values[2:]
+                elif (
+                    previous_control is not None
+                    and previous_control_type == "q"
+                ):
+                    quadratic = 2.0 * current - previous_control
+                else:
+                    quadratic = current
+                end: np.ndarray = base + values[0:2]
+                self.context.curve_to(
+                    *(current + 2.0 / 3.0 * (quadratic - current)),
+                    *(end + 2.0 / 3.0 * (quadratic - end)),
+                    *end,
+                )
+                current = end
+                control, control_type = quadratic, "q"
+            elif lower == "a":
+                self.arc_to(current, values[0:5], base + values[5:7])
+                current = base + values[5:7]
+
+    def arc_to(
+        self, point_1: np.ndarray, parameters: list[float], point_2: np.ndarray
+    ) -> None:
+        """
+        Add SVG elliptical arc to the current path.
+
+        See https://www.w3.org/TR/SVG11/implnote.html#ArcImplementationNotes
+
+        :param point_1: arc start point
+        :param parameters: radii, x-axis rotation in degrees, large arc flag,
+            and sweep flag
+        :param point_2: arc end point
+        """
+        radius_x, radius_y = abs(parameters[0]), abs(parameters[1])
+        if radius_x == 0.0 or radius_y == 0.0:
+            self.context.line_to(*point_2)
+            return
+
+        angle: float = np.radians(parameters[2])
+        is_large: bool = parameters[3] != 0.0
+        is_sweep: bool = parameters[4] != 0.0
+
+        cos, sin = np.cos(angle), np.sin(angle)
+        delta: np.ndarray = (point_1 - point_2) / 2.0
+        x: float = cos * delta[0] + sin * delta[1]
+        y: float = -sin * delta[0] + cos * delta[1]
+
+        ratio: float = x**2 / radius_x**2 + y**2 / radius_y**2
+        if ratio > 1.0:
+            radius_x *= np.sqrt(ratio)
+            radius_y *= np.sqrt(ratio)
+
+        numerator: float = (
+            radius_x**2 * radius_y**2
+            - radius_x**2 * y**2
+            - radius_y**2 * x**2
+        )
+        denominator: float = radius_x**2 * y**2 + radius_y**2 * x**2
+        coefficient: float = (
+            np.sqrt(max(0.0, numerator / denominator)) if denominator else 0.0
+        )
+        if is_large == is_sweep:
+            coefficient = -coefficient
+        center_x: float = coefficient * radius_x * y / radius_y
+        center_y: float = -coefficient * radius_y * x / radius_x
+
+        center: np.ndarray = (point_1 + point_2) / 2.0 + np.array(
+            (
+                cos * center_x - sin * center_y,
+                sin * center_x + cos * center_y,
+            )
+        )
+        angle_1: float = np.arctan2(
+            (y - center_y) / radius_y, (x - center_x) / radius_x
+        )
+        angle_2: float = np.arctan2(
+            (-y - center_y) / radius_y, (-x - center_x) / radius_x
+        )
+        delta_angle: float = angle_2 - angle_1
+        if is_sweep and delta_angle < 0.0:
+            delta_angle += 2.0 * np.pi
+        elif not is_sweep and delta_angle > 0.0:
+            delta_angle -= 2.0 * np.pi
+
+        self.context.save()
+        self.context.translate(*center)
+        self.context.rotate(angle)
+        self.context.scale(radius_x, radius_y)
+        if is_sweep:
+            self.context.arc(0.0, 0.0, 1.0, angle_1, angle_1 + delta_angle)
+        else:
+            self.context.arc_negative(
+                0.0, 0.0, 1.0, angle_1, angle_1 + delta_angle
+            )
+        self.context.restore()
 
     def rectangle(
         self, point_1: np.ndarray, point_2: np.ndarray, style: Style
@@ -298,7 +955,7 @@ def parse_path(path: str) -> PathCommands:
 
 
 def draw_text(
-    svg: svgwrite.Drawing,
+    drawing: Drawing,
     text: str,
     point: np.ndarray,
     size: float,
@@ -310,7 +967,7 @@ def draw_text(
     opacity: float = 1.0,
 ):
     """Add text element to the canvas."""
-    text_element = svg.text(
+    text_element: Text = Text(
         text,
         point,
         font_size=size,
@@ -321,5 +978,6 @@ def draw_text(
         stroke_width=stroke_width,
         stroke=stroke.hex if stroke else "none",
         opacity=opacity,
+        debug=False,
     )
-    svg.add(text_element)
+    drawing.add(text_element)
@@ -2,10 +2,10 @@ import logging
 from pathlib import Path
 
 import numpy as np
-from svgwrite import Drawing
 from svgwrite.text import Text
 
 from map_machine.constructor import Constructor
+from map_machine.drawing import SVGDrawing
 from map_machine.geometry.flinger import Flinger, TranslateFlinger
 from map_machine.map_configuration import MapConfiguration
 from map_machine.mapper import Map
@@ -106,12 +106,12 @@ class Grid:
             np.array((self.x_step, self.y_step)),
             np.array((self.margin, self.margin)),
         )
-        svg: Drawing = Drawing(output_path.name, size)
+        drawing: SVGDrawing = SVGDrawing(output_path, size[0], size[1])
         constructor: Constructor = Constructor(
             self.osm_data, flinger, SHAPE_EXTRACTOR, configuration
         )
         constructor.construct()
-        map_: Map = Map(flinger, svg, configuration)
+        map_: Map = Map(flinger, drawing, configuration)
         map_.draw(constructor)
 
         for text, i, j in self.texts:
@@ -121,8 +121,7 @@ class Grid:
                 font_family="JetBrains Mono",
                 font_size=12,
             )
-            svg.add(text_element)
+            drawing.add(text_element)
 
-        with output_path.open("w") as output_file:
-            svg.write(output_file)
-            logging.info(f"Map is drawn to {output_path}.")
+        drawing.write()
+        logging.info(f"Map is drawn to {output_path}.")
@@ -1,16 +1,20 @@
 """Buildings on the map."""
+from copy import copy
+
 import numpy as np
-import svgwrite
 from colour import Color
-from svgwrite import Drawing
 from svgwrite.container import Group
 from svgwrite.path import Path
 
-from map_machine.drawing import PathCommands
+from map_machine.drawing import Drawing
 from map_machine.figure import Figure
 from map_machine.geometry.flinger import Flinger
-from map_machine.geometry.vector import Segment
-from map_machine.osm.osm_reader import OSMNode
+from map_machine.geometry.vector import PathEncoder, Segment
+from map_machine.osm.osm_reader import (
+    OSMNode,
+    Tagged,
+    get_projected_coordinates,
+)
 from map_machine.scheme import Scheme
 
 BUILDING_MINIMAL_HEIGHT: float = 8.0
@@ -19,6 +23,23 @@ LEVEL_HEIGHT: float = 2.5
 SHADE_SCALE: float = 0.4
 
 
+def get_building_height(building: Tagged) -> float:
+    """
+    Get height of the building or the building part in meters used to draw it.
+
+    :param building: OpenStreetMap element with building tags
+    """
+    height: float = BUILDING_MINIMAL_HEIGHT
+
+    if levels := building.get_float("building:levels"):
+        height = BUILDING_MINIMAL_HEIGHT + levels * LEVEL_HEIGHT
+
+    if length := building.get_length("height"):
+        height = BUILDING_MINIMAL_HEIGHT + length
+
+    return height
+
+
 class Building(Figure):
     """Building on the map."""
 
@@ -59,17 +80,9 @@ class Building(Figure):
             self.fill = scheme.get_color("building_color")
             self.stroke = scheme.get_color("building_border_color")
 
-        self.parts: list[Segment] = []
+        self.parts: list[Segment] = self.get_parts(flinger)
 
-        for nodes in self.inners + self.outers:
-            for i in range(len(nodes) - 1):
-                flung_1: np.ndarray = flinger.fling(nodes[i].coordinates)
-                flung_2: np.ndarray = flinger.fling(nodes[i + 1].coordinates)
-                self.parts.append(Segment(flung_1, flung_2))
-
-        self.parts = sorted(self.parts)
-
-        self.height: float = BUILDING_MINIMAL_HEIGHT
+        self.height: float = get_building_height(self)
         self.min_height: float = 0.0
 
         self.wall_default_color: Color
@@ -89,24 +102,50 @@ class Building(Figure):
         if color := tags.get("colour"):
             self.wall_color = scheme.get_color(color)
 
-        if levels := self.get_float("building:levels"):
-            self.height = BUILDING_MINIMAL_HEIGHT + levels * LEVEL_HEIGHT
-
         if levels := self.get_float("building:min_level"):
             self.min_height = BUILDING_MINIMAL_HEIGHT + levels * LEVEL_HEIGHT
 
-        if height := self.get_length("height"):
-            self.height = BUILDING_MINIMAL_HEIGHT + height
-
         if height := self.get_length("min_height"):
             self.min_height = BUILDING_MINIMAL_HEIGHT + height
 
+    def get_parts(self, flinger: Flinger) -> list[Segment]:
+        """
+        Get wall segments sorted by their central y coordinates.
+
+        :param flinger: converter for geo coordinates
+        """
+        parts: list[Segment] = []
+
+        for nodes in self.inners + self.outers:
+            flung: np.ndarray = flinger.fling_projected_many(
+                get_projected_coordinates(nodes)
+            )
+            for i in range(len(nodes) - 1):
+                parts.append(Segment(flung[i], flung[i + 1]))
+
+        return sorted(parts)
+
+    def fling(self, flinger: Flinger) -> "Building":
+        """
+        Get the same building for another flinger.  Only wall segments depend
+        on the flinger, all other attributes are shared with this building.
+
+        :param flinger: converter for geo coordinates
+        """
+        building: Building = copy(self)
+        building.parts = building.get_parts(flinger)
+        return building
+
     def draw(
-        self, svg: Drawing, flinger: Flinger, use_building_colors: bool
+        self,
+        drawing: Drawing,
+        flinger: Flinger,
+        use_building_colors: bool,
+        encoder: PathEncoder = PathEncoder(),
     ) -> None:
         """Draw simple building shape."""
         path: Path = Path(
-            d=self.get_path(flinger),
+            d=self.get_path(flinger, encoder=encoder),
             stroke=self.stroke.hex
             if use_building_colors
             else self.default_stroke.hex,
@@ -114,44 +153,64 @@ class Building(Figure):
             if use_building_colors
             else self.default_fill.hex,
             stroke_linejoin="round",
+            debug=False,
         )
-        svg.add(path)
+        drawing.add(path)
 
-    def draw_shade(self, building_shade: Group, flinger: Flinger) -> None:
+    def draw_shade(
+        self,
+        building_shade: Group,
+        flinger: Flinger,
+        encoder: PathEncoder = PathEncoder(),
+    ) -> None:
         """Draw shade cast by the building."""
         scale: float = flinger.get_scale() * SHADE_SCALE
         shift_1: np.ndarray = np.array((scale * self.min_height, 0.0))
         shift_2: np.ndarray = np.array((scale * self.height, 0.0))
-        commands: str = self.get_path(flinger, shift_1)
+        commands: str = self.get_path(flinger, shift_1, encoder)
         path: Path = Path(
-            commands, fill="#000000", stroke="#000000", stroke_width=1.0
+            commands,
+            fill="#000000",
+            stroke="#000000",
+            stroke_width=1.0,
+            debug=False,
         )
         building_shade.add(path)
         for nodes in self.inners + self.outers:
+            flung: np.ndarray = flinger.fling_projected_many(
+                get_projected_coordinates(nodes)
+            )
             for i in range(len(nodes) - 1):
-                flung_1 = flinger.fling(nodes[i].coordinates)
-                flung_2 = flinger.fling(nodes[i + 1].coordinates)
-                command: PathCommands = [
-                    "M",
-                    np.add(flung_1, shift_1),
-                    "L",
-                    np.add(flung_2, shift_1),
-                    np.add(flung_2, shift_2),
-                    np.add(flung_1, shift_2),
-                    "Z",
-                ]
+                flung_1: np.ndarray = flung[i]
+                flung_2: np.ndarray = flung[i + 1]
+                command: str = encoder.encode(
+                    np.array(
+                        (
+                            flung_1 + shift_1,
+                            flung_2 + shift_1,
+                            flung_2 + shift_2,
+                            flung_1 + shift_2,
+                        )
+                    ),
+                    is_closed=True,
+                )
                 path: Path = Path(
-                    command, fill="#000000", stroke="#000000", stroke_width=1.0
+                    command,
+                    fill="#000000",
+                    stroke="#000000",
+                    stroke_width=1.0,
+                    debug=False,
                 )
                 building_shade.add(path)
 
     def draw_walls(
         self,
-        svg: Drawing,
+        drawing: Drawing,
         height: float,
         previous_height: float,
         scale: float,
         use_building_colors: bool,
+        encoder: PathEncoder = PathEncoder(),
     ) -> None:
         """Draw building walls."""
         if not self.has_walls:
@@ -164,21 +223,23 @@ class Building(Figure):
 
         for segment in self.parts:
             draw_walls(
-                svg,
+                drawing,
                 self,
                 segment,
                 height,
                 shift_1,
                 shift_2,
                 use_building_colors,
+                encoder,
             )
 
     def draw_roof(
         self,
-        svg: Drawing,
+        drawing: Drawing,
         flinger: Flinger,
         scale: float,
         use_building_colors: bool,
+        encoder: PathEncoder = PathEncoder(),
     ) -> None:
         """Draw building roof."""
 
@@ -189,23 +250,27 @@ class Building(Figure):
 
         path: Path = Path(
             d=self.get_path(
-                flinger, np.array([0.0, -self.height * scale * BUILDING_SCALE])
+                flinger,
+                np.array([0.0, -self.height * scale * BUILDING_SCALE]),
+                encoder,
             ),
             stroke=stroke,
             fill="none" if self.is_construction else fill.hex,
             stroke_linejoin="round",
+            debug=False,
         )
-        svg.add(path)
+        drawing.add(path)
 
 
 def draw_walls(
-    svg: svgwrite.Drawing,
+    drawing: Drawing,
     building: Building,
     segment: Segment,
     height: float,
     shift_1: np.ndarray,
     shift_2: np.ndarray,
     use_building_colors: bool,
+    encoder: PathEncoder = PathEncoder(),
 ) -> None:
     """
     Draw walls for buildings as a quadrangle.
@@ -244,21 +309,23 @@ def draw_walls(
             )
         )
 
-    command: PathCommands = [
-        "M",
-        segment.point_1 + shift_1,
-        "L",
-        segment.point_2 + shift_1,
-        segment.point_2 + shift_2,
-        segment.point_1 + shift_2,
-        segment.point_1 + shift_1,
-        "Z",
-    ]
+    command: str = encoder.encode(
+        np.array(
+            (
+                segment.point_1 + shift_1,
+                segment.point_2 + shift_1,
+                segment.point_2 + shift_2,
+                segment.point_1 + shift_2,
+            )
+        ),
+        is_closed=True,
+    )
     path: Path = Path(
         d=command,
         fill=color.hex,
         stroke=color.hex,
         stroke_width=1,
         stroke_linejoin="round",
+        debug=False,
     )
-    svg.add(path)
+    drawing.add(path)
@@ -1,8 +1,10 @@
 """Crater on the map."""
 import numpy as np
 from colour import Color
-from svgwrite import Drawing
+from svgwrite.gradients import RadialGradient
+from svgwrite.shapes import Circle
 
+from map_machine.drawing import Drawing
 from map_machine.geometry.flinger import Flinger
 from map_machine.osm.osm_reader import Tagged
 
@@ -17,28 +19,28 @@ class Crater(Tagged):
         self.coordinates: np.ndarray = coordinates
         self.point: np.ndarray = point
 
-    def draw(self, svg: Drawing, flinger: Flinger) -> None:
+    def draw(self, drawing: Drawing, flinger: Flinger) -> None:
         """Draw crater ridge."""
         scale: float = flinger.get_scale(self.coordinates)
         assert "diameter" in self.tags
         radius: float = float(self.tags["diameter"]) / 2.0
-        radial_gradient = svg.radialGradient(
+        radial_gradient = RadialGradient(
             center=self.point + np.array((0.0, radius * scale / 7.0)),
             r=radius * scale,
             gradientUnits="userSpaceOnUse",
         )
         color: Color = Color("#000000")
-        gradient = svg.defs.add(radial_gradient)
+        gradient = drawing.add_definition(radial_gradient)
         (
             gradient
             .add_stop_color(0.0, color.hex, opacity=0.2)
             .add_stop_color(0.7, color.hex, opacity=0.2)
             .add_stop_color(1.0, color.hex, opacity=1.0)
         )  # fmt: skip
-        circle = svg.circle(
+        circle = Circle(
             self.point,
             radius * scale,
             fill=gradient.get_funciri(),
             opacity=0.2,
         )
-        svg.add(circle)
+        drawing.add(circle)
@@ -4,11 +4,10 @@ from typing import Iterator, Optional
 import numpy as np
 from colour import Color
 from portolan import middle
-from svgwrite import Drawing
 from svgwrite.gradients import RadialGradient
 from svgwrite.path import Path
 
-from map_machine.drawing import PathCommands
+from map_machine.drawing import Drawing, PathCommands
 from map_machine.osm.osm_reader import Tagged
 
 __author__ = "Sergey Vartanov"
@@ -172,7 +171,7 @@ class DirectionSector(Tagged):
         super().__init__(tags)
         self.point: np.ndarray = point
 
-    def draw(self, svg: Drawing, scheme) -> None:
+    def draw(self, drawing: Drawing, scheme) -> None:
         """Draw gradient sector."""
         angle: Optional[float] = None
         is_revert_gradient: bool = False
@@ -210,12 +209,12 @@ class DirectionSector(Tagged):
             paths = DirectionSet(direction).draw(point, direction_radius)
 
         for path in paths:
-            radial_gradient: RadialGradient = svg.radialGradient(
+            radial_gradient: RadialGradient = RadialGradient(
                 center=point,
                 r=direction_radius,
                 gradientUnits="userSpaceOnUse",
             )
-            gradient: RadialGradient = svg.defs.add(radial_gradient)
+            gradient: RadialGradient = drawing.add_definition(radial_gradient)
 
             if is_revert_gradient:
                 (
@@ -230,8 +229,8 @@ class DirectionSector(Tagged):
                     .add_stop_color(1.0, direction_color.hex, opacity=0.0)
                 )  # fmt: skip
 
-            path_element: Path = svg.path(
+            path_element: Path = Path(
                 d=["M", point] + path + ["L", point, "Z"],
                 fill=gradient.get_funciri(),
             )
-            svg.add(path_element)
+            drawing.add(path_element)
@@ -5,23 +5,27 @@ from dataclasses import dataclass
 from typing import Any, Optional, Union
 
 import numpy as np
-import svgwrite
 from colour import Color
-from svgwrite import Drawing
 from svgwrite.filters import Filter
 from svgwrite.path import Path
 from svgwrite.shapes import Circle
+from svgwrite.text import Text, TextPath
 
-from map_machine.drawing import PathCommands
+from map_machine.drawing import Drawing, PathCommands
 from map_machine.geometry.flinger import Flinger
 from map_machine.geometry.vector import (
     Line,
+    PathEncoder,
     Polyline,
     compute_angle,
     norm,
     turn_by_angle,
 )
-from map_machine.osm.osm_reader import OSMNode, Tagged
+from map_machine.osm.osm_reader import (
+    OSMNode,
+    Tagged,
+    get_projected_coordinates,
+)
 from map_machine.scheme import RoadMatcher, Scheme
 
 __author__ = "Sergey Vartanov"
@@ -139,9 +143,9 @@ class RoadPart:
         """Get an angle between line and x axis."""
         return compute_angle(self.point_2 - self.point_1)
 
-    def draw_normal(self, drawing: svgwrite.Drawing) -> None:
+    def draw_normal(self, drawing: Drawing) -> None:
         """Draw some debug lines."""
-        line: Path = drawing.path(
+        line: Path = Path(
             ("M", self.point_1, "L", self.point_2),
             fill="none",
             stroke="#8888FF",
@@ -149,15 +153,15 @@ class RoadPart:
         )
         drawing.add(line)
 
-    def draw_debug(self, drawing: svgwrite.Drawing) -> None:
+    def draw_debug(self, drawing: Drawing) -> None:
         """Draw some debug lines."""
-        line: Path = drawing.path(
+        line: Path = Path(
             ("M", self.point_1, "L", self.point_2),
             fill="none",
             stroke="#000000",
         )
         drawing.add(line)
-        line: Path = drawing.path(
+        line: Path = Path(
             (
                 "M", self.point_1 + self.right_vector,
                 "L", self.point_2 + self.right_vector,
@@ -167,7 +171,7 @@ class RoadPart:
             stroke_width=0.5,
         )  # fmt: skip
         drawing.add(line)
-        line = drawing.path(
+        line = Path(
             (
                 "M", self.point_1 + self.left_vector,
                 "L", self.point_2 + self.left_vector,
@@ -182,29 +186,29 @@ class RoadPart:
         radius: float = 2
 
         if self.right_connection is not None:
-            circle = drawing.circle(
+            circle = Circle(
                 self.right_connection, 2.5, fill="#FF0000", opacity=opacity
             )
             drawing.add(circle)
         if self.left_connection is not None:
-            circle = drawing.circle(
+            circle = Circle(
                 self.left_connection, 2.5, fill="#0000FF", opacity=opacity
             )
             drawing.add(circle)
 
         if self.right_projection is not None:
-            circle = drawing.circle(
+            circle = Circle(
                 self.right_projection, 1.5, fill="#FF0000", opacity=opacity
             )
             drawing.add(circle)
         if self.left_projection is not None:
-            circle = drawing.circle(
+            circle = Circle(
                 self.left_projection, 1.5, fill="#0000FF", opacity=opacity
             )
             drawing.add(circle)
 
         if self.right_outer is not None:
-            circle = drawing.circle(
+            circle = Circle(
                 self.right_outer,
                 3.5,
                 stroke_width=0.5,
@@ -214,7 +218,7 @@ class RoadPart:
             )
             drawing.add(circle)
         if self.left_outer is not None:
-            circle = drawing.circle(
+            circle = Circle(
                 self.left_outer,
                 3.5,
                 stroke_width=0.5,
@@ -225,12 +229,12 @@ class RoadPart:
             drawing.add(circle)
 
         if self.point_a is not None:
-            circle = drawing.circle(self.point_a, radius, fill="#000000")
+            circle = Circle(self.point_a, radius, fill="#000000")
             drawing.add(circle)
 
         # self.draw_entrance(drawing, True)
 
-    def draw(self, drawing: svgwrite.Drawing) -> None:
+    def draw(self, drawing: Drawing) -> None:
         """Draw road part."""
         if self.left_connection is not None:
             path_commands = [
@@ -240,11 +244,9 @@ class RoadPart:
                 "L", self.right_connection,
                 "Z",
             ]  # fmt: skip
-            drawing.add(drawing.path(path_commands, fill="#CCCCCC"))
+            drawing.add(Path(path_commands, fill="#CCCCCC"))
 
-    def draw_entrance(
-        self, drawing: svgwrite.Drawing, is_debug: bool = False
-    ) -> None:
+    def draw_entrance(self, drawing: Drawing, is_debug: bool = False) -> None:
         """Draw intersection entrance part."""
         if (
             self.left_connection is not None
@@ -258,7 +260,7 @@ class RoadPart:
                 "Z",
             ]  # fmt: skip
             if is_debug:
-                path = drawing.path(
+                path = Path(
                     path_commands,
                     fill="none",
                     stroke="#880088",
@@ -266,13 +268,13 @@ class RoadPart:
                 )
                 drawing.add(path)
             else:
-                drawing.add(drawing.path(path_commands, fill="#88FF88"))
+                drawing.add(Path(path_commands, fill="#88FF88"))
 
-    def draw_lanes(self, drawing: svgwrite.Drawing, scale: float) -> None:
+    def draw_lanes(self, drawing: Drawing, scale: float) -> None:
         """Draw lane delimiters."""
         for lane in self.lanes:
             shift = self.right_vector - self.turned * lane.get_width(scale)
-            path = drawing.path(
+            path = Path(
                 ["M", self.point_middle + shift, "L", self.point_2 + shift],
                 fill="none",
                 stroke="#FFFFFF",
@@ -328,7 +330,7 @@ class Intersection:
             part_1.update()
             part_2.update()
 
-    def draw(self, drawing: svgwrite.Drawing, is_debug: bool = False) -> None:
+    def draw(self, drawing: Drawing, is_debug: bool = False) -> None:
         """Draw all road parts and intersection."""
         inner_commands = ["M"]
         for part in self.parts:
@@ -346,12 +348,8 @@ class Intersection:
         #     part.draw_normal(drawing)
 
         if is_debug:
-            drawing.add(
-                drawing.path(outer_commands, fill="#0000FF", opacity=0.2)
-            )
-            drawing.add(
-                drawing.path(inner_commands, fill="#FF0000", opacity=0.2)
-            )
+            drawing.add(Path(outer_commands, fill="#0000FF", opacity=0.2))
+            drawing.add(Path(inner_commands, fill="#FF0000", opacity=0.2))
 
         for part in self.parts:
             if is_debug:
@@ -361,7 +359,7 @@ class Intersection:
         if not is_debug:
             # for part in self.parts:
             #     part.draw_lanes(drawing, scale)
-            drawing.add(drawing.path(inner_commands, fill="#FF8888"))
+            drawing.add(Path(inner_commands, fill="#FF8888"))
 
 
 class Road(Tagged):
@@ -380,7 +378,11 @@ class Road(Tagged):
         self.matcher: RoadMatcher = matcher
 
         self.line: Polyline = Polyline(
-            [flinger.fling(node.coordinates) for node in self.nodes]
+            list(
+                flinger.fling_projected_many(
+                    get_projected_coordinates(self.nodes)
+                )
+            )
         )
         self.width: Optional[float] = matcher.default_width
         self.lanes: list[Lane] = []
@@ -515,32 +517,39 @@ class Road(Tagged):
 
         return style
 
-    def get_filter(self, svg: Drawing, is_border: bool) -> Optional[Filter]:
+    def get_filter(self, drawing: Drawing, is_border: bool) -> Optional[Filter]:
         """Get blurring filter."""
         if not USE_BLUR:
             return None
 
         if is_border and self.tags.get("bridge") == "yes":
-            filter_ = svg.defs.add(svg.filter())
+            filter_ = drawing.add_definition(Filter())
             filter_.feGaussianBlur(in_="SourceGraphic", stdDeviation=2)
             return filter_
 
         return None
 
-    def draw(self, svg: Drawing, is_border: bool) -> None:
+    def draw(
+        self,
+        drawing: Drawing,
+        is_border: bool,
+        encoder: PathEncoder = PathEncoder(),
+    ) -> None:
         """Draw road as simple SVG path."""
-        filter_: Filter = self.get_filter(svg, is_border)
+        filter_: Filter = self.get_filter(drawing, is_border)
 
         style: dict[str, Union[int, float, str]] = self.get_style(is_border)
-        path_commands: str = self.line.get_path(self.placement_offset)
+        path_commands: str = self.line.get_path(self.placement_offset, encoder)
         path: Path
         if filter_:
-            path = Path(d=path_commands, filter=filter_.get_funciri())
+            path = Path(
+                d=path_commands, filter=filter_.get_funciri(), debug=False
+            )
         else:
-            path = Path(d=path_commands)
+            path = Path(d=path_commands, debug=False)
 
         path.update(style)
-        svg.add(path)
+        drawing.add(path)
 
     def get_color(self) -> Color:
         """Get road main color."""
@@ -560,7 +569,12 @@ class Road(Tagged):
             color = self.scheme.get_color("embankment_color")
         return color
 
-    def draw_lanes(self, svg: Drawing, color: Color) -> None:
+    def draw_lanes(
+        self,
+        drawing: Drawing,
+        color: Color,
+        encoder: PathEncoder = PathEncoder(),
+    ) -> None:
         """Draw lane separators."""
         if len(self.lanes) < 2:
             return
@@ -570,7 +584,10 @@ class Road(Tagged):
                 -self.width / 2.0 + index * self.width / len(self.lanes)
             )
             path: Path = Path(
-                d=self.line.get_path(self.placement_offset + lane_offset)
+                d=self.line.get_path(
+                    self.placement_offset + lane_offset, encoder
+                ),
+                debug=False,
             )
             style: dict[str, Any] = {
                 "fill": "none",
@@ -580,21 +597,23 @@ class Road(Tagged):
                 "opacity": 0.5,
             }
             path.update(style)
-            svg.add(path)
+            drawing.add(path)
 
-    def draw_caption(self, svg: Drawing) -> None:
+    def draw_caption(
+        self, drawing: Drawing, encoder: PathEncoder = PathEncoder()
+    ) -> None:
         """Draw road name along its path."""
         name: Optional[str] = self.tags.get("name")
         if not name:
             return
 
-        path: Path = svg.path(
-            d=self.line.get_path(self.placement_offset + 3.0), fill="none"
+        path: Path = Path(
+            d=self.line.get_path(self.placement_offset + 3.0, encoder),
+            fill="none",
+            debug=False,
         )
-        svg.add(path)
-
-        text = svg.add(svg.text.Text(""))
-        text_path = svg.text.TextPath(
+        text: Text = Text("", debug=False)
+        text_path: TextPath = TextPath(
             path=path,
             text=name,
             startOffset=None,
@@ -602,9 +621,15 @@ class Road(Tagged):
             spacing="exact",
             font_family="Roboto",
             font_size=10.0,
+            debug=False,
         )
         text.add(text_path)
 
+        # Path should be added after text path creation, since text path sets
+        # path identifier.
+        drawing.add(path)
+        drawing.add(text)
+
 
 def get_curve_points(
     road: Road,
@@ -662,11 +687,11 @@ class Connector:
         self.scale: float = self.road_1.scale
         self.flinger: Flinger = flinger
 
-    def draw(self, svg: Drawing) -> None:
+    def draw(self, drawing: Drawing) -> None:
         """Draw connection fill."""
         raise NotImplementedError
 
-    def draw_border(self, svg: Drawing) -> None:
+    def draw_border(self, drawing: Drawing) -> None:
         """Draw connection outline."""
         raise NotImplementedError
 
@@ -687,23 +712,23 @@ class SimpleConnector(Connector):
         node: OSMNode = self.road_1.nodes[self.index_1]
         self.point: np.ndarray = flinger.fling(node.coordinates)
 
-    def draw(self, svg: Drawing) -> None:
+    def draw(self, drawing: Drawing) -> None:
         """Draw connection fill."""
-        circle: Circle = svg.circle(
+        circle: Circle = Circle(
             self.point,
             self.road_1.width * self.scale / 2.0,
             fill=self.road_1.get_color().hex,
         )
-        svg.add(circle)
+        drawing.add(circle)
 
-    def draw_border(self, svg: Drawing) -> None:
+    def draw_border(self, drawing: Drawing) -> None:
         """Draw connection outline."""
-        circle: Circle = svg.circle(
+        circle: Circle = Circle(
             self.point,
             self.road_1.width * self.scale / 2.0 + 1.0,
             fill=self.road_1.matcher.border_color.hex,
         )
-        svg.add(circle)
+        drawing.add(circle)
 
 
 class ComplexConnector(Connector):
@@ -726,9 +751,10 @@ class ComplexConnector(Connector):
         self.road_2.line.shorten(self.index_2, length)
 
         node_1: OSMNode = self.road_1.nodes[self.index_1]
-        point_1: np.ndarray = flinger.fling(node_1.coordinates)
         node_2: OSMNode = self.road_2.nodes[self.index_2]
-        point_2: np.ndarray = flinger.fling(node_2.coordinates)
+        point_1, point_2 = flinger.fling_many(
+            np.array((node_1.coordinates, node_2.coordinates))
+        )
         point = (point_1 + point_2) / 2.0
 
         points_1: list[np.ndarray] = get_curve_points(
@@ -754,57 +780,57 @@ class ComplexConnector(Connector):
         ]
         # fmt: on
 
-    def draw(self, svg: Drawing) -> None:
+    def draw(self, drawing: Drawing) -> None:
         """Draw connection fill."""
-        path: Path = svg.path(
+        path: Path = Path(
             d=["M"] + self.curve_1 + ["L"] + self.curve_2 + ["Z"],
             fill=self.road_1.get_color(),
         )
-        svg.add(path)
+        drawing.add(path)
 
-    def draw_border(self, svg: Drawing) -> None:
+    def draw_border(self, drawing: Drawing) -> None:
         """Draw connection outline."""
-        filter_: Filter = self.road_1.get_filter(svg, True)
+        filter_: Filter = self.road_1.get_filter(drawing, True)
 
         if filter_:
-            path: Path = svg.path(
+            path: Path = Path(
                 d=["M"] + self.curve_1 + ["M"] + self.curve_2,
                 filter=filter_.get_funciri(),
             )
         else:
-            path: Path = svg.path(d=["M"] + self.curve_1 + ["M"] + self.curve_2)
+            path: Path = Path(d=["M"] + self.curve_1 + ["M"] + self.curve_2)
         path.update(self.road_1.get_style(True, True))
-        svg.add(path)
+        drawing.add(path)
 
 
 class SimpleIntersection(Connector):
     """Connection between more than two roads."""
 
-    def draw(self, svg: Drawing) -> None:
+    def draw(self, drawing: Drawing) -> None:
         """Draw connection fill."""
         for road, _ in sorted(
             self.connections, key=lambda x: x[0].matcher.priority
         ):
             node: OSMNode = self.road_1.nodes[self.index_1]
             point: np.ndarray = self.flinger.fling(node.coordinates)
-            circle: Circle = svg.circle(
+            circle: Circle = Circle(
                 point,
                 road.width * self.scale / 2.0,
                 fill=road.matcher.color.hex,
             )
-            svg.add(circle)
+            drawing.add(circle)
 
-    def draw_border(self, svg: Drawing) -> None:
+    def draw_border(self, drawing: Drawing) -> None:
         """Draw connection outline."""
         for road, _ in self.connections:
             node: OSMNode = self.road_1.nodes[self.index_1]
             point: np.ndarray = self.flinger.fling(node.coordinates)
-            circle: Circle = svg.circle(
+            circle: Circle = Circle(
                 point,
                 road.width * self.scale / 2.0 + 1.0,
                 fill=road.matcher.border_color.hex,
             )
-            svg.add(circle)
+            drawing.add(circle)
 
 
 class Roads:
@@ -823,7 +849,11 @@ class Roads:
             self.nodes[node.id_].append((road, index))
 
     def draw(
-        self, svg: Drawing, flinger: Flinger, draw_captions: bool = False
+        self,
+        drawing: Drawing,
+        flinger: Flinger,
+        draw_captions: bool = False,
+        encoder: PathEncoder = PathEncoder(),
     ) -> None:
         """Draw whole road system."""
         if not self.roads:
@@ -887,26 +917,26 @@ class Roads:
             # Draw borders.
 
             for road in roads:
-                road.draw(svg, True)
+                road.draw(drawing, True, encoder)
             if connectors:
                 for connector in connectors:
                     if connector.min_layer == layer:
-                        connector.draw_border(svg)
+                        connector.draw_border(drawing)
 
             # Draw inner parts.
 
             for road in roads:
-                road.draw(svg, False)
+                road.draw(drawing, False, encoder)
             if connectors:
                 for connector in connectors:
                     if connector.max_layer == layer:
-                        connector.draw(svg)
+                        connector.draw(drawing)
 
             # Draw lane separators.
 
             for road in roads:
-                road.draw_lanes(svg, road.matcher.border_color)
+                road.draw_lanes(drawing, road.matcher.border_color, encoder)
 
         if draw_captions:
             for road in self.roads:
-                road.draw_caption(svg)
+                road.draw_caption(drawing, encoder)
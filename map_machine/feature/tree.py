@@ -6,8 +6,9 @@ circles.
 """
 import numpy as np
 from colour import Color
-from svgwrite import Drawing
+from svgwrite.shapes import Circle
 
+from map_machine.drawing import Drawing
 from map_machine.geometry.flinger import Flinger
 from map_machine.osm.osm_reader import Tagged
 from map_machine.scheme import Scheme
@@ -23,7 +24,7 @@ class Tree(Tagged):
         self.coordinates: np.ndarray = coordinates
         self.point: np.ndarray = point
 
-    def draw(self, svg: Drawing, flinger: Flinger, scheme: Scheme) -> None:
+    def draw(self, drawing: Drawing, flinger: Flinger, scheme: Scheme) -> None:
         """Draw crown and trunk."""
         scale: float = flinger.get_scale(self.coordinates)
 
@@ -34,11 +35,11 @@ class Tree(Tagged):
             radius = 2.0
 
         color: Color = scheme.get_color("evergreen_color")
-        svg.add(svg.circle(self.point, radius * scale, fill=color, opacity=0.3))
+        drawing.add(Circle(self.point, radius * scale, fill=color, opacity=0.3))
 
         if (circumference := self.get_float("circumference")) is not None:
             radius: float = circumference / 2.0 / np.pi
-            circle = svg.circle(
+            circle = Circle(
                 self.point, radius * scale, fill=scheme.get_color("trunk_color")
             )
-            svg.add(circle)
+            drawing.add(circle)
@@ -2,13 +2,17 @@
 import numpy as np
 
 from map_machine.geometry.flinger import Flinger
-from map_machine.osm.osm_reader import OSMNode, Tagged
+from map_machine.osm.osm_reader import (
+    OSMNode,
+    Tagged,
+    get_projected_coordinates,
+)
 from map_machine.scheme import LineStyle
 
 __author__ = "Sergey Vartanov"
 __email__ = "me@enzet.ru"
 
-from map_machine.geometry.vector import Polyline
+from map_machine.geometry.vector import PathEncoder, Polyline
 
 
 class Figure(Tagged):
@@ -32,21 +36,22 @@ class Figure(Tagged):
             self.outers = outers
 
     def get_path(
-        self, flinger: Flinger, offset: np.ndarray = np.array((0.0, 0.0))
+        self,
+        flinger: Flinger,
+        offset: np.ndarray = np.array((0.0, 0.0)),
+        encoder: PathEncoder = PathEncoder(),
     ) -> str:
         """
         Get SVG path commands.
 
         :param flinger: converter for geo coordinates
         :param offset: offset vector
+        :param encoder: path coordinates serializer
         """
         path: str = ""
 
-        for outer_nodes in self.outers:
-            path += f"{get_path(outer_nodes, offset, flinger)} "
-
-        for inner_nodes in self.inners:
-            path += f"{get_path(inner_nodes, offset, flinger)} "
+        for nodes in self.outers + self.inners:
+            path += f"{get_path(nodes, offset, flinger, encoder=encoder)} "
 
         return path
 
@@ -68,24 +73,34 @@ class StyledFigure(Figure):
         self,
         flinger: Flinger,
         offset: np.ndarray = np.array((0.0, 0.0)),
+        encoder: PathEncoder = PathEncoder(),
     ) -> str:
         """
         Get SVG path commands.
 
         :param flinger: converter for geo coordinates
         :param offset: offset vector
+        :param encoder: path coordinates serializer
         """
         path: str = ""
 
         for outer_nodes in self.outers:
             commands: str = get_path(
-                outer_nodes, offset, flinger, self.line_style.parallel_offset
+                outer_nodes,
+                offset,
+                flinger,
+                self.line_style.parallel_offset,
+                encoder,
             )
             path += f"{commands} "
 
         for inner_nodes in self.inners:
             commands: str = get_path(
-                inner_nodes, offset, flinger, self.line_style.parallel_offset
+                inner_nodes,
+                offset,
+                flinger,
+                self.line_style.parallel_offset,
+                encoder,
             )
             path += f"{commands} "
 
@@ -150,8 +165,12 @@ def get_path(
     shift: np.ndarray,
     flinger: Flinger,
     parallel_offset: float = 0.0,
+    encoder: PathEncoder = PathEncoder(),
 ) -> str:
     """Construct SVG path commands from nodes."""
     return Polyline(
-        [flinger.fling(node.coordinates) + shift for node in nodes]
-    ).get_path(parallel_offset)
+        list(
+            flinger.fling_projected_many(get_projected_coordinates(nodes))
+            + shift
+        )
+    ).get_path(parallel_offset, encoder)
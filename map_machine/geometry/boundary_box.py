@@ -163,6 +163,15 @@ class BoundaryBox:
         self.right = max(self.right, coordinates[1])
         self.top = max(self.top, coordinates[0])
 
+    def contains(self, other: "BoundaryBox") -> bool:
+        """Check whether another boundary box is inside this one."""
+        return (
+            self.left <= other.left
+            and self.bottom <= other.bottom
+            and self.right >= other.right
+            and self.top >= other.top
+        )
+
     def combine(self, other: "BoundaryBox") -> None:
         """Combine with another boundary box."""
         self.left = min(self.left, other.left)
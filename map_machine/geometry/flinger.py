@@ -28,6 +28,41 @@ def pseudo_mercator(coordinates: np.ndarray) -> np.ndarray:
     return np.array((longitude, y))
 
 
+def pseudo_mercator_many(coordinates: np.ndarray) -> np.ndarray:
+    """
+    Use spherical pseudo-Mercator projection to convert an array of geo
+    coordinates.
+
+    :param coordinates: (N, 2) array of geo positions in the form of
+        (latitude, longitude)
+    :return: (N, 2) array of positions on the plane in the form of (x, y)
+    """
+    result: np.ndarray = np.empty((len(coordinates), 2))
+    result[:, 0] = coordinates[:, 1]
+    result[:, 1] = (
+        180.0
+        / np.pi
+        * np.log(np.tan(np.pi / 4.0 + coordinates[:, 0] * np.pi / 360.0))
+    )
+    return result
+
+
+def inverse_pseudo_mercator_many(points: np.ndarray) -> np.ndarray:
+    """
+    Convert an array of pseudo-Mercator positions back to geo coordinates.
+
+    :param points: (N, 2) array of positions on the plane in the form of
+        (x, y)
+    :return: (N, 2) array of geo positions in the form of (latitude, longitude)
+    """
+    result: np.ndarray = np.empty((len(points), 2))
+    result[:, 0] = (
+        360.0 / np.pi * np.arctan(np.exp(points[:, 1] * np.pi / 180.0)) - 90.0
+    )
+    result[:, 1] = points[:, 0]
+    return result
+
+
 def osm_zoom_level_to_pixels_per_meter(
     zoom_level: float, equator_length: float
 ) -> float:
@@ -53,6 +88,19 @@ class Flinger:
         """Do nothing but return coordinates unchanged."""
         return coordinates
 
+    def fling_many(self, coordinates: np.ndarray) -> np.ndarray:
+        """Do nothing but return (N, 2) array of coordinates unchanged."""
+        return coordinates
+
+    def fling_projected_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Convert an array of already projected pseudo-Mercator positions.
+
+        :param points: (N, 2) array of pseudo-Mercator positions, see
+            `pseudo_mercator_many`
+        """
+        return self.fling_many(inverse_pseudo_mercator_many(points))
+
     def get_scale(self, coordinates: Optional[np.ndarray] = None) -> float:
         return 1.0
 
@@ -104,6 +152,36 @@ class MercatorFlinger(Flinger):
 
         return result
 
+    def fling_many(self, coordinates: np.ndarray) -> np.ndarray:
+        """
+        Convert an array of geo coordinates into (x, y) position points on the
+        plane.
+
+        :param coordinates: (N, 2) array of geographical coordinates to fling
+            in the form of (latitude, longitude)
+        :return: (N, 2) array of points
+        """
+        return self.fling_projected_many(pseudo_mercator_many(coordinates))
+
+    def fling_projected_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Convert an array of already projected pseudo-Mercator positions into
+        (x, y) position points on the plane.
+
+        Pseudo-Mercator projection does not depend on zoom level and boundary
+        box, so for the flinger it is only scaling and translation.
+
+        :param points: (N, 2) array of pseudo-Mercator positions, see
+            `pseudo_mercator_many`
+        :return: (N, 2) array of points
+        """
+        result: np.ndarray = self.ratio * points - self.min_
+
+        # Invert y axis on coordinate plane.
+        result[:, 1] = self.size[1] - result[:, 1]
+
+        return result
+
     def get_scale(self, coordinates: Optional[np.ndarray] = None) -> float:
         """
         Return pixels per meter ratio for the given geo coordinates.
@@ -129,3 +207,6 @@ class TranslateFlinger(Flinger):
 
     def fling(self, coordinates: np.ndarray) -> np.ndarray:
         return self.scale * (coordinates + self.offset)
+
+    def fling_many(self, coordinates: np.ndarray) -> np.ndarray:
+        return self.scale * (coordinates + self.offset)
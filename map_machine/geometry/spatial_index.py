@@ -0,0 +1,152 @@
+"""Spatial index to find objects inside a boundary box."""
+import numpy as np
+
+from map_machine.geometry.boundary_box import BoundaryBox
+
+__author__ = "Sergey Vartanov"
+__email__ = "me@enzet.ru"
+
+GRID_SIZE: int = 128
+
+# Boxes that cover more cells are not stored in cells but are checked for
+# every query.
+MAXIMUM_BOX_CELLS: int = 64
+
+
+class GridIndex:
+    """
+    Uniform grid over the boundary box that stores points and boxes by cells
+    they intersect.
+
+    Points are (latitude, longitude) pairs, boxes are (left, bottom, right,
+    top) tuples, see `BoundaryBox`.
+    """
+
+    def __init__(
+        self,
+        boundary_box: BoundaryBox,
+        point_ids: np.ndarray,
+        points: np.ndarray,
+        box_ids: np.ndarray,
+        boxes: np.ndarray,
+        size: int = GRID_SIZE,
+    ) -> None:
+        """
+        :param boundary_box: area covered by the grid
+        :param point_ids: (N) array of point identifiers
+        :param points: (N, 2) array of point coordinates
+        :param box_ids: (M) array of box identifiers
+        :param boxes: (M, 4) array of boxes
+        :param size: number of cells in a grid row and column
+        """
+        self.boundary_box: BoundaryBox = boundary_box
+        self.size: int = size
+
+        self.point_ids: np.ndarray = point_ids
+        self.points: np.ndarray = points
+        keys: np.ndarray = self.get_x(points[:, 1]) * size + self.get_y(
+            points[:, 0]
+        )
+        # Points sorted by cells, so that points of cells from one grid column
+        # are stored sequentially.
+        self.point_order: np.ndarray = np.argsort(keys, kind="stable")
+        self.point_keys: np.ndarray = keys[self.point_order]
+
+        self.box_ids: np.ndarray = box_ids
+        self.boxes: np.ndarray = boxes
+        self.cells: dict[int, list[int]] = {}
+        self.large_boxes: list[int] = []
+
+        x_1: np.ndarray = self.get_x(boxes[:, 0])
+        y_1: np.ndarray = self.get_y(boxes[:, 1])
+        x_2: np.ndarray = self.get_x(boxes[:, 2])
+        y_2: np.ndarray = self.get_y(boxes[:, 3])
+        for index in range(len(boxes)):
+            if (x_2[index] - x_1[index] + 1) * (
+                y_2[index] - y_1[index] + 1
+            ) > MAXIMUM_BOX_CELLS:
+                self.large_boxes.append(index)
+                continue
+            for x in range(x_1[index], x_2[index] + 1):
+                for y in range(y_1[index], y_2[index] + 1):
+                    self.cells.setdefault(x * size + y, []).append(index)
+
+    def get_x(self, longitudes: np.ndarray) -> np.ndarray:
+        """Get grid column indices for longitudes."""
+        width: float = self.boundary_box.right - self.boundary_box.left
+        if width <= 0.0:
+            return np.zeros(len(longitudes), dtype=np.int64)
+        return np.clip(
+            (longitudes - self.boundary_box.left) / width * self.size,
+            0,
+            self.size - 1,
+        ).astype(np.int64)
+
+    def get_y(self, latitudes: np.ndarray) -> np.ndarray:
+        """Get grid row indices for latitudes."""
+        height: float = self.boundary_box.top - self.boundary_box.bottom
+        if height <= 0.0:
+            return np.zeros(len(latitudes), dtype=np.int64)
+        return np.clip(
+            (latitudes - self.boundary_box.bottom) / height * self.size,
+            0,
+            self.size - 1,
+        ).astype(np.int64)
+
+    def get_cell_range(
+        self, boundary_box: BoundaryBox
+    ) -> tuple[int, int, int, int]:
+        """Get minimum and maximum column and row indices of cells."""
+        x_1, x_2 = self.get_x(np.array((boundary_box.left, boundary_box.right)))
+        y_1, y_2 = self.get_y(np.array((boundary_box.bottom, boundary_box.top)))
+        return int(x_1), int(y_1), int(x_2), int(y_2)
+
+    def query_points(self, boundary_box: BoundaryBox) -> np.ndarray:
+        """Get identifiers of points inside the boundary box."""
+        x_1, y_1, x_2, y_2 = self.get_cell_range(boundary_box)
+
+        parts: list[np.ndarray] = []
+        for x in range(x_1, x_2 + 1):
+            start: int = int(
+                np.searchsorted(self.point_keys, x * self.size + y_1, "left")
+            )
+            end: int = int(
+                np.searchsorted(self.point_keys, x * self.size + y_2, "right")
+            )
+            parts.append(self.point_order[start:end])
+
+        if not parts:
+            return np.empty(0, dtype=self.point_ids.dtype)
+
+        indices: np.ndarray = np.sort(np.concatenate(parts))
+        points: np.ndarray = self.points[indices]
+        inside: np.ndarray = (
+            (points[:, 0] >= boundary_box.bottom)
+            & (points[:, 0] <= boundary_box.top)
+            & (points[:, 1] >= boundary_box.left)
+            & (points[:, 1] <= boundary_box.right)
+        )
+        return self.point_ids[indices[inside]]
+
+    def query_boxes(self, boundary_box: BoundaryBox) -> np.ndarray:
+        """Get identifiers of boxes intersecting the boundary box."""
+        x_1, y_1, x_2, y_2 = self.get_cell_range(boundary_box)
+
+        candidates: set[int] = set(self.large_boxes)
+        for x in range(x_1, x_2 + 1):
+            for y in range(y_1, y_2 + 1):
+                if (key := x * self.size + y) in self.cells:
+                    candidates.update(self.cells[key])
+
+        indices: np.ndarray = np.array(sorted(candidates), dtype=np.int64)
+        if not len(indices):
+            return np.empty(0, dtype=self.box_ids.dtype)
+
+        boxes: np.ndarray = self.boxes[indices]
+        intersects: np.ndarray = (
+            (boxes[:, 0] <= boundary_box.right)
+            & (boxes[:, 2] >= boundary_box.left)
+            & (boxes[:, 1] <= boundary_box.top)
+            & (boxes[:, 3] >= boundary_box.bottom)
+        )
+        return self.box_ids[indices[intersects]]
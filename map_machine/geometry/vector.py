@@ -1,4 +1,5 @@
 """Vector utility."""
+from dataclasses import dataclass
 from typing import Optional
 
 import numpy as np
@@ -41,14 +42,79 @@ def norm(vector: np.ndarray) -> np.ndarray:
     return vector / np.linalg.norm(vector)
 
 
+@dataclass(frozen=True)
+class PathEncoder:
+    """Serializer of point sequences into SVG path commands."""
+
+    # Number of decimal places for coordinates, if it is None, coordinates
+    # are written with full precision.
+    precision: Optional[int] = None
+
+    # Write coordinates of all points except the first one relative to the
+    # previous point.
+    is_relative: bool = False
+
+    def encode(
+        self, points: np.ndarray, is_closed: Optional[bool] = None
+    ) -> str:
+        """
+        Construct SVG path commands for the polyline.
+
+        :param points: array of points with shape (n, 2)
+        :param is_closed: whether the path should be closed, by default it is
+            closed if the first and the last points are the same
+        """
+        points = np.asarray(points, dtype=float)
+        if len(points) == 0:
+            return ""
+
+        if is_closed is None:
+            # The same as `np.allclose`, but much faster for two points.
+            is_closed = bool(
+                (
+                    np.abs(points[0] - points[-1])
+                    <= 1e-08 + 1e-05 * np.abs(points[-1])
+                ).all()
+            )
+        values: np.ndarray = (
+            points if self.precision is None else points.round(self.precision)
+        )
+        if self.is_relative:
+            values = np.concatenate(
+                (values[:1], np.diff(values, axis=0)), axis=0
+            )
+            if self.precision is not None:
+                values = values.round(self.precision)
+        if self.precision is not None:
+            # Get rid of negative zeros produced by rounding.
+            values = values + 0.0
+        if self.precision == 0:
+            values = values.astype(int)
+
+        coordinates: list = values.ravel().tolist()
+        text: str = f"M {coordinates[0]},{coordinates[1]}"
+        if len(values) > 1:
+            text += (" l " if self.is_relative else " L ") + (
+                " ".join(["%s,%s"] * (len(values) - 1)) % tuple(coordinates[2:])
+            )
+        return text + (" Z" if is_closed else "")
+
+
 class Polyline:
     """List of connected points."""
 
     def __init__(self, points: list[np.ndarray]) -> None:
         self.points: list[np.ndarray] = points
 
-    def get_path(self, parallel_offset: float = 0.0) -> str:
-        """Construct SVG path commands."""
+    def get_path(
+        self, parallel_offset: float = 0.0, encoder: PathEncoder = PathEncoder()
+    ) -> str:
+        """
+        Construct SVG path commands.
+
+        :param parallel_offset: offset of the path to the right side
+        :param encoder: path coordinates serializer
+        """
         points: list[np.ndarray]
 
         if np.allclose(parallel_offset, 0.0):
@@ -65,11 +131,7 @@ class Polyline:
             except (ValueError, NotImplementedError):
                 points = self.points
 
-        return (
-            "M "
-            + " L ".join(f"{point[0]},{point[1]}" for point in points)
-            + (" Z" if np.allclose(points[0], points[-1]) else "")
-        )
+        return encoder.encode(np.array(points))
 
     def shorten(self, index: int, length: float) -> None:
         """Make shorten part specified with index."""
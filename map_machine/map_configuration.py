@@ -6,6 +6,7 @@ from typing import Optional, Any
 
 from colour import Color
 
+from map_machine.geometry.vector import PathEncoder
 from map_machine.pictogram.icon import ShapeExtractor, IconSet
 from map_machine.scheme import Scheme
 
@@ -63,6 +64,10 @@ class MapConfiguration:
     show_overlapped: bool = False
     credit: Optional[str] = "© OpenStreetMap contributors"
     show_credit: bool = True
+    use_symbols: bool = False
+    path_precision: Optional[int] = None
+    relative_paths: bool = False
+    alternative_positions: bool = False
 
     @classmethod
     def from_options(
@@ -85,12 +90,20 @@ class MapConfiguration:
             options.building_colors,
             options.show_overlapped,
             show_credit=not options.hide_credit,
+            use_symbols=options.icon_symbols,
+            path_precision=options.path_precision,
+            relative_paths=options.relative_paths,
+            alternative_positions=options.alternative_positions,
         )
 
     def is_wireframe(self) -> bool:
         """Whether drawing mode is special."""
         return self.drawing_mode != DrawingMode.NORMAL
 
+    def get_path_encoder(self) -> PathEncoder:
+        """Get serializer of path coordinates."""
+        return PathEncoder(self.path_precision, self.relative_paths)
+
     def background_color(self) -> Optional[Color]:
         """Get background map color based on drawing mode."""
         if self.drawing_mode not in (DrawingMode.NORMAL, DrawingMode.BLACK):
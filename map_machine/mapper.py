@@ -6,7 +6,6 @@ from pathlib import Path
 from typing import Iterator, Optional
 
 import numpy as np
-import svgwrite
 from colour import Color
 from svgwrite.container import Group
 from svgwrite.path import Path as SVGPath
@@ -14,17 +13,18 @@ from svgwrite.shapes import Rect
 
 from map_machine import __project__
 from map_machine.constructor import Constructor
-from map_machine.drawing import draw_text
+from map_machine.drawing import Drawing, SVGStreamDrawing, draw_text
 from map_machine.feature.building import Building, draw_walls, BUILDING_SCALE
 from map_machine.feature.road import Intersection, Road, RoadPart
 from map_machine.figure import StyledFigure
 from map_machine.geometry.boundary_box import BoundaryBox
 from map_machine.geometry.flinger import Flinger, MercatorFlinger
-from map_machine.geometry.vector import Segment
+from map_machine.geometry.vector import PathEncoder, Segment
 from map_machine.map_configuration import LabelMode, MapConfiguration
 from map_machine.osm.osm_getter import NetworkError, get_osm
 from map_machine.osm.osm_reader import OSMData, OSMNode
-from map_machine.pictogram.icon import ShapeExtractor
+from map_machine.osm.osm_snapshot import load_osm_file
+from map_machine.pictogram.icon import ShapeExtractor, get_shape_extractor
 from map_machine.pictogram.point import Occupied, Point
 from map_machine.scheme import Scheme
 from map_machine.ui.cli import BuildingMode
@@ -43,13 +43,14 @@ class Map:
     def __init__(
         self,
         flinger: Flinger,
-        svg: svgwrite.Drawing,
+        drawing: Drawing,
         configuration: MapConfiguration,
     ) -> None:
         self.flinger: Flinger = flinger
-        self.svg: svgwrite.Drawing = svg
+        self.drawing: Drawing = drawing
         self.scheme: Scheme = configuration.scheme
         self.configuration = configuration
+        self.encoder: PathEncoder = configuration.get_path_encoder()
 
         self.background_color: Color = self.scheme.get_color("background_color")
         if color := self.configuration.background_color():
@@ -57,8 +58,13 @@ class Map:
 
     def draw(self, constructor: Constructor) -> None:
         """Draw map."""
-        self.svg.add(
-            Rect((0.0, 0.0), self.flinger.size, fill=self.background_color)
+        self.drawing.add(
+            Rect(
+                (0.0, 0.0),
+                self.flinger.size,
+                fill=self.background_color,
+                debug=False,
+            )
         )
         logging.info("Drawing ways...")
 
@@ -72,28 +78,32 @@ class Map:
         ]
 
         for figure in bottom_figures:
-            path_commands: str = figure.get_path(self.flinger)
+            path_commands: str = figure.get_path(
+                self.flinger, encoder=self.encoder
+            )
             if path_commands:
-                path: SVGPath = SVGPath(d=path_commands)
+                path: SVGPath = SVGPath(d=path_commands, debug=False)
                 path.update(figure.line_style.style)
-                self.svg.add(path)
+                self.drawing.add(path)
 
-        constructor.roads.draw(self.svg, self.flinger)
+        constructor.roads.draw(self.drawing, self.flinger, encoder=self.encoder)
 
         for figure in top_figures:
-            path_commands: str = figure.get_path(self.flinger)
+            path_commands: str = figure.get_path(
+                self.flinger, encoder=self.encoder
+            )
             if path_commands:
-                path: SVGPath = SVGPath(d=path_commands)
+                path: SVGPath = SVGPath(d=path_commands, debug=False)
                 path.update(figure.line_style.style)
-                self.svg.add(path)
+                self.drawing.add(path)
 
         if self.scheme.draw_trees:
             for tree in constructor.trees:
-                tree.draw(self.svg, self.flinger, self.scheme)
+                tree.draw(self.drawing, self.flinger, self.scheme)
 
         if self.scheme.draw_craters:
             for crater in constructor.craters:
-                crater.draw(self.svg, self.flinger)
+                crater.draw(self.drawing, self.flinger)
 
         if self.scheme.draw_buildings:
             self.draw_buildings(
@@ -102,7 +112,7 @@ class Map:
 
         if self.scheme.draw_directions:
             for direction_sector in constructor.direction_sectors:
-                direction_sector.draw(self.svg, self.scheme)
+                direction_sector.draw(self.drawing, self.scheme)
 
         # All other points
 
@@ -122,11 +132,11 @@ class Map:
             )
             logging.info("Drawing main icons...")
             for node in nodes:
-                node.draw_main_shapes(self.svg, occupied)
+                node.draw_main_shapes(self.drawing, occupied)
 
             logging.info("Drawing extra icons...")
             for point in nodes:
-                point.draw_extra_shapes(self.svg, occupied)
+                point.draw_extra_shapes(self.drawing, occupied)
 
             logging.info("Drawing texts...")
             for point in nodes:
@@ -135,7 +145,7 @@ class Map:
                     and self.configuration.label_mode != LabelMode.NO
                 ):
                     point.draw_texts(
-                        self.svg, occupied, self.configuration.label_mode
+                        self.drawing, occupied, self.configuration.label_mode
                     )
 
         if self.configuration.show_credit:
@@ -149,16 +159,21 @@ class Map:
             return
         if self.configuration.building_mode == BuildingMode.FLAT:
             for building in constructor.buildings:
-                building.draw(self.svg, self.flinger, use_building_colors)
+                building.draw(
+                    self.drawing,
+                    self.flinger,
+                    use_building_colors,
+                    self.encoder,
+                )
             return
 
         logging.info("Drawing isometric buildings...")
 
         scale: float = self.flinger.get_scale()
-        building_shade: Group = Group(opacity=0.1)
+        building_shade: Group = Group(opacity=0.1, debug=False)
         for building in constructor.buildings:
-            building.draw_shade(building_shade, self.flinger)
-        self.svg.add(building_shade)
+            building.draw_shade(building_shade, self.flinger, self.encoder)
+        self.drawing.add(building_shade)
 
         walls: dict[Segment, Building] = {}
 
@@ -182,20 +197,25 @@ class Map:
                     continue
 
                 draw_walls(
-                    self.svg,
+                    self.drawing,
                     building,
                     wall,
                     height,
                     shift_1,
                     shift_2,
                     use_building_colors,
+                    self.encoder,
                 )
 
             if self.configuration.draw_roofs:
                 for building in constructor.buildings:
                     if building.height == height:
                         building.draw_roof(
-                            self.svg, self.flinger, scale, use_building_colors
+                            self.drawing,
+                            self.flinger,
+                            scale,
+                            use_building_colors,
+                            self.encoder,
                         )
 
             previous_height = height
@@ -213,7 +233,7 @@ class Map:
                 scale: float = self.flinger.get_scale(node_1.coordinates)
                 part_1: RoadPart = RoadPart(point_1, point_2, road.lanes, scale)
                 part_2: RoadPart = RoadPart(point_2, point_1, road.lanes, scale)
-                # part_1.draw_normal(self.svg)
+                # part_1.draw_normal(self.drawing)
 
                 for node in node_1, node_2:
                     if node not in nodes:
@@ -226,7 +246,7 @@ class Map:
             if len(parts) < 4:
                 continue
             intersection: Intersection = Intersection(list(parts))
-            intersection.draw(self.svg, True)
+            intersection.draw(self.drawing, True)
 
     def draw_credits(self, size: np.ndarray):
         """
@@ -259,7 +279,7 @@ class Map:
                 (1.0, None, 1.0),
             ):
                 draw_text(
-                    self.svg,
+                    self.drawing,
                     text,
                     size - np.array(point),
                     font_size,
@@ -287,7 +307,9 @@ def render_map(arguments: argparse.Namespace) -> None:
     if scheme_path is None:
         fatal(f"Scheme `{arguments.scheme}` not found.")
 
-    scheme: Optional[Scheme] = Scheme.from_file(scheme_path)
+    scheme: Optional[Scheme] = Scheme.from_file(
+        scheme_path, cache_path=workspace.get_cache_path()
+    )
     if scheme is None:
         fatal(f"Failed to load scheme from `{arguments.scheme}`.")
 
@@ -355,16 +377,21 @@ def render_map(arguments: argparse.Namespace) -> None:
 
     # Get OpenStreetMap data.
 
-    osm_data: OSMData = OSMData()
-    for input_file_name in input_file_names:
-        if not input_file_name.is_file():
-            logging.fatal(f"No such file: {input_file_name}.")
-            sys.exit(1)
-
-        if input_file_name.name.endswith(".json"):
-            osm_data.parse_overpass(input_file_name)
-        else:
-            osm_data.parse_osm_file(input_file_name)
+    osm_data: OSMData
+    if arguments.input_file_names:
+        osm_data = OSMData()
+        for input_file_name in input_file_names:
+            if not input_file_name.is_file():
+                logging.fatal(f"No such file: {input_file_name}.")
+                sys.exit(1)
+
+            if input_file_name.name.endswith(".json"):
+                osm_data.parse_overpass(input_file_name)
+            else:
+                osm_data.parse_osm_file(input_file_name)
+    else:
+        # Downloaded file is loaded from its snapshot if it was parsed before.
+        osm_data = load_osm_file(cache_file_path)
 
     if not boundary_box:
         boundary_box = osm_data.view_box
@@ -378,10 +405,10 @@ def render_map(arguments: argparse.Namespace) -> None:
     )
     size: np.ndarray = flinger.size
 
-    svg: svgwrite.Drawing = svgwrite.Drawing(arguments.output_file_name, size)
-    icon_extractor: ShapeExtractor = ShapeExtractor(
-        workspace.ICONS_PATH, workspace.ICONS_CONFIG_PATH
+    drawing: SVGStreamDrawing = SVGStreamDrawing(
+        Path(arguments.output_file_name), size[0], size[1]
     )
+    icon_extractor: ShapeExtractor = get_shape_extractor()
 
     constructor: Constructor = Constructor(
         osm_data=osm_data,
@@ -391,9 +418,10 @@ def render_map(arguments: argparse.Namespace) -> None:
     )
     constructor.construct()
 
-    map_: Map = Map(flinger=flinger, svg=svg, configuration=configuration)
+    map_: Map = Map(
+        flinger=flinger, drawing=drawing, configuration=configuration
+    )
     map_.draw(constructor)
 
     logging.info(f"Writing output SVG to {arguments.output_file_name}...")
-    with open(arguments.output_file_name, "w", encoding="utf-8") as output_file:
-        svg.write(output_file)
+    drawing.write()
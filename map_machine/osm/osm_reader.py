@@ -2,16 +2,21 @@
 import json
 import logging
 import re
+import time
+import tracemalloc
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Union
 from xml.etree import ElementTree
 from xml.etree.ElementTree import Element
 
 import numpy as np
 
 from map_machine.geometry.boundary_box import BoundaryBox
+from map_machine.geometry.flinger import pseudo_mercator_many
+from map_machine.geometry.spatial_index import GridIndex
 from map_machine.util import MinMax
 
 __author__ = "Sergey Vartanov"
@@ -24,6 +29,7 @@ KILOMETERS_PATTERN: re.Pattern = re.compile("^(?P<value>\\d*\\.?\\d*)\\s*km$")
 MILES_PATTERN: re.Pattern = re.compile("^(?P<value>\\d*\\.?\\d*)\\s*mi$")
 
 EARTH_EQUATOR_LENGTH: float = 40_075_017.0
+NODE_STORE_CAPACITY: int = 1024
 
 Tags = dict[str, str]
 
@@ -136,6 +142,9 @@ class OSMNode(Tagged):
     user: Optional[str] = None
     uid: Optional[str] = None
 
+    # Pseudo-Mercator position cached by `get_projected_coordinates`.
+    projected: Optional[np.ndarray] = field(default=None, repr=False)
+
     @classmethod
     def from_xml_structure(cls, element: Element) -> "OSMNode":
         """Parse node from OSM XML `<node>` element."""
@@ -194,6 +203,227 @@ class OSMNode(Tagged):
         )
 
 
+class NodeStore(Mapping[int, OSMNode]):
+    """
+    Columnar storage for OpenStreetMap nodes.
+
+    Node identifiers and coordinates are stored in NumPy arrays.  Only tagged
+    nodes are stored as `OSMNode` objects with all their tags and metadata,
+    for other nodes metadata is dropped: it is only used to draw tagged nodes.
+
+    The store may be used instead of node dictionary: nodes are accessed by
+    their identifiers as `OSMNode` objects.
+    """
+
+    def __init__(self) -> None:
+        self.ids: np.ndarray = np.empty(NODE_STORE_CAPACITY, dtype=np.int64)
+        self.coordinates: np.ndarray = np.empty(
+            (NODE_STORE_CAPACITY, 2), dtype=np.float64
+        )
+        self.size: int = 0
+
+        # Pseudo-Mercator positions of nodes, computed on demand.
+        self.projected: Optional[np.ndarray] = None
+
+        # Node index to tagged node.
+        self.tagged: dict[int, OSMNode] = {}
+
+        # Node identifier to node index.  While nodes are added in the order
+        # of their identifiers (that is usual for OSM XML files), the index is
+        # not needed, and binary search is used instead.
+        self.index: Optional[dict[int, int]] = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        ids: np.ndarray,
+        coordinates: np.ndarray,
+        tagged: dict[int, OSMNode],
+    ) -> "NodeStore":
+        """
+        Create store from existing arrays without copying them.
+
+        :param ids: node identifiers in ascending order
+        :param coordinates: (N, 2) array of node coordinates
+        :param tagged: node index to tagged node
+        """
+        store: NodeStore = cls()
+        store.ids = ids
+        store.coordinates = coordinates
+        store.size = len(ids)
+        store.tagged = tagged
+        return store
+
+    def add(self, node: OSMNode) -> None:
+        """Add node to the store."""
+        if self.size == len(self.ids):
+            capacity: int = max(2 * self.size, NODE_STORE_CAPACITY)
+            self.ids = np.resize(self.ids, capacity)
+            self.coordinates = np.resize(self.coordinates, (capacity, 2))
+
+        if (
+            self.index is None
+            and self.size
+            and node.id_ < self.ids[self.size - 1]
+        ):
+            self.index = {
+                int(id_): index
+                for index, id_ in enumerate(self.ids[: self.size])
+            }
+        if self.index is not None:
+            self.index[node.id_] = self.size
+
+        self.ids[self.size] = node.id_
+        self.coordinates[self.size] = node.coordinates
+        self.projected = None
+        if node.tags:
+            self.tagged[self.size] = node
+        self.size += 1
+
+    def get_index(self, id_: int) -> Optional[int]:
+        """Get index of the node or None if there is no such node."""
+        if self.index is not None:
+            return self.index.get(id_)
+
+        index: int = int(np.searchsorted(self.ids[: self.size], id_))
+        if index < self.size and self.ids[index] == id_:
+            return index
+        return None
+
+    def get_indices(self, ids: list[int]) -> np.ndarray:
+        """
+        Get indices of the nodes.
+
+        :param ids: node identifiers
+        :raise KeyError: if some node is not in the store
+        """
+        if self.index is not None:
+            return np.array([self.index[x] for x in ids], dtype=np.int64)
+
+        array: np.ndarray = np.array(ids, dtype=np.int64)
+        indices: np.ndarray = np.searchsorted(self.ids[: self.size], array)
+        found: np.ndarray = indices < self.size
+        found[found] = self.ids[indices[found]] == array[found]
+        if not found.all():
+            raise KeyError(int(array[~found][0]))
+        return indices
+
+    def get_node(self, index: int) -> OSMNode:
+        """Get node by its index in the store."""
+        if index in self.tagged:
+            return self.tagged[index]
+        return OSMNode({}, int(self.ids[index]), self.coordinates[index])
+
+    def get_projected(self) -> np.ndarray:
+        """
+        Get (N, 2) array of pseudo-Mercator positions of all nodes.  Positions
+        are computed once and reused until new nodes are added.
+        """
+        if self.projected is None:
+            self.projected = pseudo_mercator_many(self.coordinates[: self.size])
+        return self.projected
+
+    def get_sequence(self, ids: list[int]) -> "NodeSequence":
+        """Get node sequence (e.g. nodes of a way) by node identifiers."""
+        return NodeSequence(self, self.get_indices(ids))
+
+    def is_consistent(self, node: OSMNode) -> bool:
+        """
+        Check whether stored node with the same identifier has the same
+        coordinates and tags.
+        """
+        stored: OSMNode = self[node.id_]
+        return (
+            np.array_equal(stored.coordinates, node.coordinates)
+            and stored.tags == node.tags
+        )
+
+    def __getitem__(self, id_: int) -> OSMNode:
+        index: Optional[int] = self.get_index(id_)
+        if index is None:
+            raise KeyError(id_)
+        return self.get_node(index)
+
+    def __setitem__(self, id_: int, node: OSMNode) -> None:
+        assert id_ == node.id_
+        self.add(node)
+
+    def __contains__(self, id_: Any) -> bool:
+        return self.get_index(id_) is not None
+
+    def __iter__(self):
+        return iter(self.ids[: self.size].tolist())
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class NodeSequence(Sequence[OSMNode]):
+    """Sequence of nodes from the node store represented by node indices."""
+
+    def __init__(self, store: NodeStore, indices: np.ndarray) -> None:
+        self.store: NodeStore = store
+        self.indices: np.ndarray = indices
+
+    def get_coordinates(self) -> np.ndarray:
+        """Get (N, 2) array of node coordinates."""
+        return self.store.coordinates[self.indices]
+
+    def get_projected_coordinates(self) -> np.ndarray:
+        """Get (N, 2) array of node pseudo-Mercator positions."""
+        return self.store.get_projected()[self.indices]
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return [self.store.get_node(x) for x in self.indices[key]]
+        return self.store.get_node(int(self.indices[key]))
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, NodeSequence) and other.store is self.store:
+            return np.array_equal(self.indices, other.indices)
+        if isinstance(other, (NodeSequence, list, tuple)):
+            return list(self) == list(other)
+        return False
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def get_coordinates(nodes: Sequence[OSMNode]) -> np.ndarray:
+    """Get (N, 2) array of node coordinates."""
+    if isinstance(nodes, NodeSequence):
+        return nodes.get_coordinates()
+    if not nodes:
+        return np.empty((0, 2))
+    return np.array([node.coordinates for node in nodes])
+
+
+def get_projected_coordinates(nodes: Sequence[OSMNode]) -> np.ndarray:
+    """
+    Get (N, 2) array of node pseudo-Mercator positions.
+
+    Positions are cached in nodes (or in the node store), so that every
+    flinger, whatever zoom level and boundary box it has, reuses them.
+    """
+    if isinstance(nodes, NodeSequence):
+        return nodes.get_projected_coordinates()
+    if not nodes:
+        return np.empty((0, 2))
+
+    not_projected: list[OSMNode] = [x for x in nodes if x.projected is None]
+    if not_projected:
+        projected: np.ndarray = pseudo_mercator_many(
+            np.array([node.coordinates for node in not_projected])
+        )
+        for node, point in zip(not_projected, projected):
+            node.projected = point
+
+    return np.array([node.projected for node in nodes])
+
+
 @dataclass
 class OSMWay(Tagged):
     """
@@ -203,7 +433,9 @@ class OSMWay(Tagged):
     """
 
     id_: int
-    nodes: Optional[list[OSMNode]] = field(default_factory=list)
+    nodes: Optional[Union[list[OSMNode], NodeSequence]] = field(
+        default_factory=list
+    )
     visible: Optional[str] = None
     changeset: Optional[str] = None
     timestamp: Optional[datetime] = None
@@ -212,17 +444,26 @@ class OSMWay(Tagged):
 
     @classmethod
     def from_xml_structure(
-        cls, element: Element, nodes: dict[int, OSMNode]
+        cls, element: Element, nodes: Union[dict[int, OSMNode], NodeStore]
     ) -> "OSMWay":
         """Parse way from OSM XML `<way>` element."""
         attributes = element.attrib
         tags: Tags = {
             x.attrib["k"]: x.attrib["v"] for x in element if x.tag == "tag"
         }
+        way_nodes: Union[list[OSMNode], NodeSequence]
+        if isinstance(nodes, NodeStore):
+            way_nodes = nodes.get_sequence(
+                [int(x.attrib["ref"]) for x in element if x.tag == "nd"]
+            )
+        else:
+            way_nodes = [
+                nodes[int(x.attrib["ref"])] for x in element if x.tag == "nd"
+            ]
         return cls(
             tags,
             int(element.attrib["id"]),
-            [nodes[int(x.attrib["ref"])] for x in element if x.tag == "nd"],
+            way_nodes,
             attributes.get("visible", None),
             attributes.get("changeset", None),
             datetime.strptime(attributes["timestamp"], OSM_TIME_PATTERN)
@@ -339,8 +580,14 @@ class NotWellFormedOSMDataException(Exception):
 class OSMData:
     """The whole OpenStreetMap information about nodes, ways, and relations."""
 
-    def __init__(self) -> None:
-        self.nodes: dict[int, OSMNode] = {}
+    def __init__(self, columnar: bool = False) -> None:
+        """
+        :param columnar: store nodes in the columnar node store instead of the
+            dictionary to reduce memory consumption
+        """
+        self.nodes: Union[dict[int, OSMNode], NodeStore] = (
+            NodeStore() if columnar else {}
+        )
         self.ways: dict[int, OSMWay] = {}
         self.relations: dict[int, OSMRelation] = {}
 
@@ -351,10 +598,20 @@ class OSMData:
         self.boundary_box: Optional[BoundaryBox] = None
         self.equator_length: float = EARTH_EQUATOR_LENGTH
 
+        # Spatial index of nodes and ways and way identifier to identifiers of
+        # relations with this way, see `get_spatial_index`.
+        self.spatial_index: Optional[GridIndex] = None
+        self.way_relations: dict[int, list[int]] = {}
+
     def add_node(self, node: OSMNode) -> None:
         """Add node and update map parameters."""
+        self.spatial_index = None
         if node.id_ in self.nodes:
-            if node != self.nodes[node.id_]:
+            if (
+                not self.nodes.is_consistent(node)
+                if isinstance(self.nodes, NodeStore)
+                else node != self.nodes[node.id_]
+            ):
                 raise NotWellFormedOSMDataException(
                     f"Node with duplicate id {node.id_}."
                 )
@@ -372,6 +629,7 @@ class OSMData:
 
     def add_way(self, way: OSMWay) -> None:
         """Add way and update map parameters."""
+        self.spatial_index = None
         if way.id_ in self.ways:
             if way != self.ways[way.id_]:
                 raise NotWellFormedOSMDataException(
@@ -388,6 +646,7 @@ class OSMData:
 
     def add_relation(self, relation: OSMRelation) -> None:
         """Add relation and update map parameters."""
+        self.spatial_index = None
         if relation.id_ in self.relations:
             if relation != self.relations[relation.id_]:
                 raise NotWellFormedOSMDataException(
@@ -396,6 +655,98 @@ class OSMData:
             return
         self.relations[relation.id_] = relation
 
+    def get_spatial_index(self) -> GridIndex:
+        """
+        Get spatial index of nodes and way boundary boxes.  The index is built
+        once and rebuilt only if data is changed.
+        """
+        if self.spatial_index is not None:
+            return self.spatial_index
+
+        point_ids: np.ndarray
+        points: np.ndarray
+        if isinstance(self.nodes, NodeStore):
+            point_ids = self.nodes.ids[: self.nodes.size]
+            points = self.nodes.coordinates[: self.nodes.size]
+        else:
+            point_ids = np.fromiter(self.nodes.keys(), dtype=np.int64)
+            points = get_coordinates(list(self.nodes.values()))
+
+        box_ids: list[int] = []
+        boxes: list[tuple[float, float, float, float]] = []
+        for way_id, way in self.ways.items():
+            if not way.nodes:
+                continue
+            coordinates: np.ndarray = get_coordinates(way.nodes)
+            min_: np.ndarray = coordinates.min(axis=0)
+            max_: np.ndarray = coordinates.max(axis=0)
+            box_ids.append(way_id)
+            boxes.append((min_[1], min_[0], max_[1], max_[0]))
+
+        self.way_relations = {}
+        for relation_id, relation in self.relations.items():
+            for member in relation.members or []:
+                if member.type_ == "way":
+                    self.way_relations.setdefault(member.ref, []).append(
+                        relation_id
+                    )
+
+        self.spatial_index = GridIndex(
+            self.boundary_box or BoundaryBox(0.0, 0.0, 0.0, 0.0),
+            point_ids,
+            points,
+            np.array(box_ids, dtype=np.int64),
+            np.array(boxes, dtype=np.float64).reshape((-1, 4)),
+        )
+        return self.spatial_index
+
+    def query(self, boundary_box: BoundaryBox) -> "OSMData":
+        """
+        Get view of the data with nodes inside the boundary box, ways that
+        intersect it, and relations with such ways.  All ways of these
+        relations are added to the view too, so that relations may be
+        constructed.
+
+        The view shares node, way, and relation objects with the data.
+
+        :param boundary_box: area of interest
+        """
+        spatial_index: GridIndex = self.get_spatial_index()
+
+        view: OSMData = OSMData()
+        point_ids: list[int] = spatial_index.query_points(boundary_box).tolist()
+        if isinstance(self.nodes, NodeStore):
+            view.nodes = {
+                id_: self.nodes.get_node(index)
+                for id_, index in zip(
+                    point_ids, self.nodes.get_indices(point_ids).tolist()
+                )
+            }
+        else:
+            view.nodes = {id_: self.nodes[id_] for id_ in point_ids}
+        view.ways = {
+            int(id_): self.ways[int(id_)]
+            for id_ in spatial_index.query_boxes(boundary_box)
+        }
+        for way_id in list(view.ways):
+            for relation_id in self.way_relations.get(way_id, []):
+                if relation_id in view.relations:
+                    continue
+                relation: OSMRelation = self.relations[relation_id]
+                view.relations[relation_id] = relation
+                for member in relation.members or []:
+                    if member.type_ == "way" and member.ref in self.ways:
+                        view.ways[member.ref] = self.ways[member.ref]
+
+        view.authors = self.authors
+        view.levels = self.levels
+        view.time = self.time
+        view.view_box = boundary_box
+        view.boundary_box = self.boundary_box
+        view.equator_length = self.equator_length
+
+        return view
+
     def parse_overpass(self, file_name: Path) -> None:
         """
         Parse JSON structure extracted from Overpass API.
@@ -437,12 +788,43 @@ class OSMData:
         """
         Parse OSM XML file.
 
+        The file is parsed incrementally: every top-level element is cleared
+        right after it is converted into a node, a way, or a relation, so the
+        whole XML tree is never kept in memory.
+
         See https://wiki.openstreetmap.org/wiki/OSM_XML
 
         :param file_name: input XML file
-        :return: parsed map
         """
-        self.parse_osm(ElementTree.parse(file_name).getroot())
+        start_time: float = time.time()
+        context = ElementTree.iterparse(str(file_name), events=("start", "end"))
+        root: Element
+        _, root = next(context)
+        depth: int = 1
+        count: int = 0
+
+        for event, element in context:
+            if event == "start":
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 1:
+                self.parse_element(element)
+                count += 1
+                # Drop already processed elements from the root.
+                root.clear()
+
+        duration: float = time.time() - start_time
+        message: str = (
+            f"Parsed {count} elements from {file_name} in {duration:.2f} s"
+        )
+        if duration > 0.0:
+            message += f", {count / duration:.0f} elements/s"
+        if tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            message += f", peak memory {peak / 1024.0 / 1024.0:.1f} MiB"
+        logging.debug(message + ".")
 
     def parse_osm_text(self, text: str) -> None:
         """
@@ -469,17 +851,35 @@ class OSMData:
         :param parse_relations: whether relations should be parsed
         """
         for element in root:
-            if element.tag == "bounds":
-                self.parse_bounds(element)
-            elif element.tag == "object":
-                self.parse_object(element)
-            elif element.tag == "node" and parse_nodes:
-                node = OSMNode.from_xml_structure(element)
-                self.add_node(node)
-            elif element.tag == "way" and parse_ways:
-                self.add_way(OSMWay.from_xml_structure(element, self.nodes))
-            elif element.tag == "relation" and parse_relations:
-                self.add_relation(OSMRelation.from_xml_structure(element))
+            self.parse_element(
+                element, parse_nodes, parse_ways, parse_relations
+            )
+
+    def parse_element(
+        self,
+        element: Element,
+        parse_nodes: bool = True,
+        parse_ways: bool = True,
+        parse_relations: bool = True,
+    ) -> None:
+        """
+        Parse top-level element of OSM XML data.
+
+        :param element: child element of the root `<osm>` element
+        :param parse_nodes: whether nodes should be parsed
+        :param parse_ways: whether ways should be parsed
+        :param parse_relations: whether relations should be parsed
+        """
+        if element.tag == "bounds":
+            self.parse_bounds(element)
+        elif element.tag == "object":
+            self.parse_object(element)
+        elif element.tag == "node" and parse_nodes:
+            self.add_node(OSMNode.from_xml_structure(element))
+        elif element.tag == "way" and parse_ways:
+            self.add_way(OSMWay.from_xml_structure(element, self.nodes))
+        elif element.tag == "relation" and parse_relations:
+            self.add_relation(OSMRelation.from_xml_structure(element))
 
     def parse_bounds(self, element: Element) -> None:
         """Parse view box from XML element."""
@@ -0,0 +1,460 @@
+"""
+Binary snapshot of parsed OpenStreetMap data.
+
+Snapshot stores `OSMData` as flat arrays: node identifiers and coordinates,
+node indices of ways, relation members, and tags and metadata of elements as
+indices in the table of deduplicated strings.  It is written next to the OSM
+XML file and is memory-mapped on loading, so that node arrays are not copied
+and processes forked after loading share the same pages.
+"""
+import json
+import logging
+import mmap
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+from map_machine.geometry.boundary_box import BoundaryBox
+from map_machine.osm.osm_reader import (
+    NodeSequence,
+    NodeStore,
+    OSMData,
+    OSMMember,
+    OSMNode,
+    OSMRelation,
+    OSMWay,
+    get_coordinates,
+)
+
+__author__ = "Sergey Vartanov"
+__email__ = "me@enzet.ru"
+
+SNAPSHOT_MAGIC: bytes = b"MMOSMSNP"
+SNAPSHOT_VERSION: int = 1
+SNAPSHOT_ALIGNMENT: int = 64
+
+EPOCH: datetime = datetime(1970, 1, 1)
+NO_TIMESTAMP: int = np.iinfo(np.int64).min
+
+# String attributes of nodes, ways, and relations.
+METADATA: list[str] = ["visible", "changeset", "user", "uid"]
+
+Element = Union[OSMNode, OSMWay, OSMRelation]
+
+
+def get_snapshot_path(file_name: Path) -> Path:
+    """Get path of the snapshot for the OSM XML file."""
+    return file_name.with_suffix(".snapshot")
+
+
+def get_source_key(file_name: Path) -> list[int]:
+    """Get size and modification time of the file to check the snapshot."""
+    stat: os.stat_result = file_name.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def to_seconds(moment: Optional[datetime]) -> int:
+    """Convert time to seconds since epoch."""
+    if moment is None:
+        return NO_TIMESTAMP
+    return (moment - EPOCH) // timedelta(seconds=1)
+
+
+def from_seconds(seconds: int) -> Optional[datetime]:
+    """Convert seconds since epoch to time."""
+    if seconds == NO_TIMESTAMP:
+        return None
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def align(size: int) -> int:
+    """Round size up to the alignment of arrays in the snapshot file."""
+    return -(-size // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+
+def get_data_offset(header_size: int) -> int:
+    """Get offset of the first array in the snapshot file."""
+    return align(len(SNAPSHOT_MAGIC) + 8 + header_size)
+
+
+class StringTable:
+    """Deduplicated strings referenced by their indices."""
+
+    def __init__(self) -> None:
+        self.indices: dict[str, int] = {}
+
+    def get_index(self, string: Optional[str]) -> int:
+        """Get index of the string, -1 for `None`."""
+        if string is None:
+            return -1
+        index: Optional[int] = self.indices.get(string)
+        if index is None:
+            index = self.indices[string] = len(self.indices)
+        return index
+
+    def get_arrays(self) -> dict[str, np.ndarray]:
+        """Get UTF-8 encoded strings and their character offsets."""
+        offsets: np.ndarray = np.zeros(len(self.indices) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in self.indices], out=offsets[1:])
+        return {
+            "strings": np.frombuffer(
+                "".join(self.indices).encode("utf-8"), dtype=np.uint8
+            ),
+            "string_offsets": offsets,
+        }
+
+
+def pack_elements(
+    prefix: str, elements: Sequence[Element], strings: StringTable
+) -> dict[str, np.ndarray]:
+    """
+    Pack tags and metadata of nodes, ways, or relations into arrays.
+
+    :param prefix: prefix of array names
+    :param elements: OSM elements
+    :param strings: table of strings to add tags and metadata to
+    """
+    tag_offsets: list[int] = [0]
+    keys: list[int] = []
+    values: list[int] = []
+    metadata: dict[str, list[int]] = {name: [] for name in METADATA}
+    timestamps: list[int] = []
+
+    for element in elements:
+        for key, value in element.tags.items():
+            keys.append(strings.get_index(key))
+            values.append(strings.get_index(value))
+        tag_offsets.append(len(keys))
+        for name, indices in metadata.items():
+            indices.append(strings.get_index(getattr(element, name)))
+        timestamps.append(to_seconds(element.timestamp))
+
+    arrays: dict[str, np.ndarray] = {
+        f"{prefix}_ids": np.array([x.id_ for x in elements], dtype=np.int64),
+        f"{prefix}_tag_offsets": np.array(tag_offsets, dtype=np.int64),
+        f"{prefix}_tag_keys": np.array(keys, dtype=np.int32),
+        f"{prefix}_tag_values": np.array(values, dtype=np.int32),
+        f"{prefix}_timestamps": np.array(timestamps, dtype=np.int64),
+    }
+    for name, indices in metadata.items():
+        arrays[f"{prefix}_{name}"] = np.array(indices, dtype=np.int32)
+    return arrays
+
+
+def write_snapshot(
+    osm_data: OSMData,
+    snapshot_path: Path,
+    source_key: list[int],
+    parse_duration: float = 0.0,
+) -> None:
+    """
+    Write snapshot of OSM data.  The snapshot is written to the temporary file
+    first, so that other processes and threads never read partially written
+    snapshot.
+
+    Untagged nodes are stored without metadata, the same way as in the
+    columnar node store.
+
+    :param osm_data: parsed OSM data
+    :param snapshot_path: output file
+    :param source_key: size and modification time of the OSM XML file
+    :param parse_duration: time of OSM XML file parsing in seconds
+    """
+    ids: np.ndarray
+    coordinates: np.ndarray
+    tagged: dict[int, OSMNode]
+    if isinstance(osm_data.nodes, NodeStore):
+        ids = osm_data.nodes.ids[: osm_data.nodes.size]
+        coordinates = osm_data.nodes.coordinates[: osm_data.nodes.size]
+        tagged = osm_data.nodes.tagged
+    else:
+        nodes: list[OSMNode] = list(osm_data.nodes.values())
+        ids = np.array([x.id_ for x in nodes], dtype=np.int64)
+        coordinates = get_coordinates(nodes).reshape((-1, 2))
+        tagged = {index: x for index, x in enumerate(nodes) if x.tags}
+
+    # Nodes are sorted by identifiers to be found with binary search.
+    order: np.ndarray = np.argsort(ids, kind="stable")
+    positions: np.ndarray = np.empty_like(order)
+    positions[order] = np.arange(len(order))
+    node_index: Optional[dict[int, int]] = None
+
+    way_node_offsets: list[int] = [0]
+    way_nodes: list[np.ndarray] = []
+    for way in osm_data.ways.values():
+        indices: np.ndarray
+        if (
+            isinstance(way.nodes, NodeSequence)
+            and way.nodes.store is osm_data.nodes
+        ):
+            indices = way.nodes.indices
+        else:
+            if node_index is None:
+                node_index = {int(x): i for i, x in enumerate(ids)}
+            indices = np.array(
+                [node_index[x.id_] for x in way.nodes or []], dtype=np.int64
+            )
+        way_nodes.append(positions[indices])
+        way_node_offsets.append(way_node_offsets[-1] + len(indices))
+
+    member_offsets: list[int] = [0]
+    members: list[OSMMember] = []
+    for relation in osm_data.relations.values():
+        members += relation.members or []
+        member_offsets.append(len(members))
+
+    tagged_indices: np.ndarray = np.sort(
+        positions[np.array(list(tagged), dtype=np.int64)]
+    )
+    tagged_nodes: list[OSMNode] = [
+        tagged[int(x)] for x in order[tagged_indices]
+    ]
+
+    strings: StringTable = StringTable()
+    arrays: dict[str, np.ndarray] = {
+        "node_ids": ids[order],
+        "node_coordinates": coordinates[order],
+        "tagged_indices": tagged_indices,
+        "way_node_offsets": np.array(way_node_offsets, dtype=np.int64),
+        "way_nodes": np.concatenate(way_nodes or [np.empty(0, np.int64)]),
+        "member_offsets": np.array(member_offsets, dtype=np.int64),
+        "member_types": np.array(
+            [strings.get_index(x.type_) for x in members], dtype=np.int32
+        ),
+        "member_refs": np.array([x.ref for x in members], dtype=np.int64),
+        "member_roles": np.array(
+            [strings.get_index(x.role) for x in members], dtype=np.int32
+        ),
+    }
+    arrays |= pack_elements("tagged", tagged_nodes, strings)
+    arrays |= pack_elements("way", list(osm_data.ways.values()), strings)
+    arrays |= pack_elements(
+        "relation", list(osm_data.relations.values()), strings
+    )
+    arrays |= strings.get_arrays()
+
+    layout: dict[str, Any] = {}
+    offset: int = 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset += align(array.nbytes)
+
+    def get_box(box: Optional[BoundaryBox]) -> Optional[list[float]]:
+        if box is None:
+            return None
+        return [box.left, box.bottom, box.right, box.top]
+
+    header: bytes = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "source": source_key,
+            "parse_duration": parse_duration,
+            "arrays": layout,
+            "authors": sorted(osm_data.authors),
+            "levels": sorted(osm_data.levels),
+            "time": [
+                to_seconds(osm_data.time.min_),
+                to_seconds(osm_data.time.max_),
+            ],
+            "view_box": get_box(osm_data.view_box),
+            "boundary_box": get_box(osm_data.boundary_box),
+            "equator_length": osm_data.equator_length,
+        }
+    ).encode("utf-8")
+
+    # Temporary file is unique for every call, so that concurrent writes from
+    # different processes and threads don't interfere.
+    descriptor, name = tempfile.mkstemp(
+        prefix=f"{snapshot_path.name}.", suffix=".tmp", dir=snapshot_path.parent
+    )
+    temporary_path: Path = Path(name)
+    try:
+        with os.fdopen(descriptor, "wb") as output_file:
+            output_file.write(SNAPSHOT_MAGIC)
+            output_file.write(len(header).to_bytes(8, "little"))
+            output_file.write(header)
+            data_start: int = get_data_offset(len(header))
+            for name, array in arrays.items():
+                output_file.seek(data_start + layout[name][2])
+                output_file.write(np.ascontiguousarray(array).data)
+            output_file.truncate(data_start + offset)
+        os.replace(temporary_path, snapshot_path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+class SnapshotReader:
+    """Memory-mapped snapshot of OSM data."""
+
+    def __init__(self, snapshot_path: Path) -> None:
+        """
+        :param snapshot_path: snapshot file
+        :raise ValueError: if file is not a snapshot of the supported version
+        """
+        with snapshot_path.open("rb") as input_file:
+            self.buffer: mmap.mmap = mmap.mmap(
+                input_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        magic_size: int = len(SNAPSHOT_MAGIC)
+        if self.buffer[:magic_size] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{snapshot_path} is not a snapshot.")
+        header_size: int = int.from_bytes(
+            self.buffer[magic_size : magic_size + 8], "little"
+        )
+        self.header: dict[str, Any] = json.loads(
+            self.buffer[magic_size + 8 : magic_size + 8 + header_size]
+        )
+        if self.header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot version in {snapshot_path}."
+            )
+        self.data_offset: int = get_data_offset(header_size)
+
+        text: str = bytes(self.get_array("strings")).decode("utf-8")
+        offsets: list[int] = self.get_array("string_offsets").tolist()
+        self.strings: list[str] = [
+            text[start:end] for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def get_array(self, name: str) -> np.ndarray:
+        """Get read-only array backed by the memory-mapped file."""
+        dtype, shape, offset = self.header["arrays"][name]
+        return np.frombuffer(
+            self.buffer,
+            dtype=np.dtype(dtype),
+            count=int(np.prod(shape)),
+            offset=self.data_offset + offset,
+        ).reshape(shape)
+
+    def get_elements(self, prefix: str) -> list[tuple[Any, ...]]:
+        """
+        Get identifiers, tags, and metadata of nodes, ways, or relations in
+        the order of `OSMNode`, `OSMWay`, and `OSMRelation` fields.
+        """
+        strings: list[Optional[str]] = self.strings + [None]
+        ids: list[int] = self.get_array(f"{prefix}_ids").tolist()
+        tag_offsets: list[int] = self.get_array(
+            f"{prefix}_tag_offsets"
+        ).tolist()
+        keys: list[int] = self.get_array(f"{prefix}_tag_keys").tolist()
+        values: list[int] = self.get_array(f"{prefix}_tag_values").tolist()
+        metadata: list[list[Optional[str]]] = [
+            [strings[x] for x in self.get_array(f"{prefix}_{name}").tolist()]
+            for name in METADATA
+        ]
+        timestamps: list[Optional[datetime]] = [
+            from_seconds(x)
+            for x in self.get_array(f"{prefix}_timestamps").tolist()
+        ]
+        elements: list[tuple[Any, ...]] = []
+        for index, id_ in enumerate(ids):
+            tags: dict[str, str] = {
+                self.strings[keys[x]]: self.strings[values[x]]
+                for x in range(tag_offsets[index], tag_offsets[index + 1])
+            }
+            visible, changeset, user, uid = (x[index] for x in metadata)
+            elements.append(
+                (tags, id_, visible, changeset, timestamps[index], user, uid)
+            )
+        return elements
+
+    def get_box(self, name: str) -> Optional[BoundaryBox]:
+        """Get boundary box from the header."""
+        box: Optional[list[float]] = self.header[name]
+        return None if box is None else BoundaryBox(*box)
+
+    def get_osm_data(self) -> OSMData:
+        """Construct OSM data with nodes stored in the columnar node store."""
+        coordinates: np.ndarray = self.get_array("node_coordinates")
+        tagged: dict[int, OSMNode] = {}
+        for index, element in zip(
+            self.get_array("tagged_indices").tolist(),
+            self.get_elements("tagged"),
+        ):
+            tags, id_, *metadata = element
+            tagged[index] = OSMNode(tags, id_, coordinates[index], *metadata)
+        store: NodeStore = NodeStore.from_arrays(
+            self.get_array("node_ids"), coordinates, tagged
+        )
+
+        osm_data: OSMData = OSMData()
+        osm_data.nodes = store
+
+        way_nodes: np.ndarray = self.get_array("way_nodes")
+        offsets: list[int] = self.get_array("way_node_offsets").tolist()
+        for (tags, id_, *metadata), start, end in zip(
+            self.get_elements("way"), offsets, offsets[1:]
+        ):
+            osm_data.ways[id_] = OSMWay(
+                tags, id_, NodeSequence(store, way_nodes[start:end]), *metadata
+            )
+
+        types: list[str] = [
+            self.strings[x] for x in self.get_array("member_types").tolist()
+        ]
+        refs: list[int] = self.get_array("member_refs").tolist()
+        roles: list[str] = [
+            self.strings[x] for x in self.get_array("member_roles").tolist()
+        ]
+        offsets = self.get_array("member_offsets").tolist()
+        for (tags, id_, *metadata), start, end in zip(
+            self.get_elements("relation"), offsets, offsets[1:]
+        ):
+            members: list[OSMMember] = [
+                OSMMember(types[x], refs[x], roles[x])
+                for x in range(start, end)
+            ]
+            osm_data.relations[id_] = OSMRelation(tags, id_, members, *metadata)
+
+        osm_data.authors = set(self.header["authors"])
+        osm_data.levels = set(self.header["levels"])
+        osm_data.time.min_, osm_data.time.max_ = map(
+            from_seconds, self.header["time"]
+        )
+        osm_data.view_box = self.get_box("view_box")
+        osm_data.boundary_box = self.get_box("boundary_box")
+        osm_data.equator_length = self.header["equator_length"]
+
+        return osm_data
+
+
+def load_osm_file(file_name: Path) -> OSMData:
+    """
+    Load OSM XML file from its snapshot if the snapshot is up to date,
+    otherwise parse the file and write the snapshot next to it.
+
+    :param file_name: input XML file
+    """
+    snapshot_path: Path = get_snapshot_path(file_name)
+    source_key: list[int] = get_source_key(file_name)
+
+    start_time: float = time.time()
+    try:
+        reader: SnapshotReader = SnapshotReader(snapshot_path)
+        if reader.header["source"] == source_key:
+            osm_data: OSMData = reader.get_osm_data()
+            logging.debug(
+                f"Loaded {file_name} from snapshot in "
+                f"{time.time() - start_time:.3f} s, parsing took "
+                f"{reader.header['parse_duration']:.3f} s."
+            )
+            return osm_data
+    except (OSError, ValueError, KeyError):
+        logging.debug(f"Cannot load snapshot {snapshot_path}.")
+
+    start_time = time.time()
+    osm_data = OSMData()
+    osm_data.parse_osm_file(file_name)
+    parse_duration: float = time.time() - start_time
+
+    try:
+        write_snapshot(osm_data, snapshot_path, source_key, parse_duration)
+    except OSError:
+        logging.debug(f"Cannot write snapshot {snapshot_path}.")
+
+    return osm_data
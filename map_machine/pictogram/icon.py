@@ -1,22 +1,27 @@
 """Extract icons from SVG file."""
 import json
 import logging
+import os
 import re
+import tempfile
 from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import sha256
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Union
 from xml.etree import ElementTree
 from xml.etree.ElementTree import Element
 
 import numpy as np
 import svgwrite
 from colour import Color
-from svgwrite import Drawing
 from svgwrite.base import BaseElement
-from svgwrite.container import Group
+from svgwrite.container import Group, Use
 from svgwrite.path import Path as SVGPath
 
 from map_machine.color import is_bright
+from map_machine.drawing import Drawing
+from map_machine.workspace import workspace
 
 __author__ = "Sergey Vartanov"
 __email__ = "me@enzet.ru"
@@ -32,6 +37,9 @@ PATH_MATCHER: re.Pattern = re.compile("[Mm] ([0-9.e-]*)[, ]([0-9.e-]*)")
 
 GRID_STEP: int = 16
 
+# Version of the icon bundle format.  Bundles of other versions are ignored.
+BUNDLE_VERSION: int = 1
+
 USED_ICON_COLOR: str = "#000000"
 UNUSED_ICON_COLORS: list[str] = ["#0000ff", "#ff0000"]
 
@@ -136,6 +144,19 @@ class Shape:
         :param offset: additional offset
         :param scale: scale resulting image
         """
+        transformations: list[str] = self.get_transformations(
+            point, offset, scale
+        )
+        transformations.append(f"translate({self.offset[0]},{self.offset[1]})")
+
+        return svgwrite.path.Path(
+            d=self.path, transform=" ".join(transformations), debug=False
+        )
+
+    def get_transformations(
+        self, point: np.ndarray, offset: np.ndarray, scale: np.ndarray
+    ) -> list[str]:
+        """Get SVG transformations to place the shape on the map."""
         transformations: list[str] = []
         shift: np.ndarray = point + offset
 
@@ -144,10 +165,41 @@ class Shape:
         if not np.allclose(scale, np.array((1.0, 1.0))):
             transformations.append(f"scale({scale[0]},{scale[1]})")
 
-        transformations.append(f"translate({self.offset[0]},{self.offset[1]})")
+        return transformations
 
+    def get_symbol_id(self) -> str:
+        """Get identifier of the shape definition in SVG file."""
+        return f"shape_{self.id_}"
+
+    def get_symbol(self) -> SVGPath:
+        """
+        Get shape definition that is referenced by `get_use` elements.  The
+        definition has no style, so that it is inherited from the reference.
+        """
         return svgwrite.path.Path(
-            d=self.path, transform=" ".join(transformations)
+            d=self.path,
+            id=self.get_symbol_id(),
+            transform=f"translate({self.offset[0]},{self.offset[1]})",
+            debug=False,
+        )
+
+    def get_use(
+        self,
+        point: np.ndarray,
+        offset: np.ndarray = np.array((0.0, 0.0)),
+        scale: np.ndarray = np.array((1.0, 1.0)),
+    ) -> Use:
+        """
+        Get reference to the shape definition, see `get_symbol`.
+
+        :param point: icon position
+        :param offset: additional offset
+        :param scale: scale resulting image
+        """
+        return Use(
+            f"#{self.get_symbol_id()}",
+            transform=" ".join(self.get_transformations(point, offset, scale)),
+            debug=False,
         )
 
     def get_full_id(self) -> str:
@@ -265,17 +317,32 @@ class ShapeExtractor:
     """
 
     def __init__(
-        self, svg_file_name: Path, configuration_file_name: Path
+        self,
+        svg_file_name: Path,
+        configuration_file_name: Path,
+        bundle_path: Optional[Path] = None,
     ) -> None:
         """
         :param svg_file_name: input SVG file name with icons.  File may contain
             any other irrelevant graphics.
         :param configuration_file_name: JSON file with grouped shape
             descriptions
+        :param bundle_path: JSON file with already extracted shapes.  If it
+            doesn't exist or was created from other input files, shapes are
+            extracted from the SVG file and the bundle is written.
         """
         self.shapes: dict[str, Shape] = {}
-
         self.configuration: dict[str, Any] = {}
+
+        key: str = ""
+        if bundle_path is not None:
+            files_hash: str = get_files_hash(
+                [svg_file_name, configuration_file_name]
+            )
+            key = f"{BUNDLE_VERSION}:{files_hash}"
+            if self.read_bundle(bundle_path, key):
+                return
+
         parse_configuration(
             json.load(configuration_file_name.open(encoding="utf-8")),
             self.configuration,
@@ -290,6 +357,88 @@ class ShapeExtractor:
                     f"Configuration for unknown shape `{shape_id}`."
                 )
 
+        if bundle_path is not None:
+            self.write_bundle(bundle_path, key)
+
+    def read_bundle(self, bundle_path: Path, key: str) -> bool:
+        """
+        Read extracted shapes from the bundle file.
+
+        :param bundle_path: JSON file written by `write_bundle`
+        :param key: hash of the input files
+        :returns: false if there is no valid bundle for the input files
+        """
+        try:
+            with bundle_path.open(encoding="utf-8") as input_file:
+                bundle: dict[str, Any] = json.load(input_file)
+        except (OSError, ValueError):
+            return False
+
+        if not isinstance(bundle, dict) or bundle.get("key") != key:
+            logging.debug(f"Icon bundle {bundle_path} is outdated.")
+            return False
+
+        # Bundle with the valid key may still be broken, e.g. by other version
+        # of Map Machine or manual editing.  Such a bundle is ignored.
+        configuration: dict[str, Any]
+        shapes: dict[str, Shape] = {}
+        try:
+            configuration = bundle["configuration"]
+            for id_, (path, x, y, name) in bundle["shapes"].items():
+                shapes[id_] = Shape.from_structure(
+                    configuration.get(id_, {}),
+                    path,
+                    np.array((x, y)),
+                    id_,
+                    name,
+                )
+        except (AttributeError, KeyError, TypeError, ValueError):
+            logging.debug(f"Icon bundle {bundle_path} is broken.")
+            return False
+
+        self.configuration = configuration
+        self.shapes = shapes
+        return True
+
+    def write_bundle(self, bundle_path: Path, key: str) -> None:
+        """
+        Write extracted shapes to the bundle file, so that they may be read
+        without SVG file parsing.
+
+        :param bundle_path: output JSON file
+        :param key: hash of the input files
+        """
+        bundle: dict[str, Any] = {
+            "key": key,
+            "configuration": self.configuration,
+            "shapes": {
+                id_: [shape.path, *shape.offset.tolist(), shape.name]
+                for id_, shape in self.shapes.items()
+            },
+        }
+        try:
+            bundle_path.parent.mkdir(parents=True, exist_ok=True)
+            # Bundle is written to the unique temporary file first, so that
+            # other processes never read partially written bundle.
+            descriptor, name = tempfile.mkstemp(
+                prefix=f"{bundle_path.name}.",
+                suffix=".tmp",
+                dir=bundle_path.parent,
+            )
+        except OSError:
+            logging.debug(f"Cannot write icon bundle to {bundle_path}.")
+            return
+
+        temporary_path: Path = Path(name)
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as output_file:
+                json.dump(bundle, output_file)
+            os.replace(temporary_path, bundle_path)
+        except OSError:
+            logging.debug(f"Cannot write icon bundle to {bundle_path}.")
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
     def parse(self, node: Element) -> None:
         """
         Extract icon paths into a map.
@@ -364,6 +513,34 @@ class ShapeExtractor:
         assert False, f"no shape with id {id_} in icons file"
 
 
+def get_files_hash(paths: list[Path]) -> str:
+    """Compute hash of the files content."""
+    hash_: Any = sha256()
+    for path in paths:
+        hash_.update(path.read_bytes())
+    return hash_.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_shape_extractor(
+    svg_file_name: Path = workspace.ICONS_PATH,
+    configuration_file_name: Path = workspace.ICONS_CONFIG_PATH,
+) -> ShapeExtractor:
+    """
+    Get shape extractor shared by the whole process.  Extracted shapes are
+    also stored in the icon bundle, so that other processes don't have to parse
+    the SVG file.
+
+    :param svg_file_name: input SVG file name with icons
+    :param configuration_file_name: JSON file with grouped shape descriptions
+    """
+    return ShapeExtractor(
+        svg_file_name,
+        configuration_file_name,
+        workspace.get_icons_bundle_path(),
+    )
+
+
 @dataclass
 class ShapeSpecification:
     """Specification for shape as a part of an icon."""
@@ -387,6 +564,7 @@ class ShapeSpecification:
         outline: bool = False,
         outline_opacity: float = 1.0,
         scale: float = 1.0,
+        drawing: Optional[Drawing] = None,
     ) -> None:
         """
         Draw icon shape into SVG file.
@@ -398,6 +576,8 @@ class ShapeSpecification:
         :param outline: draw outline for the shape
         :param outline_opacity: opacity of the outline
         :param scale: scale icon by the magnitude
+        :param drawing: if specified, the shape is defined once in the drawing
+            and drawn as a reference to the definition
         """
         scale_vector: np.ndarray = np.array((scale, scale))
         if self.flip_vertically:
@@ -406,9 +586,13 @@ class ShapeSpecification:
             scale_vector = np.array((-scale, scale))
 
         point: np.ndarray = np.array(list(map(int, point)))
-        path: SVGPath = self.shape.get_path(
-            point, self.offset * scale, scale_vector
-        )
+        path: Union[SVGPath, Use]
+        if drawing is not None:
+            if not drawing.has_definition(self.shape.get_symbol_id()):
+                drawing.add_definition(self.shape.get_symbol())
+            path = self.shape.get_use(point, self.offset * scale, scale_vector)
+        else:
+            path = self.shape.get_path(point, self.offset * scale, scale_vector)
         path.update({"fill": self.color.hex})
 
         if outline and self.use_outline:
@@ -494,34 +678,47 @@ class Icon:
 
     def draw(
         self,
-        svg: svgwrite.Drawing,
+        svg: Union[svgwrite.Drawing, Drawing],
         point: np.ndarray,
         tags: dict[str, Any] = None,
         outline: bool = False,
         scale: float = 1.0,
+        use_symbols: bool = False,
     ) -> None:
         """
         Draw icon to SVG.
 
-        :param svg: output SVG file
+        :param svg: output SVG file or drawing
         :param point: 2D position of the icon centre
         :param tags: tags to be displayed as a tooltip
         :param outline: draw outline for the icon
         :param scale: scale icon by the magnitude
+        :param use_symbols: define shapes once in the drawing and draw
+            references to them
         """
+        drawing: Optional[Drawing] = (
+            svg if use_symbols and isinstance(svg, Drawing) else None
+        )
         if outline:
             bright: bool = is_bright(self.shape_specifications[0].color)
             opacity: float = 0.7 if bright else 0.5
-            outline_group: Group = Group(opacity=opacity)
+            outline_group: Group = Group(opacity=opacity, debug=False)
             for shape_specification in self.shape_specifications:
                 shape_specification.draw(
-                    outline_group, point, tags, True, scale=scale
+                    outline_group,
+                    point,
+                    tags,
+                    True,
+                    scale=scale,
+                    drawing=drawing,
                 )
             svg.add(outline_group)
         else:
-            group: Group = Group(opacity=self.opacity)
+            group: Group = Group(opacity=self.opacity, debug=False)
             for shape_specification in self.shape_specifications:
-                shape_specification.draw(group, point, tags, scale=scale)
+                shape_specification.draw(
+                    group, point, tags, scale=scale, drawing=drawing
+                )
             svg.add(group)
 
     def draw_to_file(
@@ -539,7 +736,7 @@ class Icon:
         :param outline: if true, draw outline beneath the icon
         :param outline_opacity: opacity of the outline
         """
-        svg: Drawing = Drawing(str(file_name), (16, 16))
+        svg: svgwrite.Drawing = svgwrite.Drawing(str(file_name), (16, 16))
 
         if outline:
             for shape_specification in self.shape_specifications:
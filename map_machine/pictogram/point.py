@@ -1,12 +1,11 @@
 """Point: node representation on the map."""
-import logging
-from typing import Optional
+from typing import Iterator, Optional
 
 import numpy as np
-import svgwrite
 from colour import Color
+from svgwrite.shapes import Rect
 
-from map_machine.drawing import draw_text
+from map_machine.drawing import Drawing, draw_text
 from map_machine.map_configuration import LabelMode
 from map_machine.osm.osm_reader import Tagged
 from map_machine.pictogram.icon import Icon, IconSet
@@ -16,38 +15,143 @@ __author__ = "Sergey Vartanov"
 __email__ = "me@enzet.ru"
 
 
+# Rectangle: minimum x, minimum y, maximum x, and maximum y coordinates.
+# Maximum coordinates are exclusive.
+Area = tuple[int, int, int, int]
+
+# Size of square cells of the `Occupied` spatial index.
+CELL_SIZE: int = 64
+
+
 class Occupied:
     """
     Structure that remembers places of the canvas occupied by elements (icons,
     texts, shapes).
-    """
 
-    def __init__(self, width: int, height: int, overlap: int) -> None:
-        self.matrix = np.full((int(width), int(height)), False, dtype=bool)
-        try:
-            self.matrix = np.full((int(width), int(height)), False, dtype=bool)
-        except Exception:
-            logging.fatal(
-                "Failed to allocate a matrix required by overlap algorithm. "
-                "Try to use smallest area or try --overlap=0 options."
-            )
-            exit(1)
+    Occupied places are stored as rectangles in a spatial index: a uniform
+    grid of cells, where every cell lists rectangles intersecting it.  So the
+    cost of checks and registrations depends on the number of nearby
+    elements and not on their size in pixels.  Points outside the canvas are
+    considered occupied.
+    """
 
+    def __init__(self, width: float, height: float, overlap: int) -> None:
         self.width: float = width
         self.height: float = height
         self.overlap: int = overlap
 
+        self.areas: list[Area] = []
+        self.cells: dict[tuple[int, int], list[int]] = {}
+
     def check(self, point: np.ndarray) -> bool:
         """Check whether point is already occupied by other elements."""
-        if 0.0 <= point[0] < self.width and 0.0 <= point[1] < self.height:
-            return self.matrix[point[0], point[1]]
-        return True
+        x, y = int(point[0]), int(point[1])
+        return self.check_area(x, y, x + 1, y + 1)
 
     def register(self, point: np.ndarray) -> None:
         """Register that point is occupied by an element."""
-        if 0.0 <= point[0] < self.width and 0.0 <= point[1] < self.height:
-            self.matrix[point[0], point[1]] = True
-            assert self.matrix[point[0], point[1]]
+        x, y = int(point[0]), int(point[1])
+        self.register_area(x, y, x + 1, y + 1)
+
+    def get_cells(
+        self, x_1: int, y_1: int, x_2: int, y_2: int
+    ) -> Iterator[tuple[int, int]]:
+        """Get keys of grid cells intersecting the rectangle."""
+        for cell_x in range(x_1 // CELL_SIZE, (x_2 - 1) // CELL_SIZE + 1):
+            for cell_y in range(y_1 // CELL_SIZE, (y_2 - 1) // CELL_SIZE + 1):
+                yield cell_x, cell_y
+
+    def check_area(self, x_1: int, y_1: int, x_2: int, y_2: int) -> bool:
+        """
+        Check whether any point of the rectangle is occupied or is outside
+        the canvas.
+
+        :param x_1: minimum x coordinate
+        :param y_1: minimum y coordinate
+        :param x_2: maximum x coordinate (exclusive)
+        :param y_2: maximum y coordinate (exclusive)
+        """
+        if x_1 >= x_2 or y_1 >= y_2:
+            return False
+        if (
+            x_1 < 0
+            or y_1 < 0
+            or x_2 - 1 >= self.width
+            or y_2 - 1 >= self.height
+        ):
+            return True
+
+        for key in self.get_cells(x_1, y_1, x_2, y_2):
+            for index in self.cells.get(key, ()):
+                area_x_1, area_y_1, area_x_2, area_y_2 = self.areas[index]
+                if (
+                    area_x_1 < x_2
+                    and x_1 < area_x_2
+                    and area_y_1 < y_2
+                    and y_1 < area_y_2
+                ):
+                    return True
+
+        return False
+
+    def register_area(self, x_1: int, y_1: int, x_2: int, y_2: int) -> None:
+        """
+        Register that all points of the rectangle are occupied by an element.
+        Points outside the canvas are ignored.
+
+        :param x_1: minimum x coordinate
+        :param y_1: minimum y coordinate
+        :param x_2: maximum x coordinate (exclusive)
+        :param y_2: maximum y coordinate (exclusive)
+        """
+        x_1, y_1 = max(x_1, 0), max(y_1, 0)
+        x_2 = min(x_2, int(np.ceil(self.width)))
+        y_2 = min(y_2, int(np.ceil(self.height)))
+        if x_1 >= x_2 or y_1 >= y_2:
+            return
+
+        index: int = len(self.areas)
+        self.areas.append((x_1, y_1, x_2, y_2))
+        for key in self.get_cells(x_1, y_1, x_2, y_2):
+            self.cells.setdefault(key, []).append(index)
+
+    def place(self, candidates: list[tuple[Area, Area]]) -> Optional[int]:
+        """
+        Find the first candidate position of an element that is free and
+        register it.
+
+        :param candidates: pairs of the area that should be free and the area
+            that the element occupies, in order of preference
+        :return: index of the placed candidate or None if all candidates
+            collide with other elements
+        """
+        for index, (checked_area, area) in enumerate(candidates):
+            if not self.check_area(*checked_area):
+                self.register_area(*area)
+                return index
+        return None
+
+
+def get_text_areas(point: np.ndarray, half: int) -> tuple[Area, Area]:
+    """
+    Get the area that should be free to place the text and the area that the
+    text occupies.
+
+    :param point: center of the text baseline
+    :param half: half of the text width in pixels
+    """
+    # Text occupies columns `int(point[0] + i)` for `i` in `[-half, half)`.
+    # Only the row above the baseline should be free to place the text.
+    x_1: int = int(point[0] - half)
+    x_2: int = int(point[0] + half - 1) + 1 if half else x_1
+    checked_area: Area = (
+        x_1,
+        int(point[1] - 4.0),
+        x_2,
+        int(point[1] - 4.0) + 1,
+    )
+    area: Area = (x_1, int(point[1] - 12), x_2, int(point[1] + 4) + 1)
+    return checked_area, area
 
 
 class Point(Tagged):
@@ -68,6 +172,8 @@ class Point(Tagged):
         is_for_node: bool = True,
         draw_outline: bool = True,
         add_tooltips: bool = False,
+        use_symbols: bool = False,
+        alternative_positions: bool = False,
     ) -> None:
         super().__init__(tags)
 
@@ -82,12 +188,14 @@ class Point(Tagged):
         self.is_for_node: bool = is_for_node
         self.draw_outline: bool = draw_outline
         self.add_tooltips: bool = add_tooltips
+        self.use_symbols: bool = use_symbols
+        self.alternative_positions: bool = alternative_positions
 
         self.y: float = 0.0
         self.main_icon_painted: bool = False
 
     def draw_main_shapes(
-        self, svg: svgwrite.Drawing, occupied: Optional[Occupied] = None
+        self, drawing: Drawing, occupied: Optional[Occupied] = None
     ) -> None:
         """Draw main shape for one node."""
         keys_left = [x for x in self.tags.keys() if x not in self.processed]
@@ -103,7 +211,7 @@ class Point(Tagged):
             self.tags if self.add_tooltips else None
         )
         self.main_icon_painted: bool = self.draw_point_shape(
-            svg,
+            drawing,
             self.icon_set.main_icon,
             self.icon_set.default_icon,
             position,
@@ -114,36 +222,47 @@ class Point(Tagged):
             self.y += 16.0
 
     def draw_extra_shapes(
-        self, svg: svgwrite.Drawing, occupied: Optional[Occupied] = None
+        self, drawing: Drawing, occupied: Optional[Occupied] = None
     ) -> None:
         """Draw secondary shapes."""
         if not self.icon_set.extra_icons or not self.main_icon_painted:
             return
 
-        is_place_for_extra: bool = True
-        if occupied:
-            left: float = -(len(self.icon_set.extra_icons) - 1.0) * 8.0
-            for _ in self.icon_set.extra_icons:
-                point: np.ndarray = np.array(
-                    (int(self.point[0] + left), int(self.point[1] + self.y))
+        # Extra icons are drawn in a row below the main icon, or, if there is
+        # no place there, in a row above it.
+        rows: list[float] = [self.y]
+        if self.alternative_positions:
+            rows.append(-16.0)
+
+        start: float = -(len(self.icon_set.extra_icons) - 1.0) * 8.0
+        for row in rows:
+            if occupied and any(
+                occupied.check(
+                    np.array(
+                        (
+                            int(self.point[0] + start + 16.0 * index),
+                            int(self.point[1] + row),
+                        )
+                    )
                 )
-                if occupied.check(point):
-                    is_place_for_extra = False
-                    break
-                left += 16.0
+                for index in range(len(self.icon_set.extra_icons))
+            ):
+                continue
 
-        if is_place_for_extra:
-            left: float = -(len(self.icon_set.extra_icons) - 1.0) * 8.0
+            left: float = start
             for icon in self.icon_set.extra_icons:
-                point: np.ndarray = self.point + np.array((left, self.y))
-                self.draw_point_shape(svg, icon, None, point, occupied=occupied)
+                point: np.ndarray = self.point + np.array((left, row))
+                self.draw_point_shape(
+                    drawing, icon, None, point, occupied=occupied
+                )
                 left += 16.0
-            if self.icon_set.extra_icons:
+            if row == self.y:
                 self.y += 16.0
+            return
 
     def draw_point_shape(
         self,
-        svg: svgwrite.Drawing,
+        drawing: Drawing,
         icon: Icon,
         default_icon: Optional[Icon],
         position: np.ndarray,
@@ -157,31 +276,34 @@ class Point(Tagged):
         icon_to_draw: Icon = icon
         is_painted: bool = True
 
-        if occupied and occupied.check(position):
-            if default_icon:
-                icon_to_draw = default_icon
-                is_painted = False
-            else:
-                return False
+        if occupied:
+            x, y = int(position[0]), int(position[1])
+            overlap: int = occupied.overlap
+            # Icon is placed if its center is free.
+            checked_area: Area = (x, y, x + 1, y + 1)
+            area: Area = (x - overlap, y - overlap, x + overlap, y + overlap)
+
+            if occupied.place([(checked_area, area)]) is None:
+                if default_icon:
+                    icon_to_draw = default_icon
+                    is_painted = False
+                else:
+                    return False
 
         if self.draw_outline:
-            icon_to_draw.draw(svg, position, outline=True)
-
-        icon_to_draw.draw(svg, position, tags=tags)
+            icon_to_draw.draw(
+                drawing, position, outline=True, use_symbols=self.use_symbols
+            )
 
-        if occupied and is_painted:
-            overlap: int = occupied.overlap
-            for i in range(-overlap, overlap):
-                for j in range(-overlap, overlap):
-                    occupied.register(
-                        np.array((position[0] + i, position[1] + j))
-                    )
+        icon_to_draw.draw(
+            drawing, position, tags=tags, use_symbols=self.use_symbols
+        )
 
         return is_painted
 
     def draw_texts(
         self,
-        svg: svgwrite.Drawing,
+        drawing: Drawing,
         occupied: Optional[Occupied] = None,
         label_mode: LabelMode = LabelMode.MAIN,
     ) -> None:
@@ -202,7 +324,7 @@ class Point(Tagged):
             text = text[:26] + ("..." if len(text) > 26 else "")
             point = self.point + np.array((0.0, self.y + 2.0))
             self.draw_text(
-                svg,
+                drawing,
                 text,
                 point,
                 occupied,
@@ -213,7 +335,7 @@ class Point(Tagged):
 
     def draw_text(
         self,
-        svg: svgwrite.Drawing,
+        drawing: Drawing,
         text: str,
         point: np.ndarray,
         occupied: Optional[Occupied],
@@ -235,31 +357,30 @@ class Point(Tagged):
           ######
         """
         length: int = len(text) * 6  # FIXME
+        half: int = int(length / 2.0)
+        is_moved: bool = False
 
         if occupied:
-            is_occupied: bool = False
-            for i in range(-int(length / 2.0), int(length / 2.0)):
-                text_position: np.ndarray = np.array(
-                    (int(point[0] + i), int(point[1] - 4.0))
-                )
-                if occupied.check(text_position):
-                    is_occupied = True
-                    break
+            points: list[np.ndarray] = [point]
+            if self.alternative_positions:
+                points += self.get_text_alternatives(half, occupied)
 
-            if is_occupied:
+            index: Optional[int] = occupied.place(
+                [get_text_areas(x, half) for x in points]
+            )
+            if index is None:
                 return
+            point = points[index]
+            is_moved = index > 0
 
-            for i in range(-int(length / 2.0), int(length / 2.0)):
-                for j in range(-12, 5):
-                    occupied.register(
-                        np.array((int(point[0] + i), int(point[1] + j)))
-                    )
-                    if is_debug:
-                        svg.add(svg.rect((point[0] + i, point[1] + j), (1, 1)))
+            if is_debug:
+                for i in range(-half, half):
+                    for j in range(-12, 5):
+                        drawing.add(Rect((point[0] + i, point[1] + j), (1, 1)))
 
         if out_fill_2:
             draw_text(
-                svg,
+                drawing,
                 text,
                 point,
                 size,
@@ -270,7 +391,7 @@ class Point(Tagged):
             )
         if out_fill:
             draw_text(
-                svg,
+                drawing,
                 text,
                 point,
                 size,
@@ -279,9 +400,32 @@ class Point(Tagged):
                 stroke=out_fill,
                 opacity=out_opacity,
             )
-        draw_text(svg, text, point, size, fill)
+        draw_text(drawing, text, point, size, fill)
+
+        if not is_moved:
+            self.y += 11
 
-        self.y += 11
+    def get_text_alternatives(
+        self, half: int, occupied: Occupied
+    ) -> list[np.ndarray]:
+        """
+        Get centers of the text baseline to the right of, to the left of, and
+        above the main icon for the text that doesn't fit below it.  Without
+        the main icon, the text itself marks the point, so it is not moved.
+
+        :param half: half of the text width in pixels
+        :param occupied: occupied area of the main icon extends by
+            `occupied.overlap` pixels from the point
+        """
+        if not self.main_icon_painted:
+            return []
+
+        margin: float = occupied.overlap + 1.0
+        return [
+            self.point + np.array((margin + half, 4.0)),
+            self.point + np.array((-margin - half, 4.0)),
+            self.point + np.array((0.0, 4.0 - margin)),
+        ]
 
     def get_size(self) -> np.ndarray:
         """
@@ -1,10 +1,12 @@
 """Map Machine drawing scheme."""
+import json
 import logging
 import re
 from dataclasses import dataclass
+from hashlib import sha256
 from enum import Enum
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Optional, Sequence, Union
 
 import numpy as np
 import yaml
@@ -21,6 +23,7 @@ from map_machine.pictogram.icon import (
     ShapeSpecification,
     DEFAULT_SMALL_SHAPE_ID,
 )
+from map_machine.util import LRUCache
 
 __author__ = "Sergey Vartanov"
 __email__ = "me@enzet.ru"
@@ -28,6 +31,17 @@ __email__ = "me@enzet.ru"
 IconDescription = list[Union[str, dict[str, str]]]
 
 DEFAULT_COLOR: Color = Color("black")
+ICON_CACHE_SIZE: int = 10_000
+MATCH_CACHE_SIZE: int = 10_000
+
+# Use fast YAML loader from LibYAML if PyYAML is built with it.
+YAML_LOADER: type = (
+    yaml.CFullLoader if yaml.__with_libyaml__ else yaml.FullLoader
+)
+
+# Element tags and icon configuration: country, zoom level, whether to ignore
+# level matching, and whether to show overlapped points.
+IconCacheKey = tuple[frozenset, Optional[str], float, bool, bool]
 
 
 @dataclass
@@ -53,6 +67,7 @@ def is_matched_tag(
     matcher_tag_key: str,
     matcher_tag_value: Union[str, list],
     tags: Tags,
+    pattern: Optional[re.Pattern] = None,
 ) -> tuple[MatchingType, list[str]]:
     """
     Check whether element tags contradict tag matcher.
@@ -60,6 +75,8 @@ def is_matched_tag(
     :param matcher_tag_key: tag key
     :param matcher_tag_value: tag value, tag value list, or "*"
     :param tags: element tags to check
+    :param pattern: compiled regular expression for the tag value if it
+        starts with "^"
     """
     if matcher_tag_key not in tags:
         return MatchingType.NOT_MATCHED, []
@@ -69,9 +86,9 @@ def is_matched_tag(
     if tags[matcher_tag_key] == matcher_tag_value:
         return MatchingType.MATCHED, []
     if matcher_tag_value.startswith("^"):
-        matcher: Optional[re.Match] = re.match(
-            matcher_tag_value, tags[matcher_tag_key]
-        )
+        if pattern is None:
+            pattern = re.compile(matcher_tag_value)
+        matcher: Optional[re.Match] = pattern.match(tags[matcher_tag_key])
         if matcher:
             return MatchingType.MATCHED_BY_REGEX, list(matcher.groups())
 
@@ -126,6 +143,14 @@ class Matcher(Tagged):
         if "location_restrictions" in structure:
             self.location_restrictions = structure["location_restrictions"]
 
+        # Compiled regular expressions for tag values.
+        self.patterns: dict[str, re.Pattern] = {
+            value: re.compile(value)
+            for value in list(self.tags.values())
+            + list(self.exception.values())
+            if isinstance(value, str) and value.startswith("^")
+        }
+
         self.verify()
 
     def check_zoom_level(self, zoom_level: float) -> bool:
@@ -155,8 +180,9 @@ class Matcher(Tagged):
 
         for config_tag_key in self.tags:
             config_tag_key: str
+            value: str = self.tags[config_tag_key]
             is_matched, matched_groups = is_matched_tag(
-                config_tag_key, self.tags[config_tag_key], tags
+                config_tag_key, value, tags, self.patterns.get(value)
             )
             if is_matched == MatchingType.NOT_MATCHED:
                 return False, {}
@@ -168,14 +194,28 @@ class Matcher(Tagged):
         if self.exception:
             for config_tag_key in self.exception:
                 config_tag_key: str
+                value = self.exception[config_tag_key]
                 is_matched, matched_groups = is_matched_tag(
-                    config_tag_key, self.exception[config_tag_key], tags
+                    config_tag_key, value, tags, self.patterns.get(value)
                 )
                 if is_matched != MatchingType.NOT_MATCHED:
                     return False, {}
 
         return True, groups
 
+    def get_index_key(self) -> Optional[tuple[str, Optional[str]]]:
+        """
+        Get tag that every matched element should have: (key, value) if the
+        value is specified exactly, (key, None) if only key is required, and
+        None if matcher has no tags.
+        """
+        for key, value in self.tags.items():
+            if isinstance(value, str) and value != "*" and value[:1] != "^":
+                return key, value
+        for key in self.tags:
+            return key, None
+        return None
+
     def get_mapcss_selector(self, prefix: str = "") -> str:
         """
         Construct MapCSS 0.2 selector from the node matcher.
@@ -307,6 +347,103 @@ class RoadMatcher(Matcher):
         return 1000.0 * layer + self.priority
 
 
+class MatcherIndex:
+    """
+    Index of matchers by tags, that allows to check only those matchers that
+    may match element tags.
+
+    Every matcher is indexed by one of its tags: by tag key and value if
+    value is exact, or only by tag key if value is "*" or regular expression.
+    Matchers without tags are checked for every element.
+
+    Results of matching are memoized for tag sets, since elements usually
+    share a small number of distinct tag sets.
+    """
+
+    def __init__(
+        self,
+        matchers: Sequence[Matcher],
+        cache_size: int = MATCH_CACHE_SIZE,
+    ) -> None:
+        """
+        :param matchers: matchers to index
+        :param cache_size: maximum number of tag sets to store matching
+            results for
+        """
+        self.matchers: Sequence[Matcher] = matchers
+        self.cache: LRUCache[frozenset, tuple[int, ...]] = LRUCache(cache_size)
+
+        # Tag key and value to indices of matchers.
+        self.by_tag: dict[tuple[str, str], list[int]] = {}
+        # Tag key to indices of matchers with wildcard or regular expression
+        # values.
+        self.by_key: dict[str, list[int]] = {}
+        # Indices of matchers that should always be checked.
+        self.always: list[int] = []
+
+        for index, matcher in enumerate(matchers):
+            index_key: Optional[
+                tuple[str, Optional[str]]
+            ] = matcher.get_index_key()
+            if index_key is None:
+                self.always.append(index)
+                continue
+            key, value = index_key
+            if value is None:
+                self.by_key.setdefault(key, []).append(index)
+            else:
+                self.by_tag.setdefault((key, value), []).append(index)
+
+    def get_candidates(self, tags: Tags) -> list[int]:
+        """
+        Get sorted indices of matchers that may match tags.
+
+        :param tags: element tags
+        """
+        candidates: list[int] = list(self.always)
+        for key, value in tags.items():
+            if key in self.by_key:
+                candidates += self.by_key[key]
+            if (key, value) in self.by_tag:
+                candidates += self.by_tag[(key, value)]
+        candidates.sort()
+        return candidates
+
+    def match(self, tags: Tags) -> tuple[int, ...]:
+        """
+        Get sorted indices of all matchers that match tags.
+
+        :param tags: element tags
+        """
+        key: frozenset = frozenset(tags.items())
+        matched: Optional[tuple[int, ...]] = self.cache.get(key)
+        if matched is None:
+            matched = tuple(
+                index
+                for index in self.get_candidates(tags)
+                if self.matchers[index].is_matched(tags)[0]
+            )
+            self.cache.put(key, matched)
+        return matched
+
+
+def write_cache(content: dict[str, Any], cache_file_name: Path) -> None:
+    """
+    Write parsed scheme file.  The scheme is not written if it can't be
+    restored from JSON as is, e.g. if it contains non-string keys.
+
+    :param content: scheme structure
+    :param cache_file_name: output JSON file
+    """
+    try:
+        text: str = json.dumps(content)
+        if json.loads(text) != content:
+            return
+        cache_file_name.write_text(text, encoding="utf-8")
+    except (OSError, TypeError, ValueError):
+        logging.debug(f"Cannot write parsed scheme to {cache_file_name}.")
+
+
 class Scheme:
     """
     Map style.
@@ -314,12 +451,19 @@ class Scheme:
     Specifies map colors and rules to draw icons for OpenStreetMap tags.
     """
 
-    def __init__(self, content: dict[str, Any]) -> None:
+    def __init__(
+        self, content: dict[str, Any], icon_cache_size: int = ICON_CACHE_SIZE
+    ) -> None:
+        """
+        :param content: scheme structure
+        :param icon_cache_size: maximum number of icon sets to store
+        """
         self.node_matchers: list[NodeMatcher] = []
         if "node_icons" in content:
             for group in content["node_icons"]:
                 for element in group["tags"]:
                     self.node_matchers.append(NodeMatcher(element, group))
+        self.node_matcher_index: MatcherIndex = MatcherIndex(self.node_matchers)
 
         options = content.get("options", {})
 
@@ -351,31 +495,59 @@ class Scheme:
             if "area_tags" in content
             else []
         )
+        self.way_matcher_index: MatcherIndex = MatcherIndex(self.way_matchers)
+        self.road_matcher_index: MatcherIndex = MatcherIndex(self.road_matchers)
+        self.area_matcher_index: MatcherIndex = MatcherIndex(self.area_matchers)
         self.keys_to_write: list[str] = content.get("keys_to_write", [])
         self.prefix_to_write: list[str] = content.get("prefix_to_write", [])
         self.keys_to_skip: list[str] = content.get("keys_to_skip", [])
         self.prefix_to_skip: list[str] = content.get("prefix_to_skip", [])
         self.tags_to_skip: dict[str, str] = content.get("tags_to_skip", {})
 
-        # Storage for created icon sets.
-        self.cache: dict[str, tuple[IconSet, int]] = {}
+        # Storage for created icon sets with their priorities and tag keys
+        # processed while icon set construction.
+        self.cache: LRUCache[
+            IconCacheKey, tuple[Optional[IconSet], int, set[str]]
+        ] = LRUCache(icon_cache_size)
 
     @classmethod
-    def from_file(cls, file_name: Path) -> Optional["Scheme"]:
+    def from_file(
+        cls,
+        file_name: Path,
+        icon_cache_size: int = ICON_CACHE_SIZE,
+        cache_path: Optional[Path] = None,
+    ) -> Optional["Scheme"]:
         """
         :param file_name: name of the scheme file with tags, colors, and tag key
             specification
+        :param icon_cache_size: maximum number of icon sets to store
+        :param cache_path: directory to store parsed scheme files, so that the
+            same scheme file is parsed only once
         """
-        with file_name.open(encoding="utf-8") as input_file:
+        text: bytes = file_name.read_bytes()
+
+        cache_file_name: Optional[Path] = None
+        if cache_path is not None:
+            cache_file_name = (
+                cache_path / f"scheme_{sha256(text).hexdigest()}.json"
+            )
             try:
-                content: dict[str, Any] = yaml.load(
-                    input_file.read(), Loader=yaml.FullLoader
-                )
-            except yaml.YAMLError:
-                return None
-            if not content:
-                return cls({})
-            return cls(content)
+                with cache_file_name.open(encoding="utf-8") as input_file:
+                    return cls(json.load(input_file), icon_cache_size)
+            except (OSError, ValueError):
+                pass
+
+        try:
+            content: dict[str, Any] = yaml.load(text, Loader=YAML_LOADER)
+        except yaml.YAMLError:
+            return None
+        if not content:
+            content = {}
+
+        if cache_file_name is not None:
+            write_cache(content, cache_file_name)
+
+        return cls(content, icon_cache_size)
 
     def get_color(self, color: str) -> Color:
         """
@@ -499,18 +671,55 @@ class Scheme:
             overlapped by some other points
         :return (icon set, icon priority)
         """
-        tags_hash: str = (
-            ",".join(tags.keys()) + ":" + ",".join(map(str, tags.values()))
+        key: IconCacheKey = (
+            frozenset(tags.items()),
+            country,
+            zoom_level,
+            ignore_level_matching,
+            show_overlapped,
         )
-        if tags_hash in self.cache:
-            return self.cache[tags_hash]
+        cached: Optional[
+            tuple[Optional[IconSet], int, set[str]]
+        ] = self.cache.get(key)
+        if cached is not None:
+            icon_set, priority, cached_processed = cached
+            processed |= cached_processed
+            return icon_set, priority
+
+        initial_processed: set[str] = set(processed)
+        icon_set, priority = self.construct_icon(
+            extractor,
+            tags,
+            processed,
+            country,
+            zoom_level,
+            ignore_level_matching,
+            show_overlapped,
+        )
+        self.cache.put(key, (icon_set, priority, processed - initial_processed))
+
+        return icon_set, priority
 
+    def construct_icon(
+        self,
+        extractor: ShapeExtractor,
+        tags: dict[str, Any],
+        processed: set[str],
+        country: Optional[str] = None,
+        zoom_level: float = 18,
+        ignore_level_matching: bool = False,
+        show_overlapped: bool = False,
+    ) -> tuple[Optional[IconSet], int]:
+        """
+        Construct icon set without cache.  See `get_icon` for parameters.
+        """
         main_icon: Optional[Icon] = None
         extra_icons: list[Icon] = []
         priority: int = 0
         color: Optional[Color] = None
 
-        for index, matcher in enumerate(self.node_matchers):
+        for index in self.node_matcher_index.get_candidates(tags):
+            matcher: NodeMatcher = self.node_matchers[index]
             if not matcher.replace_shapes and main_icon:
                 continue
             matching, groups = matcher.is_matched(tags, country)
@@ -588,7 +797,6 @@ class Scheme:
         returned: IconSet = IconSet(
             main_icon, extra_icons, default_icon, processed
         )
-        self.cache[tags_hash] = returned, priority
 
         for key in "direction", "camera:direction":
             if key in tags:
@@ -607,11 +815,8 @@ class Scheme:
         """Get line style based on tags and scale."""
         line_styles = []
 
-        for matcher in self.way_matchers:
-            matching, _ = matcher.is_matched(tags)
-            if not matching:
-                continue
-
+        for index in self.way_matcher_index.match(tags):
+            matcher: WayMatcher = self.way_matchers[index]
             line_style: LineStyle = LineStyle(
                 matcher.style, matcher.parallel_offset, matcher.priority
             )
@@ -621,20 +826,22 @@ class Scheme:
 
     def get_road(self, tags: dict[str, Any]) -> Optional[RoadMatcher]:
         """Get road matcher if tags are matched."""
-        for matcher in self.road_matchers:
-            matching, _ = matcher.is_matched(tags)
-            if not matching:
-                continue
-            return matcher
+        for index in self.road_matcher_index.match(tags):
+            return self.road_matchers[index]
         return None
 
     def is_area(self, tags: Tags) -> bool:
         """Check whether way described by tags is area."""
-        for matcher in self.area_matchers:
-            matching, _ = matcher.is_matched(tags)
-            if matching:
-                return True
-        return False
+        return bool(self.area_matcher_index.match(tags))
+
+    def get_cache_statistics(self) -> dict[str, dict[str, int]]:
+        """Get statistics of icon set and matching caches."""
+        return {
+            "icons": self.cache.get_statistics(),
+            "ways": self.way_matcher_index.cache.get_statistics(),
+            "roads": self.road_matcher_index.cache.get_statistics(),
+            "areas": self.area_matcher_index.cache.get_statistics(),
+        }
 
     def process_ignored(self, tags: Tags, processed: set[str]) -> None:
         """
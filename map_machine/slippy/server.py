@@ -1,19 +1,326 @@
 """Map Machine tile server for slippy maps."""
 import argparse
+import hashlib
+import json
 import logging
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import (
+    HTTPServer,
+    SimpleHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import cairosvg
 
+from map_machine.geometry.boundary_box import BoundaryBox
 from map_machine.map_configuration import MapConfiguration
-from map_machine.slippy.tile import Tile
+from map_machine.osm.osm_getter import get_osm
+from map_machine.osm.osm_reader import OSMData
+from map_machine.osm.osm_snapshot import load_osm_file
+from map_machine.pictogram.icon import ShapeExtractor, get_shape_extractor
+from map_machine.scheme import Scheme
+from map_machine.slippy.tile import Tile, Tiles
+from map_machine.util import LRUCache
 from map_machine.workspace import workspace
 
 __author__ = "Sergey Vartanov"
 __email__ = "me@enzet.ru"
 
+# Number of the last renders used to compute render latency.
+LATENCY_WINDOW: int = 100
+
+# Time in seconds browsers may use tiles without revalidation.
+CACHE_MAX_AGE: int = 86400
+
+TileKey = tuple[int, int, int]
+
+
+class OSMDataCache:
+    """
+    Parsed OpenStreetMap data of recently rendered regions.
+
+    The cache is bounded by the total size of OSM data files of the regions.
+    Data for a boundary box is taken from any cached region that contains it.
+    """
+
+    def __init__(self, cache_path: Path, maximum_size: int) -> None:
+        """
+        :param cache_path: directory for OSM files
+        :param maximum_size: maximum total size of OSM data files in bytes
+        """
+        self.cache_path: Path = cache_path
+        self.regions: LRUCache[
+            str, tuple[BoundaryBox, OSMData, int]
+        ] = LRUCache(maximum_size, lambda x: x[2])
+
+    def load(self, boundary_box: BoundaryBox) -> OSMData:
+        """
+        Get OpenStreetMap data that covers the boundary box: from a cached
+        region, from OSM file, or from the OpenStreetMap server.
+
+        :param boundary_box: area to be covered by the data
+        """
+        key: str = boundary_box.get_format()
+
+        for region_key, (region, _, _) in reversed(self.regions.items()):
+            if region.contains(boundary_box):
+                key = region_key
+                break
+
+        if (cached := self.regions.get(key)) is not None:
+            return cached[1]
+
+        key = boundary_box.get_format()
+        cache_file_path: Path = self.cache_path / f"{key}.osm"
+        get_osm(boundary_box, cache_file_path)
+
+        osm_data: OSMData = load_osm_file(cache_file_path)
+        self.regions.put(
+            key, (boundary_box, osm_data, cache_file_path.stat().st_size)
+        )
+        return osm_data
+
+    def get_statistics(self) -> dict[str, int]:
+        """Get cache statistics, size is the total size of OSM files."""
+        return self.regions.get_statistics()
+
+
+class TileRenderer:
+    """
+    Tile renderer with a pool of worker threads.
+
+    Tiles are rendered by metatiles: blocks of neighbouring tiles drawn as one
+    image from one OpenStreetMap data file and then split into tiles.
+    Concurrent requests for tiles of the same metatile wait for a single
+    render.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path,
+        scheme: Scheme,
+        workers: int = 1,
+        metatile_size: int = 1,
+        osm_data_cache_size: int = 0,
+        direct_raster: bool = False,
+        keep_svg: bool = False,
+    ) -> None:
+        """
+        :param cache_path: directory for temporary OSM files
+        :param scheme: map scheme used to draw tiles
+        :param workers: number of threads to render tiles
+        :param metatile_size: number of tiles in metatile row and column
+        :param osm_data_cache_size: maximum total size of OSM data files kept
+            parsed in memory in bytes
+        :param direct_raster: draw PNG tiles without intermediate SVG files
+        :param keep_svg: write intermediate SVG files, otherwise SVG is
+            rasterized from memory
+        """
+        self.cache_path: Path = cache_path
+        self.osm_data_cache: OSMDataCache = OSMDataCache(
+            cache_path, osm_data_cache_size
+        )
+        self.scheme: Scheme = scheme
+        self.metatile_size: int = metatile_size
+        self.direct_raster: bool = direct_raster
+        self.keep_svg: bool = keep_svg
+        self.extractor: ShapeExtractor = get_shape_extractor()
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="render"
+        )
+        self.lock: threading.Lock = threading.Lock()
+
+        # Renders that are queued or running now.
+        self.in_flight: dict[TileKey, Future] = {}
+
+        # Number of renders waiting for a free worker.
+        self.queue_depth: int = 0
+
+        self.rendered: int = 0
+        self.coalesced: int = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def request(self, tile: Tile) -> Future:
+        """
+        Schedule rendering of the tile metatile or join the render that is
+        already scheduled for the same metatile.
+        """
+        tiles: Tiles = tile.get_metatile(self.metatile_size)
+        key: TileKey = (tiles.zoom_level, tiles.tile_1.x, tiles.tile_1.y)
+
+        with self.lock:
+            if key in self.in_flight:
+                self.coalesced += 1
+                return self.in_flight[key]
+
+            future: Future = self.executor.submit(self.render, tiles)
+            self.in_flight[key] = future
+            self.queue_depth += 1
+
+        future.add_done_callback(lambda _: self.finish(key))
+        return future
+
+    def finish(self, key: TileKey) -> None:
+        """Forget finished render, so that the next request checks files."""
+        with self.lock:
+            self.in_flight.pop(key, None)
+
+    def render(self, tiles: Tiles) -> None:
+        """Draw PNG files of tiles if they don't exist."""
+        with self.lock:
+            self.queue_depth -= 1
+
+        start: float = time.monotonic()
+
+        tile_path: Path = workspace.get_tile_path()
+        configuration: MapConfiguration = MapConfiguration(
+            self.scheme, zoom_level=tiles.zoom_level
+        )
+        if len(tiles.tiles) == 1:
+            tile: Tile = tiles.tile_1
+            svg_path: Path = tile.get_file_name(tile_path)
+            png_path: Path = svg_path.with_suffix(".png")
+
+            # Without SVG files the PNG file is the only output of the render.
+            output_path: Path = (
+                svg_path
+                if self.keep_svg and not self.direct_raster
+                else png_path
+            )
+            if not output_path.exists():
+                tile.draw_with_osm_data(
+                    self.osm_data_cache.load(tile.get_extended_boundary_box()),
+                    tile_path,
+                    configuration,
+                    self.extractor,
+                    direct_raster=self.direct_raster,
+                    keep_svg=self.keep_svg,
+                )
+            elif not png_path.exists():
+                with svg_path.open(encoding="utf-8") as input_file:
+                    cairosvg.svg2png(
+                        file_obj=input_file, write_to=str(png_path)
+                    )
+                logging.info(f"SVG file is rasterized to {png_path}.")
+        else:
+            tiles.draw(
+                tile_path,
+                self.cache_path,
+                configuration,
+                self.osm_data_cache.load(tiles.boundary_box),
+                extractor=self.extractor,
+                direct_raster=self.direct_raster,
+                keep_svg=self.keep_svg,
+            )
+
+        latency: float = time.monotonic() - start
+        with self.lock:
+            self.rendered += 1
+            self.latencies.append(latency)
+            queue_depth: int = self.queue_depth
+
+        logging.info(
+            f"Tiles {tiles.zoom_level}/{tiles.tile_1.x}/{tiles.tile_1.y}–"
+            f"{tiles.tile_2.x}/{tiles.tile_2.y} are rendered in "
+            f"{latency:.2f} s, {queue_depth} metatiles are waiting."
+        )
+
+    def get_statistics(self) -> dict[str, Any]:
+        """
+        Get queue depth, number of running and rendered tiles, number of
+        requests that waited for another request's render, and render latency
+        in seconds for the last renders.
+        """
+        with self.lock:
+            latencies: list[float] = sorted(self.latencies)
+            statistics: dict[str, Any] = {
+                "queue_depth": self.queue_depth,
+                "in_flight": len(self.in_flight),
+                "rendered": self.rendered,
+                "coalesced": self.coalesced,
+            }
+        statistics["osm_data_cache"] = self.osm_data_cache.get_statistics()
+        if latencies:
+            statistics["latency_mean"] = sum(latencies) / len(latencies)
+            statistics["latency_median"] = latencies[len(latencies) // 2]
+            statistics["latency_max"] = latencies[-1]
+        return statistics
+
+    def shutdown(self) -> None:
+        """Stop worker threads."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass
+class CachedTile:
+    """PNG tile content with HTTP cache validators."""
+
+    content: bytes
+    etag: str
+    last_modified: float
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CachedTile":
+        """Read PNG tile file."""
+        content: bytes = path.read_bytes()
+        return cls(
+            content,
+            f'"{hashlib.sha1(content).hexdigest()}"',
+            path.stat().st_mtime,
+        )
+
+    def is_not_modified(self, headers: Any) -> bool:
+        """Check conditional request headers against the tile validators."""
+        if (etags := headers.get("If-None-Match")) is not None:
+            return etags.strip() == "*" or self.etag in [
+                x.strip() for x in etags.split(",")
+            ]
+        if (date := headers.get("If-Modified-Since")) is not None:
+            try:
+                return parsedate_to_datetime(date).timestamp() >= int(
+                    self.last_modified
+                )
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+
+class ServerStatistics:
+    """Counters of served tile requests."""
+
+    def __init__(self) -> None:
+        self.requests: int = 0
+        self.not_modified: int = 0
+        self.bytes_served: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def add(self, bytes_served: int, not_modified: bool = False) -> None:
+        """Count served request."""
+        with self.lock:
+            self.requests += 1
+            self.not_modified += not_modified
+            self.bytes_served += bytes_served
+
+    def get_statistics(self) -> dict[str, int]:
+        """Get number of requests, not modified responses, and sent bytes."""
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "bytes_served": self.bytes_served,
+            }
+
 
 class TileServerHandler(SimpleHTTPRequestHandler):
     """HTTP request handler that process sloppy map tile requests."""
@@ -21,6 +328,11 @@ class TileServerHandler(SimpleHTTPRequestHandler):
     cache: Path = Path("cache")
     update_cache: bool = False
     options: Optional[argparse.Namespace] = None
+    renderer: Optional[TileRenderer] = None
+
+    # Content of recently served PNG tiles bounded by the size in bytes.
+    tile_cache: LRUCache[TileKey, CachedTile] = LRUCache(0, len)
+    statistics: ServerStatistics = ServerStatistics()
 
     def __init__(
         self,
@@ -33,6 +345,10 @@ class TileServerHandler(SimpleHTTPRequestHandler):
 
     def do_GET(self) -> None:
         """Serve a GET request."""
+        if self.path == "/stats":
+            self.send_statistics()
+            return
+
         parts: list[str] = self.path.split("/")
         if not (len(parts) == 5 and not parts[0] and parts[1] == "tiles"):
             return
@@ -40,44 +356,106 @@ class TileServerHandler(SimpleHTTPRequestHandler):
         zoom_level: int = int(parts[2])
         x: int = int(parts[3])
         y: int = int(parts[4])
-        tile: Tile = Tile(x, y, zoom_level)
-        tile_path: Path = workspace.get_tile_path()
-        svg_path: Path = tile.get_file_name(tile_path)
-        png_path: Path = svg_path.with_suffix(".png")
+        key: TileKey = (zoom_level, x, y)
 
-        if self.update_cache:
-            if not png_path.exists():
-                if not svg_path.exists():
-                    tile.draw(
-                        tile_path,
-                        self.cache,
-                        MapConfiguration(zoom_level=zoom_level),
-                    )
-                with svg_path.open(encoding="utf-8") as input_file:
-                    cairosvg.svg2png(
-                        file_obj=input_file, write_to=str(png_path)
-                    )
-                logging.info(f"SVG file is rasterized to {png_path}.")
+        cached: Optional[CachedTile] = self.tile_cache.get(key)
+        if cached is None:
+            tile: Tile = Tile(x, y, zoom_level)
+            tile_path: Path = workspace.get_tile_path()
+            svg_path: Path = tile.get_file_name(tile_path)
+            png_path: Path = svg_path.with_suffix(".png")
+
+            if self.update_cache and self.renderer and not png_path.exists():
+                self.renderer.request(tile).result()
 
-        if png_path.exists():
-            with png_path.open("rb") as input_file:
-                self.send_response(200)
-                self.send_header("Content-type", "image/png")
-                self.end_headers()
-                self.wfile.write(input_file.read())
+            if not png_path.exists():
+                self.send_error(404)
                 return
 
+            cached = CachedTile.from_file(png_path)
+            self.tile_cache.put(key, cached)
+
+        if cached.is_not_modified(self.headers):
+            self.send_response(304)
+            self.send_cache_headers(cached)
+            self.end_headers()
+            self.statistics.add(0, not_modified=True)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-type", "image/png")
+        self.send_header("Content-Length", str(len(cached.content)))
+        self.send_cache_headers(cached)
+        self.end_headers()
+        self.wfile.write(cached.content)
+        self.statistics.add(len(cached.content))
+
+    def send_cache_headers(self, cached: CachedTile) -> None:
+        """Send headers that let browsers cache and revalidate the tile."""
+        self.send_header("ETag", cached.etag)
+        self.send_header(
+            "Last-Modified", formatdate(cached.last_modified, usegmt=True)
+        )
+        self.send_header("Cache-Control", f"public, max-age={CACHE_MAX_AGE}")
+
+    def send_statistics(self) -> None:
+        """Send tile cache, request, and render statistics as JSON."""
+        cache_statistics: dict[str, Any] = self.tile_cache.get_statistics()
+        lookups: int = cache_statistics["hits"] + cache_statistics["misses"]
+        cache_statistics["hit_ratio"] = (
+            cache_statistics["hits"] / lookups if lookups else 0.0
+        )
+        statistics: dict[str, Any] = {
+            "tile_cache": cache_statistics,
+            **self.statistics.get_statistics(),
+        }
+        if self.renderer:
+            statistics["renderer"] = self.renderer.get_statistics()
+
+        content: bytes = json.dumps(statistics, indent=4).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(content)
+
 
 def run_server(options: argparse.Namespace) -> None:
     """Command-line interface for tile server."""
+    scheme: Optional[Scheme] = Scheme.from_file(
+        workspace.DEFAULT_SCHEME_PATH, cache_path=workspace.get_cache_path()
+    )
+    if scheme is None:
+        logging.fatal("Failed to load default scheme.")
+        sys.exit(1)
+
     server: Optional[HTTPServer] = None
+    renderer: Optional[TileRenderer] = None
     try:
+        renderer = TileRenderer(
+            Path(options.cache),
+            scheme,
+            options.workers,
+            options.metatile_size,
+            options.osm_data_cache_size * 1024 * 1024,
+            options.direct_raster,
+            options.keep_svg,
+        )
         handler = TileServerHandler
         handler.cache = Path(options.cache)
+        handler.update_cache = True
         handler.options = options
-        server = HTTPServer(("", options.port), handler)
+        handler.renderer = renderer
+        handler.tile_cache = LRUCache(
+            options.memory_cache_size * 1024 * 1024, len
+        )
+        server = ThreadingHTTPServer(("", options.port), handler)
         logging.info(f"Server started on port {options.port}.")
         server.serve_forever()
     finally:
         if server:
             server.socket.close()
+        if renderer:
+            logging.info(f"Render statistics: {renderer.get_statistics()}.")
+            renderer.shutdown()
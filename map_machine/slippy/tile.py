@@ -5,24 +5,39 @@ See https://wiki.openstreetmap.org/wiki/Tiles
 """
 import argparse
 import logging
+import multiprocessing
 import sys
+import time
 from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional, Union
+from weakref import WeakKeyDictionary
 
 import cairosvg
 import numpy as np
-import svgwrite
 from PIL import Image
 
-from map_machine.constructor import Constructor
+from map_machine.constructor import ConstructionCache, Constructor
+from map_machine.drawing import (
+    Drawing,
+    PNGDrawing,
+    SVGDrawing,
+    SVGStreamDrawing,
+)
+from map_machine.feature.building import (
+    BUILDING_SCALE,
+    SHADE_SCALE,
+    get_building_height,
+)
 from map_machine.geometry.boundary_box import BoundaryBox
 from map_machine.geometry.flinger import MercatorFlinger
-from map_machine.map_configuration import MapConfiguration
+from map_machine.map_configuration import BuildingMode, MapConfiguration
 from map_machine.mapper import Map
 from map_machine.osm.osm_getter import NetworkError, get_osm
 from map_machine.osm.osm_reader import OSMData
-from map_machine.pictogram.icon import ShapeExtractor
+from map_machine.osm.osm_snapshot import load_osm_file
+from map_machine.pictogram.icon import ShapeExtractor, get_shape_extractor
 from map_machine.scheme import Scheme
 from map_machine.workspace import workspace
 
@@ -32,6 +47,82 @@ __email__ = "me@enzet.ru"
 TILE_WIDTH, TILE_HEIGHT = 256, 256
 EXTEND_TO_BIGGER_TILE: bool = False
 
+# Margin in pixels around tiles to get OpenStreetMap objects that are outside
+# but may be partially visible on tiles, e.g. icons and labels.
+QUERY_MARGIN: float = 128.0
+
+
+def get_query_boundary_box(
+    flinger: MercatorFlinger, building_height: float = 0.0
+) -> BoundaryBox:
+    """
+    Get boundary box of the area to draw with margins.
+
+    :param flinger: flinger of the area to draw
+    :param building_height: maximum height of isometric buildings in meters
+    """
+    # Longitude is linear in pixels, latitude margin is not less than the
+    # longitude one.
+    margin: float = QUERY_MARGIN / flinger.ratio
+
+    # Walls and roofs of isometric buildings to the south of the area and
+    # shades of buildings to the west of it may reach into the area.
+    height: float = building_height * flinger.get_scale() / flinger.ratio
+    wall_margin: float = height * BUILDING_SCALE
+    shade_margin: float = height * SHADE_SCALE
+
+    boundary_box: BoundaryBox = flinger.geo_boundaries
+    return BoundaryBox(
+        boundary_box.left - margin - shade_margin,
+        boundary_box.bottom - margin - wall_margin,
+        boundary_box.right + margin,
+        boundary_box.top + margin,
+    )
+
+
+# OpenStreetMap data to the maximum height of buildings in it.
+building_heights: "WeakKeyDictionary[OSMData, float]" = WeakKeyDictionary()
+
+
+def get_maximum_building_height(osm_data: OSMData) -> float:
+    """
+    Get maximum height of buildings and building parts in meters.  The height
+    is computed once for the data.
+    """
+    if (height := building_heights.get(osm_data)) is not None:
+        return height
+
+    height = 0.0
+    for element in chain(osm_data.ways.values(), osm_data.relations.values()):
+        if "building" in element.tags or "building:part" in element.tags:
+            height = max(height, get_building_height(element))
+
+    building_heights[osm_data] = height
+    return height
+
+
+def query_osm_data(
+    osm_data: OSMData,
+    flinger: MercatorFlinger,
+    configuration: MapConfiguration,
+) -> OSMData:
+    """
+    Get view of OpenStreetMap data with all objects that may be visible in the
+    area to draw.
+
+    :param osm_data: OpenStreetMap data
+    :param flinger: flinger of the area to draw
+    :param configuration: drawing configuration
+    """
+    building_height: float = 0.0
+    if configuration.scheme.draw_buildings and configuration.building_mode in (
+        BuildingMode.ISOMETRIC,
+        BuildingMode.ISOMETRIC_NO_PARTS,
+    ):
+        building_height = get_maximum_building_height(osm_data)
+
+    return osm_data.query(get_query_boundary_box(flinger, building_height))
+
 
 @dataclass
 class Tile:
@@ -106,10 +197,7 @@ class Tile:
         )
         get_osm(self.get_extended_boundary_box(), cache_file_path)
 
-        osm_data: OSMData = OSMData()
-        osm_data.parse_osm_file(cache_file_path)
-
-        return osm_data
+        return load_osm_file(cache_file_path)
 
     def get_file_name(self, directory_name: Path) -> Path:
         """Get tile output SVG file path."""
@@ -119,6 +207,26 @@ class Tile:
         """Check whether the tile is drawn."""
         return self.get_file_name(directory_name).with_suffix(".png").exists()
 
+    def get_metatile(self, size: int) -> "Tiles":
+        """
+        Get metatile: block of size × size tiles aligned to the multiples of
+        size that contains this tile.
+
+        :param size: number of tiles in metatile row and column
+        """
+        scale: int = 2**self.zoom_level
+        x: int = self.x - self.x % size
+        y: int = self.y - self.y % size
+
+        return Tiles.from_corners(
+            Tile(x, y, self.zoom_level),
+            Tile(
+                min(x + size, scale) - 1,
+                min(y + size, scale) - 1,
+                self.zoom_level,
+            ),
+        )
+
     def get_carto_address(self) -> str:
         """Get URL of this tile from the OpenStreetMap server."""
         return (
@@ -131,6 +239,9 @@ class Tile:
         directory_name: Path,
         cache_path: Path,
         configuration: MapConfiguration,
+        extractor: Optional[ShapeExtractor] = None,
+        direct_raster: bool = False,
+        keep_svg: bool = True,
     ) -> None:
         """
         Draw tile to SVG and PNG files.
@@ -138,21 +249,47 @@ class Tile:
         :param directory_name: output directory to storing tiles
         :param cache_path: directory to store SVG and PNG tiles
         :param configuration: drawing configuration
+        :param extractor: icon extractor, if not specified, it will be created
+        :param direct_raster: draw PNG tile directly without SVG file
+        :param keep_svg: write SVG file that is rasterized into PNG tile
         """
         try:
             osm_data: OSMData = self.load_osm_data(cache_path)
         except NetworkError as error:
             raise NetworkError(f"Map is not loaded. {error.message}")
 
-        self.draw_with_osm_data(osm_data, directory_name, configuration)
+        self.draw_with_osm_data(
+            osm_data,
+            directory_name,
+            configuration,
+            extractor,
+            direct_raster=direct_raster,
+            keep_svg=keep_svg,
+        )
 
     def draw_with_osm_data(
         self,
         osm_data: OSMData,
         directory_name: Path,
         configuration: MapConfiguration,
+        extractor: Optional[ShapeExtractor] = None,
+        cache: Optional[ConstructionCache] = None,
+        direct_raster: bool = False,
+        keep_svg: bool = True,
     ) -> None:
-        """Draw SVG and PNG tile using OpenStreetMap data."""
+        """
+        Draw SVG and PNG tile using OpenStreetMap data.
+
+        :param osm_data: OpenStreetMap data
+        :param directory_name: output directory to storing tiles
+        :param configuration: drawing configuration
+        :param extractor: icon extractor, if not specified, it will be created
+        :param cache: construction results shared by tiles drawn with the same
+            OpenStreetMap data and drawing configuration
+        :param direct_raster: draw PNG tile directly without SVG file
+        :param keep_svg: write SVG file, otherwise SVG is rasterized from
+            memory
+        """
         top, left = self.get_coordinates()
         bottom, right = Tile(
             self.x + 1, self.y + 1, self.zoom_level
@@ -166,31 +303,89 @@ class Tile:
         size: np.ndarray = flinger.size
 
         output_file_name: Path = self.get_file_name(directory_name)
+        output_path: Path = output_file_name.with_suffix(".png")
 
-        svg: svgwrite.Drawing = svgwrite.Drawing(
-            str(output_file_name), size=size
-        )
-        icon_extractor: ShapeExtractor = ShapeExtractor(
-            workspace.ICONS_PATH, workspace.ICONS_CONFIG_PATH
-        )
+        drawing: Drawing
+        if direct_raster:
+            drawing = PNGDrawing(output_path, size[0], size[1])
+        else:
+            drawing = SVGStreamDrawing(output_file_name, size[0], size[1])
+
+        if extractor is None:
+            extractor = get_shape_extractor()
         constructor: Constructor = Constructor(
-            osm_data, flinger, icon_extractor, configuration
+            query_osm_data(osm_data, flinger, configuration),
+            flinger,
+            extractor,
+            configuration,
+            cache,
         )
         constructor.construct()
 
         painter: Map = Map(
-            flinger=flinger, svg=svg, configuration=configuration
+            flinger=flinger, drawing=drawing, configuration=configuration
         )
         painter.draw(constructor)
 
-        with output_file_name.open("w", encoding="utf-8") as output_file:
-            svg.write(output_file)
-        logging.info(f"Tile is drawn to {output_file_name}.")
+        if not isinstance(drawing, SVGDrawing):
+            drawing.write()
+            logging.info(f"Tile is drawn to {output_path}.")
+            return
 
-        output_path: Path = output_file_name.with_suffix(".png")
-        with output_file_name.open(encoding="utf-8") as input_file:
-            cairosvg.svg2png(file_obj=input_file, write_to=str(output_path))
-        logging.info(f"SVG file is rasterized to {output_path}.")
+        # SVG document is serialized once for both SVG file and rasterization.
+        content: bytes = drawing.get_content()
+        if keep_svg:
+            output_file_name.write_bytes(content)
+            logging.info(f"Tile is drawn to {output_file_name}.")
+
+        cairosvg.svg2png(bytestring=content, write_to=str(output_path))
+        if keep_svg:
+            logging.info(f"SVG file is rasterized to {output_path}.")
+        else:
+            logging.info(f"Tile is drawn to {output_path}.")
+
+    def draw_missing_files(
+        self,
+        osm_data: OSMData,
+        directory_name: Path,
+        configuration: MapConfiguration,
+        extractor: Optional[ShapeExtractor] = None,
+        cache: Optional[ConstructionCache] = None,
+        direct_raster: bool = False,
+        keep_svg: bool = True,
+    ) -> None:
+        """Draw SVG and PNG tile files if they don't exist yet."""
+        file_path: Path = self.get_file_name(directory_name)
+        output_path: Path = file_path.with_suffix(".png")
+
+        if direct_raster or not keep_svg:
+            if not output_path.exists():
+                self.draw_with_osm_data(
+                    osm_data,
+                    directory_name,
+                    configuration,
+                    extractor,
+                    cache,
+                    direct_raster,
+                    keep_svg,
+                )
+            else:
+                logging.debug(f"File {output_path} already exists.")
+            return
+
+        if not file_path.exists():
+            self.draw_with_osm_data(
+                osm_data, directory_name, configuration, extractor, cache
+            )
+        else:
+            logging.debug(f"File {file_path} already exists.")
+
+        if not output_path.exists():
+            with file_path.open(encoding="utf-8") as input_file:
+                cairosvg.svg2png(file_obj=input_file, write_to=str(output_path))
+            logging.info(f"SVG file is rasterized to {output_path}.")
+        else:
+            logging.debug(f"File {output_path} already exists.")
 
     def subdivide(self, zoom_level: int) -> list["Tile"]:
         """Get subtiles of the tile."""
@@ -227,13 +422,24 @@ class Tiles:
         :param boundary_box: area to be covered by tiles
         :param zoom_level: zoom level in OpenStreetMap terminology
         """
-        tiles: list[Tile] = []
         tile_1: Tile = Tile.from_coordinates(
             boundary_box.get_left_top(), zoom_level
         )
         tile_2: Tile = Tile.from_coordinates(
             boundary_box.get_right_bottom(), zoom_level
         )
+        return cls.from_corners(tile_1, tile_2)
+
+    @classmethod
+    def from_corners(cls, tile_1: Tile, tile_2: Tile) -> "Tiles":
+        """
+        Create set of tiles between two corner tiles.
+
+        :param tile_1: left top tile
+        :param tile_2: right bottom tile
+        """
+        zoom_level: int = tile_1.zoom_level
+        tiles: list[Tile] = []
         for x in range(tile_1.x, tile_2.x + 1):
             for y in range(tile_1.y, tile_2.y + 1):
                 tiles.append(Tile(x, y, zoom_level))
@@ -258,13 +464,15 @@ class Tiles:
         )
         get_osm(self.boundary_box, cache_file_path)
 
-        osm_data: OSMData = OSMData()
-        osm_data.parse_osm_file(cache_file_path)
-
-        return osm_data
+        return load_osm_file(cache_file_path)
 
     def draw_separately(
-        self, directory: Path, cache_path: Path, configuration: MapConfiguration
+        self,
+        directory: Path,
+        cache_path: Path,
+        scheme_path: Path,
+        options: argparse.Namespace,
+        jobs: int = 1,
     ) -> None:
         """
         Draw set of tiles as SVG file separately and rasterize them into a set
@@ -272,27 +480,17 @@ class Tiles:
 
         :param directory: directory for tiles
         :param cache_path: directory for temporary OSM files
-        :param configuration: drawing configuration
+        :param scheme_path: path to the scheme file
+        :param options: command-line options of drawing configuration
+        :param jobs: number of processes to draw tiles in parallel
         """
         osm_data: OSMData = self.load_osm_data(cache_path)
 
-        for tile in self.tiles:
-            file_path: Path = tile.get_file_name(directory)
-            if not file_path.exists():
-                tile.draw_with_osm_data(osm_data, directory, configuration)
-            else:
-                logging.debug(f"File {file_path} already exists.")
-
-            output_path: Path = file_path.with_suffix(".png")
-
-            if not output_path.exists():
-                with file_path.open(encoding="utf-8") as input_file:
-                    cairosvg.svg2png(
-                        file_obj=input_file, write_to=str(output_path)
-                    )
-                logging.info(f"SVG file is rasterized to {output_path}.")
-            else:
-                logging.debug(f"File {output_path} already exists.")
+        tasks = [
+            RenderTask(tile, directory, cache_path, redraw=False)
+            for tile in self.tiles
+        ]
+        run_tasks(tasks, osm_data, scheme_path, options, jobs)
 
     def tiles_exist(self, directory_name: Path) -> bool:
         """Check whether all tiles are drawn."""
@@ -305,6 +503,10 @@ class Tiles:
         configuration: MapConfiguration,
         osm_data: OSMData,
         redraw: bool = False,
+        extractor: Optional[ShapeExtractor] = None,
+        cache: Optional[ConstructionCache] = None,
+        direct_raster: bool = False,
+        keep_svg: bool = True,
     ) -> None:
         """
         Draw one PNG image with all tiles and split it into a set of separate
@@ -315,12 +517,25 @@ class Tiles:
         :param configuration: drawing configuration
         :param osm_data: OpenStreetMap data
         :param redraw: update cache
+        :param extractor: icon extractor, if not specified, it will be created
+        :param cache: construction results shared by images drawn with the
+            same OpenStreetMap data and drawing configuration
+        :param direct_raster: draw PNG image directly without SVG file
+        :param keep_svg: write SVG file, otherwise SVG is rasterized from
+            memory
         """
         if self.tiles_exist(directory) and not redraw:
             return
 
         self.draw_image_from_osm_data(
-            cache_path, configuration, osm_data, redraw
+            cache_path,
+            configuration,
+            osm_data,
+            redraw,
+            extractor,
+            cache,
+            direct_raster,
+            keep_svg,
         )
         input_path: Path = self.get_file_path(cache_path).with_suffix(".png")
 
@@ -369,9 +584,19 @@ class Tiles:
         configuration: MapConfiguration,
         osm_data: OSMData,
         redraw: bool = False,
+        extractor: Optional[ShapeExtractor] = None,
+        cache: Optional[ConstructionCache] = None,
+        direct_raster: bool = False,
+        keep_svg: bool = True,
     ) -> None:
         """Draw all tiles using OSM data."""
-        output_path: Path = self.get_file_path(cache_path)
+        svg_path: Path = self.get_file_path(cache_path)
+        png_path: Path = svg_path.with_suffix(".png")
+
+        # Without SVG file the PNG image is the output of the drawing.
+        output_path: Path = (
+            svg_path if keep_svg and not direct_raster else png_path
+        )
 
         if not output_path.exists() or redraw:
             top, left = self.tile_1.get_coordinates()
@@ -386,30 +611,45 @@ class Tiles:
                 self.zoom_level,
                 osm_data.equator_length,
             )
-            extractor: ShapeExtractor = ShapeExtractor(
-                workspace.ICONS_PATH, workspace.ICONS_CONFIG_PATH
-            )
+            if extractor is None:
+                extractor = get_shape_extractor()
             constructor: Constructor = Constructor(
-                osm_data, flinger, extractor, configuration
+                query_osm_data(osm_data, flinger, configuration),
+                flinger,
+                extractor,
+                configuration,
+                cache,
             )
             constructor.construct()
 
-            svg: svgwrite.Drawing = svgwrite.Drawing(
-                str(output_path), size=flinger.size
-            )
-            map_: Map = Map(flinger, svg, configuration)
+            drawing: Drawing
+            if direct_raster:
+                drawing = PNGDrawing(png_path, *flinger.size)
+            else:
+                drawing = SVGStreamDrawing(svg_path, *flinger.size)
+            map_: Map = Map(flinger, drawing, configuration)
             map_.draw(constructor)
 
-            logging.info(f"Writing output SVG {output_path}...")
-            with output_path.open("w+", encoding="utf-8") as output_file:
-                svg.write(output_file)
-        else:
-            logging.debug(f"File {output_path} already exists.")
+            if not isinstance(drawing, SVGDrawing):
+                logging.info(f"Writing output PNG {png_path}...")
+                drawing.write()
+                return
+
+            content: bytes = drawing.get_content()
+            if keep_svg:
+                logging.info(f"Writing output SVG {svg_path}...")
+                svg_path.write_bytes(content)
 
-        png_path: Path = self.get_file_path(cache_path).with_suffix(".png")
+            cairosvg.svg2png(bytestring=content, write_to=str(png_path))
+            logging.info(f"SVG image is rasterized to {png_path}.")
+            return
+
+        logging.debug(f"File {output_path} already exists.")
+        if output_path == png_path:
+            return
 
         if not png_path.exists() or redraw:
-            with output_path.open(encoding="utf-8") as input_file:
+            with svg_path.open(encoding="utf-8") as input_file:
                 cairosvg.svg2png(file_obj=input_file, write_to=str(png_path))
             logging.info(f"SVG file is rasterized to {png_path}.")
         else:
@@ -429,6 +669,159 @@ class Tiles:
         )
 
 
+@dataclass
+class RenderTask:
+    """Drawing of a tile or a set of tiles that may be done in any process."""
+
+    tiles: Union[Tile, Tiles]
+    directory: Path
+    cache_path: Path
+    redraw: bool = True
+    direct_raster: bool = False
+    keep_svg: bool = True
+
+    def run(
+        self,
+        osm_data: OSMData,
+        configuration: MapConfiguration,
+        extractor: ShapeExtractor,
+        cache: Optional[ConstructionCache] = None,
+    ) -> None:
+        """Draw tiles."""
+        if isinstance(self.tiles, Tiles):
+            self.tiles.draw(
+                self.directory,
+                self.cache_path,
+                configuration,
+                osm_data,
+                self.redraw,
+                extractor,
+                cache,
+                self.direct_raster,
+                self.keep_svg,
+            )
+        elif self.redraw:
+            self.tiles.draw_with_osm_data(
+                osm_data,
+                self.directory,
+                configuration,
+                extractor,
+                cache,
+                self.direct_raster,
+                self.keep_svg,
+            )
+        else:
+            self.tiles.draw_missing_files(
+                osm_data,
+                self.directory,
+                configuration,
+                extractor,
+                cache,
+                self.direct_raster,
+                self.keep_svg,
+            )
+
+
+# Data shared by all tasks of the current process, see `initialize_worker`.
+worker_data: dict[str, Any] = {}
+
+
+def initialize_worker(
+    osm_data: OSMData,
+    scheme_path: Path,
+    options: argparse.Namespace,
+    zoom_levels: list[int],
+) -> None:
+    """
+    Prepare the process for drawing tiles: store OpenStreetMap data, load the
+    scheme and icons, and create drawing configurations once for all tasks.
+    Construction results are shared by all tasks of the process with the same
+    zoom level.
+
+    Arguments are pickled unless the process is started with the `fork` start
+    method, so the scheme is loaded by the process itself: it contains colors
+    that can't be pickled.  With `fork`, OpenStreetMap data is shared with the
+    parent process.
+
+    :param osm_data: OpenStreetMap data
+    :param scheme_path: path to the scheme file
+    :param options: command-line options of drawing configuration
+    :param zoom_levels: zoom levels of tasks
+    """
+    scheme: Optional[Scheme] = Scheme.from_file(
+        scheme_path, cache_path=workspace.get_cache_path()
+    )
+    assert scheme is not None
+    worker_data["osm_data"] = osm_data
+    worker_data["configurations"] = {
+        zoom_level: MapConfiguration.from_options(scheme, options, zoom_level)
+        for zoom_level in zoom_levels
+    }
+    worker_data["extractor"] = get_shape_extractor()
+    worker_data["caches"] = {
+        zoom_level: ConstructionCache() for zoom_level in zoom_levels
+    }
+
+
+def run_task(task: RenderTask) -> None:
+    """Run drawing task using data of the current process."""
+    task.run(
+        worker_data["osm_data"],
+        worker_data["configurations"][task.tiles.zoom_level],
+        worker_data["extractor"],
+        worker_data["caches"][task.tiles.zoom_level],
+    )
+
+
+def run_tasks(
+    tasks: list[RenderTask],
+    osm_data: OSMData,
+    scheme_path: Path,
+    options: argparse.Namespace,
+    jobs: int = 1,
+) -> None:
+    """
+    Run drawing tasks in the current process or in the process pool.
+
+    :param tasks: tasks to run
+    :param osm_data: OpenStreetMap data
+    :param scheme_path: path to the scheme file
+    :param options: command-line options of drawing configuration
+    :param jobs: number of processes
+    """
+    start_time: float = time.monotonic()
+    zoom_levels: list[int] = sorted({task.tiles.zoom_level for task in tasks})
+
+    if jobs <= 1 or len(tasks) <= 1:
+        initialize_worker(osm_data, scheme_path, options, zoom_levels)
+        try:
+            for task in tasks:
+                run_task(task)
+        finally:
+            worker_data.clear()
+    else:
+        with multiprocessing.Pool(
+            min(jobs, len(tasks)),
+            initializer=initialize_worker,
+            initargs=(osm_data, scheme_path, options, zoom_levels),
+        ) as pool:
+            # Tasks are consumed one by one to balance the load: tiles of
+            # higher zoom levels take much more time.
+            for _ in pool.imap_unordered(run_task, tasks, chunksize=1):
+                pass
+
+    tile_count: int = sum(
+        len(task.tiles.tiles) if isinstance(task.tiles, Tiles) else 1
+        for task in tasks
+    )
+    if tile_count > 1:
+        elapsed: float = time.monotonic() - start_time
+        logging.info(
+            f"{tile_count} tiles are drawn in {elapsed:.2f} s, "
+            f"{tile_count / elapsed:.2f} tiles per second."
+        )
+
+
 class ScaleConfigurationException(Exception):
     """Wrong configuration format."""
 
@@ -470,9 +863,20 @@ def generate_tiles(options: argparse.Namespace) -> None:
     zoom_levels: list[int] = parse_zoom_level(options.zoom)
     min_zoom_level: int = min(zoom_levels)
 
-    scheme: Scheme = Scheme.from_file(
-        workspace.find_scheme_path(options.scheme)
+    scheme_path: Optional[Path] = workspace.find_scheme_path(options.scheme)
+    if scheme_path is None:
+        logging.fatal(f"Scheme `{options.scheme}` not found.")
+        sys.exit(1)
+
+    # Tasks load the scheme themselves, here it is loaded to check it.
+    scheme: Optional[Scheme] = Scheme.from_file(
+        scheme_path, cache_path=workspace.get_cache_path()
     )
+    if scheme is None:
+        logging.fatal(f"Failed to load scheme from `{options.scheme}`.")
+        sys.exit(1)
+
+    tasks: list[RenderTask]
 
     if options.input_file_name:
         osm_data: OSMData = OSMData()
@@ -487,12 +891,18 @@ def generate_tiles(options: argparse.Namespace) -> None:
 
         boundary_box: BoundaryBox = osm_data.view_box
 
-        for zoom_level in zoom_levels:
-            configuration: MapConfiguration = MapConfiguration.from_options(
-                scheme, options, zoom_level
+        tasks = [
+            RenderTask(
+                Tiles.from_boundary_box(boundary_box, zoom_level),
+                directory,
+                Path(options.cache),
+                redraw=False,
+                direct_raster=options.direct_raster,
+                keep_svg=options.keep_svg,
             )
-            tiles: Tiles = Tiles.from_boundary_box(boundary_box, zoom_level)
-            tiles.draw(directory, Path(options.cache), configuration, osm_data)
+            for zoom_level in zoom_levels
+        ]
+        run_tasks(tasks, osm_data, scheme_path, options, options.jobs)
 
     elif options.coordinates:
         coordinates: list[float] = list(
@@ -506,17 +916,17 @@ def generate_tiles(options: argparse.Namespace) -> None:
         except NetworkError as error:
             raise NetworkError(f"Map is not loaded. {error.message}")
 
-        for zoom_level in zoom_levels:
-            tile: Tile = Tile.from_coordinates(
-                np.array(coordinates), zoom_level
+        tasks = [
+            RenderTask(
+                Tile.from_coordinates(np.array(coordinates), zoom_level),
+                directory,
+                Path(options.cache),
+                direct_raster=options.direct_raster,
+                keep_svg=options.keep_svg,
             )
-            try:
-                configuration: MapConfiguration = MapConfiguration.from_options(
-                    scheme, options, zoom_level
-                )
-                tile.draw_with_osm_data(osm_data, directory, configuration)
-            except NetworkError as error:
-                logging.fatal(error.message)
+            for zoom_level in zoom_levels
+        ]
+        run_tasks(tasks, osm_data, scheme_path, options, options.jobs)
 
     elif options.tile:
         zoom_level, x, y = map(int, options.tile.split("/"))
@@ -524,7 +934,13 @@ def generate_tiles(options: argparse.Namespace) -> None:
         configuration: MapConfiguration = MapConfiguration.from_options(
             scheme, options, zoom_level
         )
-        tile.draw(directory, Path(options.cache), configuration)
+        tile.draw(
+            directory,
+            Path(options.cache),
+            configuration,
+            direct_raster=options.direct_raster,
+            keep_svg=options.keep_svg,
+        )
 
     elif options.boundary_box:
         boundary_box: Optional[BoundaryBox] = BoundaryBox.from_text(
@@ -540,15 +956,23 @@ def generate_tiles(options: argparse.Namespace) -> None:
         except NetworkError as error:
             raise NetworkError(f"Map is not loaded. {error.message}")
 
+        tasks = []
         for zoom_level in zoom_levels:
             if EXTEND_TO_BIGGER_TILE:
                 tiles: Tiles = min_tiles.subdivide(zoom_level)
             else:
                 tiles: Tiles = Tiles.from_boundary_box(boundary_box, zoom_level)
-            configuration: MapConfiguration = MapConfiguration.from_options(
-                scheme, options, zoom_level
+            tasks.append(
+                RenderTask(
+                    tiles,
+                    directory,
+                    Path(options.cache),
+                    redraw=False,
+                    direct_raster=options.direct_raster,
+                    keep_svg=options.keep_svg,
+                )
             )
-            tiles.draw(directory, Path(options.cache), configuration, osm_data)
+        run_tasks(tasks, osm_data, scheme_path, options, options.jobs)
 
     else:
         logging.fatal(
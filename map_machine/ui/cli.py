@@ -214,6 +214,33 @@ def add_map_arguments(parser: argparse.ArgumentParser) -> None:
         action=argparse.BooleanOptionalAction,
         default=False,
     )
+    parser.add_argument(
+        "--icon-symbols",
+        help="define every icon shape once in SVG file and reference it for "
+        "every icon",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+    )
+    parser.add_argument(
+        "--path-precision",
+        help="number of decimal places for path coordinates, if not "
+        "specified, coordinates are written with full precision",
+        type=int,
+        metavar="<integer>",
+    )
+    parser.add_argument(
+        "--relative-paths",
+        help="use relative path commands",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+    )
+    parser.add_argument(
+        "--alternative-positions",
+        help="move labels and additional icons that don't fit below the main "
+        "icon to other positions around it",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+    )
 
 
 def add_tile_arguments(parser: argparse.ArgumentParser) -> None:
@@ -260,6 +287,27 @@ def add_tile_arguments(parser: argparse.ArgumentParser) -> None:
         help="input OSM XML file name (if not specified, the file will be "
         "downloaded using the OpenStreetMap API)",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="<integer>",
+        help="number of processes to render tiles in parallel",
+        default=1,
+    )
+    parser.add_argument(
+        "--direct-raster",
+        help="draw PNG tiles directly without intermediate SVG files",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+    )
+    parser.add_argument(
+        "--keep-svg",
+        help="write intermediate SVG files, otherwise SVG is rasterized from "
+        "memory",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+    )
 
 
 def add_server_arguments(parser: argparse.ArgumentParser) -> None:
@@ -277,6 +325,49 @@ def add_server_arguments(parser: argparse.ArgumentParser) -> None:
         type=int,
         metavar="<integer>",
     )
+    parser.add_argument(
+        "--workers",
+        help="number of threads to render tiles",
+        default=1,
+        type=int,
+        metavar="<integer>",
+    )
+    parser.add_argument(
+        "--metatile-size",
+        help="number of tiles in a row and a column of the block of "
+        "neighbouring tiles rendered at once",
+        default=4,
+        type=int,
+        metavar="<integer>",
+    )
+    parser.add_argument(
+        "--osm-data-cache-size",
+        help="maximum total size of OSM data files kept parsed in memory in "
+        "megabytes",
+        default=256,
+        type=int,
+        metavar="<integer>",
+    )
+    parser.add_argument(
+        "--memory-cache-size",
+        help="maximum size of PNG tiles cached in memory in megabytes",
+        default=64,
+        type=int,
+        metavar="<integer>",
+    )
+    parser.add_argument(
+        "--direct-raster",
+        help="draw PNG tiles directly without intermediate SVG files",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+    )
+    parser.add_argument(
+        "--keep-svg",
+        help="write intermediate SVG files, otherwise SVG is rasterized from "
+        "memory",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+    )
 
 
 def add_draw_arguments(parser: argparse.ArgumentParser) -> None:
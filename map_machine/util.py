@@ -1,10 +1,15 @@
 """Utility file."""
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
 
 __author__ = "Sergey Vartanov"
 __email__ = "me@enzet.ru"
 
+Key = TypeVar("Key", bound=Hashable)
+Value = TypeVar("Value")
+
 
 @dataclass
 class MinMax:
@@ -32,3 +37,107 @@ class MinMax:
 
     def __repr__(self) -> str:
         return f"{self.min_}:{self.max_}"
+
+
+class LRUCache(Generic[Key, Value]):
+    """
+    Cache of limited size that evicts least recently used values.
+
+    Counts hits, misses, and evictions to check cache efficiency.  The cache
+    may be used from several threads.
+    """
+
+    def __init__(
+        self,
+        maximum_size: int,
+        get_size: Optional[Callable[[Value], int]] = None,
+    ) -> None:
+        """
+        :param maximum_size: maximum total size of values in the cache
+        :param get_size: function to compute value size, if not specified,
+            every value has size 1, so that the maximum size is the maximum
+            number of values
+        """
+        self.maximum_size: int = maximum_size
+        self.get_size: Optional[Callable[[Value], int]] = get_size
+        self.values: OrderedDict[Key, Value] = OrderedDict()
+        self.size: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        self.lock: threading.Lock = threading.Lock()
+
+    def get(self, key: Key) -> Optional[Value]:
+        """Get value or None if there is no such key in the cache."""
+        with self.lock:
+            if key not in self.values:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.values.move_to_end(key)
+            return self.values[key]
+
+    def put(self, key: Key, value: Value) -> None:
+        """Add value to the cache and evict the least recently used ones."""
+        size: int = self.get_value_size(value)
+        if size > self.maximum_size:
+            return
+
+        with self.lock:
+            if key in self.values:
+                self.size -= self.get_value_size(self.values[key])
+            self.values[key] = value
+            self.values.move_to_end(key)
+            self.size += size
+
+            while self.size > self.maximum_size:
+                _, evicted = self.values.popitem(last=False)
+                self.size -= self.get_value_size(evicted)
+                self.evictions += 1
+
+    def items(self) -> list[tuple[Key, Value]]:
+        """
+        Get keys and values from the least to the most recently used ones
+        without updating the usage order.
+        """
+        with self.lock:
+            return list(self.values.items())
+
+    def get_value_size(self, value: Value) -> int:
+        """Get size of the value in the cache."""
+        return 1 if self.get_size is None else self.get_size(value)
+
+    def clear(self) -> None:
+        """Remove all values from the cache."""
+        with self.lock:
+            self.values.clear()
+            self.size = 0
+
+    def get_statistics(self) -> dict[str, int]:
+        """Get cache size and hit, miss, and eviction counters."""
+        return {
+            "size": self.size,
+            "maximum_size": self.maximum_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Locks cannot be pickled, e.g. to pass the scheme to other processes.
+        state: dict[str, Any] = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.values
+
+    def __len__(self) -> int:
+        return len(self.values)
@@ -41,6 +41,7 @@ class Workspace:
         self._icons_by_name_path: Path = output_path / "icons_by_name"
         self._mapcss_path: Path = output_path / "map_machine_mapcss"
         self._tile_path: Path = output_path / "tiles"
+        self._cache_path: Path = output_path / "cache"
 
     def find_scheme_path(self, identifier: str) -> Optional[Path]:
         """
@@ -95,6 +96,14 @@ class Workspace:
             self.get_mapcss_path() / self.MAPCSS_ICONS_DIRECTORY_NAME
         )
 
+    def get_cache_path(self) -> Path:
+        """Directory for files that may be safely removed."""
+        return check_and_create(self._cache_path)
+
+    def get_icons_bundle_path(self) -> Path:
+        """File with shapes extracted from the icons SVG file."""
+        return self._cache_path / "icons.json"
+
     def get_icon_grid_path(self) -> Path:
         """Icon grid path."""
         return self.output_path / "icon_grid.svg"
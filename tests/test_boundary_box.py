@@ -43,3 +43,11 @@ def test_boundary_box_parsing() -> None:
 
     # Too big boundary box.
     assert BoundaryBox.from_text("-20,-20,20,20") is None
+
+
+def test_contains() -> None:
+    """Test checking whether boundary box is inside another one."""
+    box: BoundaryBox = BoundaryBox(-0.1, -0.1, 0.1, 0.1)
+
+    assert box.contains(BoundaryBox(-0.1, 0.0, 0.0, 0.1))
+    assert not box.contains(BoundaryBox(-0.2, 0.0, 0.0, 0.1))
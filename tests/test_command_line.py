@@ -1,5 +1,6 @@
 """Test command line commands."""
 import argparse
+import shutil
 from pathlib import Path
 from subprocess import PIPE, Popen
 
@@ -22,6 +23,16 @@ LOG: bytes = (
 OUTPUT_PATH: Path = Path("out")
 
 
+def copy_cache(path: Path) -> str:
+    """
+    Copy OSM data files to the temporary cache directory, so that files
+    written next to them don't get into the test data directory.
+    """
+    for file_path in Path("tests/data").glob("*.osm"):
+        shutil.copy(file_path, path / file_path.name)
+    return str(path)
+
+
 def error_run(arguments: list[str], message: bytes) -> None:
     """Run command that should fail and check error message."""
     with Popen(["map-machine"] + arguments, stderr=PIPE) as pipe:
@@ -47,10 +58,10 @@ def test_wrong_render_arguments() -> None:
     )
 
 
-def test_render() -> None:
+def test_render(tmp_path: Path) -> None:
     """Test `render` command."""
     run(
-        COMMAND_LINES["render"] + ["--cache", "tests/data"],
+        COMMAND_LINES["render"] + ["--cache", copy_cache(tmp_path)],
         LOG + b"INFO Writing output SVG to out/map.svg...\n",
     )
     with (OUTPUT_PATH / "map.svg").open(encoding="utf-8") as output_file:
@@ -64,10 +75,11 @@ def test_render() -> None:
     assert root.get("height") == "198.0"
 
 
-def test_render_with_tooltips() -> None:
+def test_render_with_tooltips(tmp_path: Path) -> None:
     """Test `render` command."""
     run(
-        COMMAND_LINES["render_with_tooltips"] + ["--cache", "tests/data"],
+        COMMAND_LINES["render_with_tooltips"]
+        + ["--cache", copy_cache(tmp_path)],
         LOG + b"INFO Writing output SVG to out/map.svg...\n",
     )
     with (OUTPUT_PATH / "map.svg").open(encoding="utf-8") as output_file:
@@ -130,10 +142,10 @@ def test_unwrapped_draw() -> None:
     draw_element(arguments)
 
 
-def test_tile() -> None:
+def test_tile(tmp_path: Path) -> None:
     """Test `tile` command."""
     run(
-        COMMAND_LINES["tile"] + ["--cache", "tests/data"],
+        COMMAND_LINES["tile"] + ["--cache", copy_cache(tmp_path)],
         LOG + b"INFO Tile is drawn to out/tiles/tile_18_160199_88904.svg.\n"
         b"INFO SVG file is rasterized to out/tiles/tile_18_160199_88904.png.\n",
     )
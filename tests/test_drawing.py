@@ -0,0 +1,116 @@
+"""Test drawing SVG elements to SVG and PNG images."""
+import sys
+from pathlib import Path
+
+from svgwrite.container import Group
+from svgwrite.gradients import RadialGradient
+from svgwrite.path import Path as SVGPath
+from svgwrite.shapes import Line, Rect
+from svgwrite.text import Text, TextPath
+
+from map_machine.drawing import (
+    Drawing,
+    PNGDrawing,
+    SVGDrawing,
+    SVGStreamDrawing,
+)
+
+__author__ = "Sergey Vartanov"
+__email__ = "me@enzet.ru"
+
+
+def get_pixel(drawing: PNGDrawing, x: int, y: int) -> int:
+    """Get ARGB value of the image pixel."""
+    start: int = y * drawing.surface.get_stride() + x * 4
+    data: bytes = bytes(drawing.surface.get_data()[start : start + 4])
+    return int.from_bytes(data, sys.byteorder)
+
+
+def test_rectangle() -> None:
+    """Test rectangle filling."""
+    drawing: PNGDrawing = PNGDrawing(Path("temp/rectangle.png"), 4, 4)
+    drawing.add(Rect((0.0, 0.0), (2.0, 4.0), fill="#FF0000"))
+
+    assert get_pixel(drawing, 0, 0) == 0xFFFF0000
+    assert get_pixel(drawing, 3, 3) == 0x00000000
+
+
+def test_inherited_fill() -> None:
+    """Test path filling with the color specified for the group."""
+    drawing: PNGDrawing = PNGDrawing(Path("temp/path.png"), 4, 4)
+    group: Group = Group(fill="#0000FF")
+    group.add(SVGPath(d=["M", (0.0, 0.0), "L", (4.0, 0.0), (4.0, 4.0), "Z"]))
+    drawing.add(group)
+
+    assert get_pixel(drawing, 3, 0) == 0xFF0000FF
+    assert get_pixel(drawing, 0, 3) == 0x00000000
+
+
+def test_text_path() -> None:
+    """Test that text along the path is drawn."""
+    drawing: PNGDrawing = PNGDrawing(Path("temp/text_path.png"), 100, 20)
+    path: SVGPath = SVGPath(d="M 0,15 L 100,15", id="line")
+    text: Text = Text("")
+    text.add(TextPath(path, "MMMMMMMMMM", font_size=20.0, fill="#000000"))
+    drawing.add(path)
+    drawing.add(text)
+
+    assert any(get_pixel(drawing, x, 10) != 0 for x in range(100))
+    assert not drawing.warnings
+
+
+def test_unsupported() -> None:
+    """Test that unsupported elements and attributes are reported."""
+    drawing: PNGDrawing = PNGDrawing(Path("temp/unsupported.png"), 4, 4)
+    drawing.add(Rect((0.0, 0.0), (2.0, 4.0), filter="url(#blur)"))
+    drawing.add(Group(filter="url(#blur)"))
+    drawing.add(Line((0.0, 0.0), (4.0, 4.0)))
+
+    assert drawing.warnings == {"attribute `filter`", "element `line`"}
+
+
+def test_svg_content() -> None:
+    """Test that SVG content in memory is the same as the written file."""
+    path: Path = Path("temp/content.svg")
+    path.parent.mkdir(exist_ok=True)
+    drawing: SVGDrawing = SVGDrawing(path, 4, 4)
+    drawing.add(Rect((0.0, 0.0), (2.0, 4.0), fill="#FF0000"))
+    drawing.write()
+
+    assert drawing.get_content() == path.read_bytes()
+
+
+def test_definition() -> None:
+    """Test that definitions are registered by identifier."""
+    drawing: SVGDrawing = SVGDrawing(Path("temp/definition.svg"), 4, 4)
+    drawing.add_definition(SVGPath(d=["M", (0.0, 0.0)], id="shape"))
+
+    assert drawing.has_definition("shape")
+    assert not drawing.has_definition("other")
+
+
+def draw_elements(drawing: Drawing) -> None:
+    """Draw elements with definitions, children, text, and title."""
+    gradient: RadialGradient = drawing.add_definition(RadialGradient(id="g"))
+    group: Group = Group(opacity=0.5)
+    path: SVGPath = SVGPath(
+        d=["M", (0.0, 0.0), "L", (4.0, 1.5)], fill="url(#g)"
+    )
+    path.set_desc(title="a: <b>\nc: d & e")
+    group.add(path)
+    drawing.add(group)
+    drawing.add(Text('"text" & <text>', (1.0, 2.0), font_size=10.0))
+    drawing.add(Text("", (1.0, 2.0)))
+    gradient.add_stop_color(0.0, "#FFFFFF")
+
+
+def test_svg_stream() -> None:
+    """Test that streamed SVG content is the same as svgwrite output."""
+    drawing: SVGDrawing = SVGDrawing(Path("temp/content.svg"), 4, 4)
+    stream_drawing: SVGStreamDrawing = SVGStreamDrawing(
+        Path("temp/stream.svg"), 4, 4
+    )
+    draw_elements(drawing)
+    draw_elements(stream_drawing)
+
+    assert stream_drawing.get_content() == drawing.get_content()
@@ -1,9 +1,13 @@
 """Test coordinates computation."""
 import numpy as np
 
+from map_machine.geometry.boundary_box import BoundaryBox
 from map_machine.geometry.flinger import (
+    MercatorFlinger,
+    inverse_pseudo_mercator_many,
     osm_zoom_level_to_pixels_per_meter,
     pseudo_mercator,
+    pseudo_mercator_many,
 )
 
 __author__ = "Sergey Vartanov"
@@ -19,6 +23,42 @@ def test_pseudo_mercator() -> None:
     )
 
 
+def test_pseudo_mercator_many() -> None:
+    """Test pseudo-Mercator projection of coordinate array."""
+    coordinates: np.ndarray = np.array(((0, 0), (0, 10), (10, 0), (55, 37)))
+    assert np.allclose(
+        pseudo_mercator_many(coordinates),
+        np.array([pseudo_mercator(x) for x in coordinates]),
+    )
+
+
+def test_fling_many() -> None:
+    """Test that batched flinging gives the same result as per-point one."""
+    flinger: MercatorFlinger = MercatorFlinger(
+        BoundaryBox(37.0, 55.0, 37.01, 55.01), 18, 40_075_017.0
+    )
+    coordinates: np.ndarray = np.array(
+        ((55.0, 37.0), (55.005, 37.002), (55.01, 37.01), (54.99, 37.02))
+    )
+    assert np.allclose(
+        flinger.fling_many(coordinates),
+        np.array([flinger.fling(x) for x in coordinates]),
+    )
+    assert np.allclose(
+        flinger.fling_projected_many(pseudo_mercator_many(coordinates)),
+        flinger.fling_many(coordinates),
+    )
+
+
+def test_inverse_pseudo_mercator_many() -> None:
+    """Test that inverse projection restores geo coordinates."""
+    coordinates: np.ndarray = np.array(((0, 0), (-45, 10), (55, 37)))
+    assert np.allclose(
+        inverse_pseudo_mercator_many(pseudo_mercator_many(coordinates)),
+        coordinates,
+    )
+
+
 def test_osm_zoom_level_to_pixels_per_meter() -> None:
     """Test scale computation."""
     assert np.allclose(
@@ -4,14 +4,23 @@ Test icon generation for nodes.
 Tests check that for the given node described by tags, Map Machine generates
 expected icons with expected colors.
 """
+import json
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 from colour import Color
 
+from map_machine.drawing import SVGDrawing
 from map_machine.map_configuration import MapConfiguration
 from map_machine.osm.osm_reader import Tags
-from map_machine.pictogram.icon import IconSet, ShapeSpecification, Icon
+from map_machine.pictogram.icon import (
+    Icon,
+    IconSet,
+    Shape,
+    ShapeExtractor,
+    ShapeSpecification,
+)
 from map_machine.pictogram.icon_collection import IconCollection
 from tests import SCHEME, SHAPE_EXTRACTOR, workspace
 
@@ -47,6 +56,61 @@ def test_icons_by_name() -> None:
     assert (path / "LICENSE").is_file()
 
 
+def test_icon_bundle() -> None:
+    """Test that shapes read from the icon bundle are the same as extracted."""
+    path: Path = workspace.output_path / "icons_bundle.json"
+    path.unlink(missing_ok=True)
+    ShapeExtractor(workspace.ICONS_PATH, workspace.ICONS_CONFIG_PATH, path)
+    assert path.is_file()
+
+    extractor: ShapeExtractor = ShapeExtractor(
+        workspace.ICONS_PATH, workspace.ICONS_CONFIG_PATH, path
+    )
+    assert extractor.shapes.keys() == SHAPE_EXTRACTOR.shapes.keys()
+
+    shape: Shape = extractor.get_shape("tree")
+    expected: Shape = SHAPE_EXTRACTOR.get_shape("tree")
+    assert shape.path == expected.path
+    assert shape.name == expected.name
+    assert shape.categories == expected.categories
+    assert (shape.offset == expected.offset).all()
+
+
+def test_broken_icon_bundle() -> None:
+    """Test that broken icon bundle with the valid key is ignored."""
+    path: Path = workspace.output_path / "icons_broken_bundle.json"
+    path.unlink(missing_ok=True)
+    ShapeExtractor(workspace.ICONS_PATH, workspace.ICONS_CONFIG_PATH, path)
+    key: str = json.loads(path.read_text(encoding="utf-8"))["key"]
+    assert key.startswith("1:")
+
+    for bundle in [
+        {"key": key, "shapes": {}},
+        {"key": key, "configuration": {}, "shapes": {"tree": ["M 0,0", 0]}},
+        {"key": key, "configuration": [], "shapes": {"tree": [0, 0, 0, 0]}},
+    ]:
+        path.write_text(json.dumps(bundle), encoding="utf-8")
+        extractor: ShapeExtractor = ShapeExtractor(
+            workspace.ICONS_PATH, workspace.ICONS_CONFIG_PATH, path
+        )
+        assert extractor.shapes.keys() == SHAPE_EXTRACTOR.shapes.keys()
+
+    # Broken bundle is replaced with the valid one.
+    assert "configuration" in json.loads(path.read_text(encoding="utf-8"))
+    assert not list(path.parent.glob(f"{path.name}.*.tmp"))
+
+
+def test_icon_symbols() -> None:
+    """Test that icon shape is defined once and referenced by every icon."""
+    drawing: SVGDrawing = SVGDrawing(workspace.output_path / "use.svg", 40, 20)
+    icon: Icon = get_icon({"natural": "tree"}).main_icon
+    icon.draw(drawing, np.array((8.0, 8.0)), use_symbols=True)
+    icon.draw(drawing, np.array((24.0, 8.0)), use_symbols=True)
+
+    assert len(drawing.definitions) == 1
+    assert drawing.get_content().count(b"<use ") == 2
+
+
 def get_icon(tags: Tags) -> IconSet:
     """Construct icon from tags."""
     processed: set[str] = set()
@@ -209,3 +273,20 @@ def test_diving_tower() -> None:
         },
         [("diving_4_platforms", DEFAULT_COLOR)],
     )
+
+
+def test_icon_cache() -> None:
+    """
+    Test that icon set cache doesn't depend on tag order and that processed
+    tag keys are updated for cached icon sets.
+    """
+    processed_1: set[str] = set()
+    icon_set_1, _ = CONFIGURATION.get_icon(
+        SHAPE_EXTRACTOR, {"amenity": "cafe", "name": "Nero"}, processed_1
+    )
+    processed_2: set[str] = set()
+    icon_set_2, _ = CONFIGURATION.get_icon(
+        SHAPE_EXTRACTOR, {"name": "Nero", "amenity": "cafe"}, processed_2
+    )
+    assert icon_set_1 is icon_set_2
+    assert processed_1 == processed_2 == {"amenity"}
@@ -1,11 +1,17 @@
 """Test OSM XML parsing."""
+from pathlib import Path
+
 import numpy as np
 
+from map_machine.geometry.boundary_box import BoundaryBox
+from map_machine.geometry.flinger import pseudo_mercator
 from map_machine.osm.osm_reader import (
+    NodeSequence,
     OSMData,
     OSMNode,
     OSMRelation,
     OSMWay,
+    get_projected_coordinates,
     parse_levels,
 )
 
@@ -104,6 +110,106 @@ def test_relation() -> None:
     assert relation.members[0].ref == 2
 
 
+def test_parse_file(tmp_path: Path) -> None:
+    """Test that streaming file parsing gives the same result as text one."""
+    text: str = """<?xml version="1.0"?>
+<osm>
+  <bounds minlat="10" minlon="5" maxlat="11" maxlon="6" />
+  <node id="1" lon="5" lat="10">
+    <tag k="key" v="value" />
+  </node>
+  <node id="2" lon="6" lat="11" />
+  <way id="3">
+    <nd ref="1" />
+    <nd ref="2" />
+    <tag k="key" v="value" />
+  </way>
+  <relation id="4">
+    <member type="way" ref="3" role="outer" />
+  </relation>
+</osm>"""
+    file_path: Path = tmp_path / "map.osm"
+    file_path.write_text(text, encoding="utf-8")
+
+    osm_data: OSMData = OSMData()
+    osm_data.parse_osm_file(file_path)
+    expected: OSMData = OSMData()
+    expected.parse_osm_text(text)
+
+    assert osm_data.nodes == expected.nodes
+    assert osm_data.ways == expected.ways
+    assert osm_data.relations == expected.relations
+    assert osm_data.view_box == expected.view_box
+    assert [x.id_ for x in osm_data.ways[3].nodes] == [1, 2]
+    assert osm_data.nodes[1].tags == {"key": "value"}
+
+
+def test_columnar_nodes() -> None:
+    """Test that nodes in the columnar store are the same as usual ones."""
+    text: str = """<?xml version="1.0"?>
+<osm>
+  <node id="3" lon="7" lat="12" />
+  <node id="1" lon="5" lat="10">
+    <tag k="key" v="value" />
+  </node>
+  <node id="2" lon="6" lat="11" />
+  <way id="4">
+    <nd ref="1" />
+    <nd ref="2" />
+    <nd ref="3" />
+    <nd ref="1" />
+  </way>
+</osm>"""
+    osm_data: OSMData = OSMData(columnar=True)
+    osm_data.parse_osm_text(text)
+    expected: OSMData = OSMData()
+    expected.parse_osm_text(text)
+
+    assert len(osm_data.nodes) == 3
+    assert list(osm_data.nodes) == [3, 1, 2]
+    assert 2 in osm_data.nodes and 5 not in osm_data.nodes
+    for node_id, node in expected.nodes.items():
+        assert osm_data.nodes[node_id].id_ == node_id
+        assert osm_data.nodes[node_id].tags == node.tags
+        assert np.allclose(
+            osm_data.nodes[node_id].coordinates, node.coordinates
+        )
+
+    way: OSMWay = osm_data.ways[4]
+    assert isinstance(way.nodes, NodeSequence)
+    assert [x.id_ for x in way.nodes] == [1, 2, 3, 1]
+    assert way.is_cycle()
+    assert np.allclose(
+        way.nodes.get_coordinates(),
+        np.array([x.coordinates for x in expected.ways[4].nodes]),
+    )
+
+
+def test_projected_coordinates() -> None:
+    """Test that pseudo-Mercator positions are cached and consistent."""
+    text: str = """<?xml version="1.0"?>
+<osm>
+  <node id="1" lon="5" lat="10" />
+  <node id="2" lon="6" lat="11" />
+  <way id="3">
+    <nd ref="1" />
+    <nd ref="2" />
+  </way>
+</osm>"""
+    osm_data: OSMData = OSMData()
+    osm_data.parse_osm_text(text)
+    columnar: OSMData = OSMData(columnar=True)
+    columnar.parse_osm_text(text)
+
+    projected: np.ndarray = get_projected_coordinates(osm_data.ways[3].nodes)
+    assert np.allclose(
+        projected,
+        get_projected_coordinates(columnar.ways[3].nodes),
+    )
+    assert osm_data.nodes[1].projected is not None
+    assert np.allclose(projected[0], pseudo_mercator(np.array((10, 5))))
+
+
 def test_parse_levels() -> None:
     """Test level parsing."""
     assert parse_levels("1") == [1]
@@ -118,3 +224,44 @@ def test_parse_levels_list() -> None:
     assert parse_levels("0;2") == [0, 2]
     assert parse_levels("0;2.5") == [0, 2.5]
     assert parse_levels("0;2,5") == [0, 2.5]
+
+
+def test_query() -> None:
+    """Test getting nodes, ways, and relations inside the boundary box."""
+    text: str = """<?xml version="1.0"?>
+<osm>
+  <node id="1" lon="0" lat="0" />
+  <node id="2" lon="1" lat="1" />
+  <node id="3" lon="10" lat="10" />
+  <node id="4" lon="11" lat="10" />
+  <node id="5" lon="11" lat="11" />
+  <way id="6">
+    <nd ref="1" />
+    <nd ref="3" />
+  </way>
+  <way id="7">
+    <nd ref="3" />
+    <nd ref="4" />
+  </way>
+  <way id="8">
+    <nd ref="4" />
+    <nd ref="5" />
+  </way>
+  <relation id="9">
+    <member type="way" ref="7" role="outer" />
+    <member type="way" ref="8" role="outer" />
+  </relation>
+</osm>"""
+    for columnar in False, True:
+        osm_data: OSMData = OSMData(columnar=columnar)
+        osm_data.parse_osm_text(text)
+
+        view: OSMData = osm_data.query(BoundaryBox(0.5, 0.5, 2.0, 2.0))
+        assert list(view.nodes) == [2]
+        assert list(view.ways) == [6]
+        assert not view.relations
+
+        view = osm_data.query(BoundaryBox(10.8, 10.8, 12.0, 12.0))
+        assert list(view.nodes) == [5]
+        assert set(view.ways) == {7, 8}
+        assert list(view.relations) == [9]
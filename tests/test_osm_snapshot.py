@@ -0,0 +1,121 @@
+"""Test binary snapshot of OSM data."""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from map_machine.osm.osm_reader import NodeSequence, NodeStore, OSMData, OSMWay
+from map_machine.osm.osm_snapshot import (
+    get_snapshot_path,
+    load_osm_file,
+    write_snapshot,
+)
+
+__author__ = "Sergey Vartanov"
+__email__ = "me@enzet.ru"
+
+TEXT: str = """<?xml version="1.0"?>
+<osm>
+  <bounds minlat="10" minlon="5" maxlat="12" maxlon="7" />
+  <node id="3" lon="7" lat="12" timestamp="2020-01-01T00:00:00Z" />
+  <node id="1" lon="5" lat="10" user="Ann" timestamp="2020-01-02T03:04:05Z">
+    <tag k="name" v="Café" />
+  </node>
+  <node id="2" lon="6" lat="11" timestamp="2020-02-01T00:00:00Z" />
+  <way id="4" user="Bob" uid="42" changeset="7">
+    <nd ref="1" />
+    <nd ref="2" />
+    <nd ref="3" />
+    <nd ref="1" />
+    <tag k="name" v="Café" />
+    <tag k="building" v="yes" />
+  </way>
+  <way id="5" />
+  <relation id="6" timestamp="2021-01-02T03:04:05Z">
+    <member type="way" ref="4" role="outer" />
+    <member type="node" ref="3" role="" />
+    <tag k="type" v="multipolygon" />
+  </relation>
+</osm>"""
+
+
+def test_snapshot(tmp_path: Path) -> None:
+    """Test that OSM data loaded from the snapshot is the same as parsed."""
+    file_path: Path = tmp_path / "map.osm"
+    file_path.write_text(TEXT, encoding="utf-8")
+    expected: OSMData = OSMData()
+    expected.parse_osm_file(file_path)
+
+    load_osm_file(file_path)
+    assert get_snapshot_path(file_path).exists()
+    osm_data: OSMData = load_osm_file(file_path)
+
+    assert isinstance(osm_data.nodes, NodeStore)
+    assert sorted(osm_data.nodes) == [1, 2, 3]
+    assert osm_data.nodes[1] == expected.nodes[1]
+    assert osm_data.nodes[1].tags == {"name": "Café"}
+    assert np.allclose(osm_data.nodes[3].coordinates, (12.0, 7.0))
+
+    assert osm_data.ways.keys() == expected.ways.keys()
+    for way_id, way in expected.ways.items():
+        loaded: OSMWay = osm_data.ways[way_id]
+        assert isinstance(loaded.nodes, NodeSequence)
+        assert [x.id_ for x in loaded.nodes] == [x.id_ for x in way.nodes]
+        assert loaded.tags == way.tags
+        assert (loaded.user, loaded.uid, loaded.changeset) == (
+            way.user,
+            way.uid,
+            way.changeset,
+        )
+    assert osm_data.ways[4].is_cycle()
+
+    assert osm_data.relations == expected.relations
+    assert osm_data.authors == expected.authors
+    assert osm_data.time.min_ == expected.time.min_
+    assert osm_data.time.max_ == expected.time.max_
+    assert osm_data.view_box == expected.view_box
+    assert osm_data.boundary_box == expected.boundary_box
+
+
+def test_outdated_snapshot(tmp_path: Path) -> None:
+    """Test that the snapshot is not used if the OSM XML file is changed."""
+    file_path: Path = tmp_path / "map.osm"
+    file_path.write_text(TEXT, encoding="utf-8")
+    load_osm_file(file_path)
+
+    file_path.write_text(TEXT.replace("Café", "Shop"), encoding="utf-8")
+    osm_data: OSMData = load_osm_file(file_path)
+    assert osm_data.ways[4].tags["name"] == "Shop"
+
+    get_snapshot_path(file_path).write_bytes(b"not a snapshot")
+    osm_data = load_osm_file(file_path)
+    assert osm_data.nodes[1].tags["name"] == "Shop"
+    assert load_osm_file(file_path).nodes[1].tags["name"] == "Shop"
+
+
+def test_concurrent_snapshot_writes(tmp_path: Path) -> None:
+    """
+    Test that threads writing the same snapshot don't interfere and readers
+    see only complete snapshots.
+    """
+    osm_data: OSMData = OSMData()
+    osm_data.parse_osm_text(TEXT)
+    snapshot_path: Path = tmp_path / "map.snapshot"
+    write_snapshot(osm_data, snapshot_path, [0, 0])
+    content: bytes = snapshot_path.read_bytes()
+
+    def write() -> None:
+        for _ in range(20):
+            write_snapshot(osm_data, snapshot_path, [0, 0])
+
+    def read() -> bool:
+        return all(snapshot_path.read_bytes() == content for _ in range(100))
+
+    with ThreadPoolExecutor(5) as executor:
+        writes = [executor.submit(write) for _ in range(4)]
+        assert executor.submit(read).result()
+        for future in writes:
+            future.result()
+
+    assert snapshot_path.read_bytes() == content
+    assert list(tmp_path.iterdir()) == [snapshot_path]
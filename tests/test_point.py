@@ -0,0 +1,92 @@
+"""Test structures used to place points on the map."""
+import numpy as np
+from colour import Color
+
+from map_machine.drawing import SVGDrawing
+from map_machine.pictogram.icon import IconSet
+from map_machine.pictogram.point import CELL_SIZE, Occupied, Point
+from map_machine.text import Label
+from tests import SCHEME, SHAPE_EXTRACTOR, workspace
+
+__author__ = "Sergey Vartanov"
+__email__ = "me@enzet.ru"
+
+
+def test_occupied_area() -> None:
+    """Test area registration across cell borders."""
+    occupied: Occupied = Occupied(1000.0, 1000.0, 12)
+    occupied.register_area(CELL_SIZE - 2, 10, CELL_SIZE + 2, 20)
+
+    assert occupied.check(np.array((CELL_SIZE - 2, 10)))
+    assert occupied.check(np.array((CELL_SIZE + 1, 19)))
+    assert not occupied.check(np.array((CELL_SIZE + 2, 19)))
+    assert not occupied.check(np.array((CELL_SIZE, 20)))
+    assert len(occupied.cells) == 2
+
+    assert occupied.check_area(0, 0, CELL_SIZE - 1, 11)
+    assert not occupied.check_area(0, 0, CELL_SIZE - 2, 1000)
+
+
+def test_occupied_outside() -> None:
+    """Test that points outside the canvas are occupied."""
+    occupied: Occupied = Occupied(100.0, 100.0, 12)
+    occupied.register_area(-10, -10, 5, 5)
+
+    assert occupied.check(np.array((-1, 50)))
+    assert occupied.check(np.array((100, 50)))
+    assert occupied.check(np.array((4, 4)))
+    assert not occupied.check(np.array((5, 5)))
+    assert occupied.check_area(95, 0, 101, 1)
+    assert not occupied.check_area(95, 10, 100, 11)
+
+
+def test_occupied_place() -> None:
+    """Test that the first free candidate position is occupied."""
+    occupied: Occupied = Occupied(100.0, 100.0, 12)
+    occupied.register_area(0, 0, 10, 10)
+
+    assert occupied.place([((5, 5, 15, 6), (5, 0, 15, 10))]) is None
+    assert (
+        occupied.place(
+            [((5, 5, 15, 6), (5, 0, 15, 10)), ((20, 5, 30, 6), (20, 0, 30, 10))]
+        )
+        == 1
+    )
+    assert occupied.check(np.array((25, 0)))
+    assert not occupied.check(np.array((15, 0)))
+
+
+def draw_label(alternative_positions: bool) -> Occupied:
+    """
+    Draw cafe icon with a label at the center of the canvas, the space below
+    the icon is occupied.
+    """
+    tags: dict[str, str] = {"amenity": "cafe"}
+    processed: set[str] = set()
+    icon_set, _ = SCHEME.get_icon(SHAPE_EXTRACTOR, tags, processed)
+    assert isinstance(icon_set, IconSet)
+    point: Point = Point(
+        icon_set,
+        [Label("Cafe", Color("black"), Color("white"))],
+        tags,
+        processed,
+        np.array((50.0, 50.0)),
+        alternative_positions=alternative_positions,
+    )
+    drawing: SVGDrawing = SVGDrawing(
+        workspace.output_path / "label.svg", 100, 100
+    )
+    occupied: Occupied = Occupied(100.0, 100.0, 12)
+    occupied.register_area(0, 62, 100, 100)
+
+    point.draw_main_shapes(drawing, occupied)
+    point.draw_texts(drawing, occupied)
+    assert point.main_icon_painted
+
+    return occupied
+
+
+def test_label_alternative_position() -> None:
+    """Test that the label that doesn't fit below the icon is moved right."""
+    assert not draw_label(False).check(np.array((70, 50)))
+    assert draw_label(True).check(np.array((70, 50)))
@@ -1,7 +1,9 @@
 """Test scheme parsing."""
+from pathlib import Path
 from typing import Any
 
-from map_machine.scheme import Scheme
+from map_machine.scheme import Matcher, MatcherIndex, Scheme
+from tests import workspace
 
 
 def test_verification_right() -> None:
@@ -22,3 +24,59 @@ def test_verification_wrong() -> None:
         "node_icons": [{"tags": [{"tags": {"a": 0}}]}],
     }
     assert Scheme(tags).node_matchers[0].verify() is False
+
+
+def test_matcher_index() -> None:
+    """Test that matcher index gives all matchers that may match tags."""
+    matchers: list[Matcher] = [
+        Matcher({"tags": {"a": "b"}}),
+        Matcher({"tags": {"a": "*"}}),
+        Matcher({"tags": {"c": "^d.*"}}),
+        Matcher({"tags": {"a": "*", "c": "e"}}),
+        Matcher({"tags": {}}),
+    ]
+    index: MatcherIndex = MatcherIndex(matchers)
+
+    assert index.get_candidates({"a": "b"}) == [0, 1, 4]
+    assert index.get_candidates({"a": "x", "c": "e"}) == [1, 2, 3, 4]
+    assert index.get_candidates({"f": "g"}) == [4]
+
+
+def test_matcher_index_match() -> None:
+    """Test that matching results are memoized for tag sets."""
+    index: MatcherIndex = MatcherIndex(
+        [Matcher({"tags": {"a": "b"}}), Matcher({"tags": {"a": "*"}})]
+    )
+    assert index.match({"a": "b", "c": "d"}) == (0, 1)
+    assert index.match({"c": "d", "a": "b"}) == (0, 1)
+    assert index.match({"a": "c"}) == (1,)
+
+    assert index.cache.hits == 1
+    assert index.cache.misses == 2
+
+
+def test_cached_scheme() -> None:
+    """Test that parsed scheme file is stored and then read from the cache."""
+    path: Path = workspace.output_path / "cached_scheme.yml"
+    path.write_text('colors:\n  default: "#444444"\n', encoding="utf-8")
+    cache_path: Path = workspace.get_cache_path()
+
+    scheme: Scheme = Scheme.from_file(path, cache_path=cache_path)
+    assert len(list(cache_path.glob("scheme_*.json"))) > 0
+    assert scheme.colors == {"default": "#444444"}
+    assert Scheme.from_file(path, cache_path=cache_path).colors == {
+        "default": "#444444"
+    }
+
+
+def test_not_cached_scheme() -> None:
+    """Test that scheme with non-string keys is not cached."""
+    path: Path = workspace.output_path / "not_cached_scheme.yml"
+    path.write_text("colors:\n  1: '#444444'\n", encoding="utf-8")
+    cache_path: Path = workspace.output_path / "scheme_cache"
+    cache_path.mkdir(exist_ok=True)
+
+    assert Scheme.from_file(path, cache_path=cache_path).colors == {
+        1: "#444444"
+    }
+    assert not list(cache_path.glob("scheme_*.json"))
@@ -0,0 +1,95 @@
+"""Test tile server."""
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from map_machine.geometry.boundary_box import BoundaryBox
+from map_machine.osm.osm_reader import OSMData
+from map_machine.slippy.server import CachedTile, OSMDataCache, TileRenderer
+from map_machine.slippy.tile import Tile, Tiles
+from tests import SCHEME
+
+__author__ = "Sergey Vartanov"
+__email__ = "me@enzet.ru"
+
+
+class SlowRenderer(TileRenderer):
+    """Renderer that counts renders instead of drawing tiles."""
+
+    def __init__(self) -> None:
+        super().__init__(Path("cache"), SCHEME, workers=2, metatile_size=2)
+        self.started: threading.Event = threading.Event()
+        self.release: threading.Event = threading.Event()
+        self.calls: int = 0
+
+    def render(self, tiles: Tiles) -> None:
+        self.calls += 1
+        self.started.set()
+        self.release.wait()
+
+
+def test_request_coalescing() -> None:
+    """
+    Test that concurrent requests for tiles of the same metatile share one
+    render.
+    """
+    renderer: SlowRenderer = SlowRenderer()
+    futures: list[Future] = [
+        renderer.request(Tile(x, y, 18)) for x, y in ((1, 2), (0, 3), (1, 2))
+    ]
+    renderer.started.wait()
+    assert list(renderer.in_flight) == [(18, 0, 2)]
+    renderer.release.set()
+
+    for future in futures:
+        future.result()
+    assert renderer.calls == 1
+    assert renderer.get_statistics()["coalesced"] == 2
+
+    while renderer.in_flight:
+        time.sleep(0.01)
+    renderer.request(Tile(1, 2, 18)).result()
+    assert renderer.calls == 2
+    renderer.shutdown()
+
+
+def test_conditional_request() -> None:
+    """Test that tile validators are checked against request headers."""
+    tile: CachedTile = CachedTile(b"png", '"1"', 1_000_000_000.0)
+
+    assert not tile.is_not_modified({})
+    assert tile.is_not_modified({"If-None-Match": '"0", "1"'})
+    assert not tile.is_not_modified({"If-None-Match": '"2"'})
+    assert tile.is_not_modified(
+        {"If-Modified-Since": "Sun, 09 Sep 2001 01:46:40 GMT"}
+    )
+    assert not tile.is_not_modified(
+        {"If-Modified-Since": "Sun, 09 Sep 2001 01:46:39 GMT"}
+    )
+    assert not tile.is_not_modified({"If-Modified-Since": "invalid"})
+
+
+def test_metatile() -> None:
+    """Test metatile alignment and clipping at the map edge."""
+    tiles: Tiles = Tile(5, 6, 18).get_metatile(4)
+    assert (tiles.tile_1.x, tiles.tile_1.y) == (4, 4)
+    assert (tiles.tile_2.x, tiles.tile_2.y) == (7, 7)
+    assert len(tiles.tiles) == 16
+
+    tiles = Tile(1, 0, 1).get_metatile(4)
+    assert (tiles.tile_1.x, tiles.tile_1.y) == (0, 0)
+    assert (tiles.tile_2.x, tiles.tile_2.y) == (1, 1)
+
+
+def test_osm_data_cache(tmp_path: Path) -> None:
+    """Test that data is taken from the cached region containing the area."""
+    file_name: str = "39.999,49.999,40.002,50.002.osm"
+    shutil.copy(Path("tests/data") / file_name, tmp_path / file_name)
+    cache: OSMDataCache = OSMDataCache(tmp_path, 1024 * 1024)
+    region: OSMData = cache.load(BoundaryBox(39.999, 49.999, 40.002, 50.002))
+
+    assert len(region.nodes) == 1
+    assert cache.load(BoundaryBox(40.0, 50.0, 40.001, 50.001)) is region
+    assert cache.get_statistics()["hits"] == 1
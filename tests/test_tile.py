@@ -0,0 +1,127 @@
+"""Test tile generation."""
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from map_machine.constructor import Constructor
+from map_machine.feature.building import BUILDING_SCALE
+from map_machine.geometry.flinger import MercatorFlinger
+from map_machine.map_configuration import BuildingMode, MapConfiguration
+from map_machine.osm.osm_reader import OSMData, OSMNode, OSMWay
+from map_machine.slippy.tile import (
+    RenderTask,
+    Tile,
+    query_osm_data,
+    run_tasks,
+)
+from map_machine.ui.cli import parse_arguments
+from map_machine.workspace import workspace
+from tests import SCHEME, SHAPE_EXTRACTOR
+
+__author__ = "Sergey Vartanov"
+__email__ = "me@enzet.ru"
+
+
+def test_building_outside_tile() -> None:
+    """
+    Test that tall isometric building to the south of the tile is drawn on the
+    tile.
+    """
+    tile: Tile = Tile(633_000, 327_000, 20)
+    # Square of 64 × 64 pixels from 256 to 320 pixels below the tile.
+    part: Tile = Tile(4 * tile.x, 4 * tile.y + 8, 22)
+    north, west = part.get_coordinates()
+    south, east = Tile(part.x + 1, part.y + 1, 22).get_coordinates()
+
+    osm_data: OSMData = OSMData()
+    nodes: list[OSMNode] = [
+        OSMNode({}, 1, np.array((north, west))),
+        OSMNode({}, 2, np.array((north, east))),
+        OSMNode({}, 3, np.array((south, east))),
+        OSMNode({}, 4, np.array((south, west))),
+    ]
+    for node in nodes:
+        osm_data.add_node(node)
+    osm_data.add_way(
+        OSMWay({"building": "yes", "height": "80"}, 5, nodes + [nodes[0]])
+    )
+    flinger: MercatorFlinger = MercatorFlinger(
+        tile.get_boundary_box(), 20, osm_data.equator_length
+    )
+
+    flat: MapConfiguration = MapConfiguration(SCHEME, zoom_level=20)
+    assert not query_osm_data(osm_data, flinger, flat).ways
+
+    configuration: MapConfiguration = MapConfiguration(
+        SCHEME, building_mode=BuildingMode.ISOMETRIC, zoom_level=20
+    )
+    constructor: Constructor = Constructor(
+        query_osm_data(osm_data, flinger, configuration),
+        flinger,
+        SHAPE_EXTRACTOR,
+        configuration,
+    )
+    constructor.construct()
+
+    assert len(constructor.buildings) == 1
+    # Roof is shifted up by the building height and is visible on the tile.
+    roof_shift: float = (
+        constructor.buildings[0].height * flinger.get_scale() * BUILDING_SCALE
+    )
+    assert flinger.fling(nodes[0].coordinates)[1] - roof_shift < 256.0
+
+
+def test_run_tasks(tmp_path: Path) -> None:
+    """Test that tiles of two zoom levels are drawn by two processes."""
+    options: argparse.Namespace = parse_arguments(
+        ["map-machine", "tile", "--cache", str(tmp_path)]
+    )
+    osm_data: OSMData = OSMData()
+    osm_data.parse_osm_file(Path("tests/data/39.999,49.999,40.002,50.002.osm"))
+    tiles: list[Tile] = [
+        Tile.from_coordinates(np.array((50.0, 40.0)), zoom_level)
+        for zoom_level in (17, 18)
+    ]
+
+    run_tasks(
+        [RenderTask(tile, tmp_path, tmp_path) for tile in tiles],
+        osm_data,
+        workspace.find_scheme_path(options.scheme),
+        options,
+        jobs=2,
+    )
+
+    for tile in tiles:
+        assert tile.get_file_name(tmp_path).is_file()
+        assert tile.get_file_name(tmp_path).with_suffix(".png").is_file()
+
+
+def test_direct_raster(tmp_path: Path) -> None:
+    """Test that direct PNG drawing is close to SVG rasterization."""
+    osm_data: OSMData = OSMData()
+    osm_data.parse_osm_file(Path("tests/data/39.999,49.999,40.002,50.002.osm"))
+    tile: Tile = Tile.from_coordinates(np.array((50.0, 40.0)), 18)
+    configuration: MapConfiguration = MapConfiguration(SCHEME, zoom_level=18)
+
+    images: list[np.ndarray] = []
+    for direct_raster in False, True:
+        directory: Path = tmp_path / str(direct_raster)
+        directory.mkdir()
+        tile.draw_with_osm_data(
+            osm_data,
+            directory,
+            configuration,
+            SHAPE_EXTRACTOR,
+            direct_raster=direct_raster,
+        )
+        path: Path = tile.get_file_name(directory).with_suffix(".png")
+        with Image.open(path) as image:
+            images.append(np.asarray(image.convert("RGBA"), dtype=float))
+
+    difference: np.ndarray = np.abs(images[0] - images[1]).max(axis=2)
+
+    assert images[0].shape == images[1].shape == (256, 256, 4)
+    assert difference.mean() < 1.0
+    assert (difference > 32.0).mean() < 0.001
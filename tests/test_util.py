@@ -0,0 +1,53 @@
+"""Test utility functions and classes."""
+import pickle
+
+from map_machine.util import LRUCache
+
+__author__ = "Sergey Vartanov"
+__email__ = "me@enzet.ru"
+
+
+def test_lru_cache() -> None:
+    """Test that the least recently used value is evicted."""
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get_statistics() == {
+        "size": 2,
+        "maximum_size": 2,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_lru_cache_pickle() -> None:
+    """Test that the cache may be passed to other processes."""
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+
+    copy: LRUCache[str, int] = pickle.loads(pickle.dumps(cache))
+    assert copy.get("a") == 1
+    copy.put("b", 2)
+    assert len(copy) == 2
+
+
+def test_lru_cache_size() -> None:
+    """Test that the cache is bounded by the total size of values."""
+    cache: LRUCache[str, bytes] = LRUCache(10, len)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.put("c", b"cccc")
+
+    assert "a" not in cache
+    assert cache.size == 8
+
+    cache.put("d", b"d" * 11)
+    assert "d" not in cache
+    assert cache.size == 8
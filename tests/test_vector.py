@@ -1,7 +1,11 @@
 """Test vector operations."""
 import numpy as np
 
-from map_machine.geometry.vector import compute_angle, turn_by_angle
+from map_machine.geometry.vector import (
+    PathEncoder,
+    compute_angle,
+    turn_by_angle,
+)
 
 __author__ = "Sergey Vartanov"
 __email__ = "me@enzet.ru"
@@ -26,3 +30,27 @@ def test_turn_by_compute_angle() -> None:
     assert np.allclose(
         turn_by_angle(np.array((1, 0)), np.pi / 2), np.array((0, 1))
     )
+
+
+POINTS: np.ndarray = np.array(((1.234, 2.0), (3.0, -0.001), (1.234, 2.0)))
+
+
+def test_path_encoder() -> None:
+    """Test path encoding with full precision."""
+    assert (
+        PathEncoder().encode(POINTS) == "M 1.234,2.0 L 3.0,-0.001 1.234,2.0 Z"
+    )
+
+
+def test_path_encoder_precision() -> None:
+    """Test path encoding with fixed number of decimal places."""
+    assert PathEncoder(2).encode(POINTS) == "M 1.23,2.0 L 3.0,0.0 1.23,2.0 Z"
+    assert PathEncoder(0).encode(POINTS) == "M 1,2 L 3,0 1,2 Z"
+
+
+def test_path_encoder_relative() -> None:
+    """Test path encoding with relative coordinates."""
+    assert (
+        PathEncoder(2, is_relative=True).encode(POINTS)
+        == "M 1.23,2.0 l 1.77,-2.0 -1.77,2.0 Z"
+    )
@@ -4,12 +4,15 @@ Test map generation for ways.
 Tests check that for the given ways described by tags, Map Machine generates
 expected figures in the expected order.
 """
+from typing import Optional
+
 import numpy as np
 
-from map_machine.constructor import Constructor
+from map_machine.constructor import ConstructionCache, Constructor, glue
 from map_machine.figure import Figure
 from map_machine.geometry.boundary_box import BoundaryBox
 from map_machine.geometry.flinger import MercatorFlinger
+from map_machine.geometry.vector import Segment
 from map_machine.map_configuration import MapConfiguration
 from map_machine.osm.osm_reader import OSMData, OSMWay, OSMNode, Tags
 from tests import SCHEME, SHAPE_EXTRACTOR
@@ -17,16 +20,20 @@ from tests import SCHEME, SHAPE_EXTRACTOR
 CONFIGURATION: MapConfiguration = MapConfiguration(SCHEME)
 
 
-def get_constructor(osm_data: OSMData) -> Constructor:
+def get_constructor(
+    osm_data: OSMData,
+    boundary_box: BoundaryBox = BoundaryBox(-0.01, -0.01, 0.01, 0.01),
+    cache: Optional[ConstructionCache] = None,
+) -> Constructor:
     """
-    Get custom constructor for bounds (-0.01, -0.01, 0.01, 0.01) and zoom level
-    18.
+    Get custom constructor for bounds (-0.01, -0.01, 0.01, 0.01) by default and
+    zoom level 18.
     """
     flinger: MercatorFlinger = MercatorFlinger(
-        BoundaryBox(-0.01, -0.01, 0.01, 0.01), 18, osm_data.equator_length
+        boundary_box, 18, osm_data.equator_length
     )
     constructor: Constructor = Constructor(
-        osm_data, flinger, SHAPE_EXTRACTOR, CONFIGURATION
+        osm_data, flinger, SHAPE_EXTRACTOR, CONFIGURATION, cache
     )
     constructor.construct_ways()
     return constructor
@@ -80,3 +87,122 @@ def test_empty_ways() -> None:
     osm_data.add_way(OSMWay({"waterway": "river"}, 2))
 
     assert not get_constructor(osm_data).get_sorted_figures()
+
+
+def test_shared_construction_cache() -> None:
+    """
+    Check that constructors for different areas sharing the construction cache
+    create the same points as constructors without the cache.
+    """
+    osm_data: OSMData = OSMData()
+    nodes: list[OSMNode] = [
+        OSMNode({}, 1, np.array((-0.001, -0.001))),
+        OSMNode({}, 2, np.array((-0.001, 0.001))),
+        OSMNode({}, 3, np.array((0.001, 0.001))),
+    ]
+    for node in nodes:
+        osm_data.add_node(node)
+    osm_data.add_way(
+        OSMWay({"amenity": "parking", "name": "P"}, 1, nodes + [nodes[0]])
+    )
+    cache: ConstructionCache = ConstructionCache()
+
+    for boundary_box in (
+        BoundaryBox(-0.01, -0.01, 0.01, 0.01),
+        BoundaryBox(-0.002, -0.002, 0.0, 0.0),
+    ):
+        cached: Constructor = get_constructor(osm_data, boundary_box, cache)
+        constructor: Constructor = get_constructor(osm_data, boundary_box)
+
+        assert len(cached.points) == len(constructor.points) == 1
+        cached_point, point = cached.points[0], constructor.points[0]
+        assert np.allclose(cached_point.point, point.point)
+        assert cached_point.processed == point.processed
+        assert [x.text for x in cached_point.labels] == [
+            x.text for x in point.labels
+        ]
+
+    assert cache.points and cache.centers
+
+
+def test_shared_construction_cache_buildings() -> None:
+    """
+    Check that constructors sharing the construction cache reuse figures but
+    fling building walls for their own areas.
+    """
+    osm_data: OSMData = OSMData()
+    nodes: list[OSMNode] = [
+        OSMNode({}, 1, np.array((-0.001, -0.001))),
+        OSMNode({}, 2, np.array((-0.001, 0.001))),
+        OSMNode({}, 3, np.array((0.001, 0.001))),
+    ]
+    for node in nodes:
+        osm_data.add_node(node)
+    osm_data.add_way(OSMWay({"building": "yes"}, 1, nodes + [nodes[0]]))
+    osm_data.add_way(OSMWay({"natural": "wood"}, 2, nodes + [nodes[0]]))
+    cache: ConstructionCache = ConstructionCache()
+    figures: list[Figure] = []
+
+    for boundary_box in (
+        BoundaryBox(-0.01, -0.01, 0.01, 0.01),
+        BoundaryBox(-0.002, -0.002, 0.0, 0.0),
+    ):
+        cached: Constructor = get_constructor(osm_data, boundary_box, cache)
+        constructor: Constructor = get_constructor(osm_data, boundary_box)
+
+        assert len(cached.buildings) == len(constructor.buildings) == 1
+        assert cached.buildings[0].height == constructor.buildings[0].height
+        cached_parts: list[Segment] = cached.buildings[0].parts
+        parts: list[Segment] = constructor.buildings[0].parts
+        assert len(cached_parts) == len(parts) == 3
+        for cached_part, part in zip(cached_parts, parts):
+            assert np.allclose(cached_part.point_1, part.point_1)
+            assert np.allclose(cached_part.point_2, part.point_2)
+
+        assert len(cached.figures) == len(constructor.figures) == 1
+        figures += cached.figures
+
+    assert figures[0] is figures[1]
+
+
+def test_glue() -> None:
+    """Check that shuffled and reversed ways are glued into rings."""
+    nodes: list[OSMNode] = [
+        OSMNode({}, index, np.array((0.0, float(index)))) for index in range(8)
+    ]
+    ring: list[OSMNode] = nodes[:6] + [nodes[0]]
+    ways: list[OSMWay] = [
+        OSMWay({}, 1, ring[2:5]),
+        OSMWay({}, 2, ring[:3][::-1]),
+        OSMWay({}, 3, ring[4:][::-1]),
+        OSMWay({}, 4, [nodes[6], nodes[7]]),
+        OSMWay({}, 5, nodes[3:4] + nodes[3:4]),
+    ]
+    result: list[list[OSMNode]] = glue(ways)
+
+    assert len(result) == 3
+    assert result[0] == [nodes[3], nodes[3]]
+    assert result[2] == [nodes[6], nodes[7]]
+    glued: list[OSMNode] = result[1]
+    assert len(glued) == len(ring) and glued[0] == glued[-1]
+    start: int = glued.index(nodes[0])
+    rotated: list[OSMNode] = glued[start:-1] + glued[:start] + [nodes[0]]
+    assert rotated in (ring, ring[::-1])
+
+
+def test_glue_open_chain() -> None:
+    """Check that ways not forming a ring are glued into one chain."""
+    nodes: list[OSMNode] = [
+        OSMNode({}, index, np.array((0.0, float(index)))) for index in range(5)
+    ]
+    ways: list[OSMWay] = [
+        OSMWay({}, 1, nodes[1:3]),
+        OSMWay({}, 2, nodes[:2][::-1]),
+        OSMWay({}, 3, nodes[3:][::-1]),
+        OSMWay({}, 4, nodes[2:4]),
+        OSMWay({}, 5, nodes[2:4]),
+    ]
+    result: list[list[OSMNode]] = glue(ways)
+
+    assert len(result) == 1
+    assert result[0] in (nodes, nodes[::-1])